@@ -1,27 +1,41 @@
 from django.contrib import admin
 from authentication.models import Renter, Client, ClientDetails
+from authentication.exports import CLIENT_EXPORT
+from authentication.imports import RENTER_IMPORT
+from authentication.passwords import hash_password
+from backend.changelists import LargeTableAdmin
+from backend.exports import export_actions
+from backend.imports import ImportAdmin
 from django.views.decorators.cache import cache_page
 
 @admin.register(Client)
-class ClientAdmin(admin.ModelAdmin):
+class ClientAdmin(LargeTableAdmin, admin.ModelAdmin):
     search_fields = ['username', 'email', 'authToken']
     list_filter = ['createdAt']
     date_hierarchy = 'createdAt'
     list_display = ['username', 'email', 'createdAt', 'authToken']
+    actions = export_actions(CLIENT_EXPORT)
     readonly_fields = ['user_id', 'authToken', 'createdAt', 'updatedAt']
 
+    def save_model(self, request, obj, form, change):
+        # Passwords typed into the admin are stored hashed like registrations
+        if 'password' in form.changed_data:
+            obj.password = hash_password(obj.password)
+        super().save_model(request, obj, form, change)
+
 
 @admin.register(ClientDetails)
-class ClientDetailsAdmin(admin.ModelAdmin):  
+class ClientDetailsAdmin(LargeTableAdmin, admin.ModelAdmin):
     search_fields = ['name', 'phone', 'aadhaar']
     list_filter = ['gender', 'joinedAt']
     date_hierarchy = 'joinedAt'
     list_display = ['name', 'phone', 'gender', 'age', 'aadhaar', 'joinedAt']
+    autocomplete_fields = ['client']
     readonly_fields = ['joinedAt']
 
 
 @admin.register(Renter)
-class RenterAdmin(admin.ModelAdmin):
+class RenterAdmin(ImportAdmin, LargeTableAdmin, admin.ModelAdmin):
     
     search_fields = ['full_name', 'email', 'aadhaar', 'phone']
     list_filter = ['gender', 'verification_status', 'joinedAt']
@@ -36,4 +50,10 @@ class RenterAdmin(admin.ModelAdmin):
         'joinedAt',
         'addedby',
     ]
+    list_select_related = ['addedby']
+    autocomplete_fields = ['addedby']
+    import_spec = RENTER_IMPORT
     readonly_fields = ['user_id', 'joinedAt']
+
+    def get_import_context(self, request):
+        return {'added_by': request.user}
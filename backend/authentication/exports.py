@@ -0,0 +1,15 @@
+from backend.exports import values_export
+from authentication.models import Client
+
+# Passwords and auth tokens stay out of exports
+CLIENT_EXPORT = values_export(
+    Client,
+    {
+        "id": "id",
+        "user_id": "user_id",
+        "username": "username",
+        "email": "email",
+        "created_at": "createdAt",
+        "updated_at": "updatedAt",
+    },
+)
@@ -0,0 +1,160 @@
+"""
+Local verification of Google ID tokens against cached signing certificates.
+
+Google's certs are fetched with one pooled ``requests.Session`` per process
+and kept for as long as the response's ``Cache-Control: max-age`` allows.
+Shortly before they expire a background thread refetches them, so logins
+keep verifying locally without waiting on the network; an unknown key id
+(Google rotated keys early) forces one synchronous refetch, at most once
+per GOOGLE_CERTS_MIN_REFRESH_INTERVAL so made-up key ids can't make every
+request wait on Google. If a refresh fails, the previous certs stay in use.
+"""
+import logging
+import os
+import re
+import threading
+import time
+
+import requests
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+
+_MAX_AGE_RE = re.compile(r"max-age=(\d+)")
+
+
+def cache_lifetime(headers, default):
+    """Seconds the response may be cached for, from Cache-Control max-age minus Age."""
+    cache_control = headers.get("Cache-Control", "")
+    if "no-store" in cache_control or "no-cache" in cache_control:
+        return 0
+    match = _MAX_AGE_RE.search(cache_control)
+    if not match:
+        return default
+    try:
+        age = int(headers.get("Age", 0))
+    except ValueError:
+        age = 0
+    return max(int(match.group(1)) - age, 0)
+
+
+class GoogleCertCache:
+    def __init__(self):
+        self.certs = {}
+        self.expires_at = 0.0
+        self.forced_at = float("-inf")
+        self._after_fork()
+
+    def _after_fork(self):
+        # A forked worker keeps the certs but must not share the parent's
+        # pooled sockets, locks or refresh thread state
+        self.session = requests.Session()
+        self.lock = threading.Lock()
+        self.fetch_lock = threading.Lock()
+        self.refreshing = False
+
+    def clear(self):
+        with self.lock:
+            self.certs = {}
+            self.expires_at = 0.0
+            self.forced_at = float("-inf")
+
+    def _fetch(self):
+        response = self.session.get(settings.GOOGLE_CERTS_URL, timeout=settings.GOOGLE_CERTS_TIMEOUT)
+        response.raise_for_status()
+        certs = response.json()
+        lifetime = cache_lifetime(response.headers, settings.GOOGLE_CERTS_DEFAULT_TTL)
+        with self.lock:
+            self.certs = certs
+            self.expires_at = time.monotonic() + lifetime
+        return certs
+
+    def refresh(self):
+        """Fetch the certs now; on failure keep (and return) the ones already cached."""
+        try:
+            return self._fetch()
+        except (requests.RequestException, ValueError):
+            if not self.certs:
+                raise
+            logger.warning("Refreshing Google certs failed, keeping cached certs", exc_info=True)
+            return self.certs
+        finally:
+            self.refreshing = False
+
+    def refresh_for_unknown_key(self):
+        """
+        Refetch for a token signed with a key id that isn't cached, unless
+        that was done less than GOOGLE_CERTS_MIN_REFRESH_INTERVAL ago; then
+        the cached certs are returned as they are.
+        """
+        with self.fetch_lock:
+            if time.monotonic() - self.forced_at < settings.GOOGLE_CERTS_MIN_REFRESH_INTERVAL:
+                return self.certs
+            self.forced_at = time.monotonic()
+            return self.refresh()
+
+    def _refresh_in_background(self):
+        with self.lock:
+            if self.refreshing:
+                return
+            self.refreshing = True
+        threading.Thread(target=self._background_refresh, name="google-certs-refresh", daemon=True).start()
+
+    def _background_refresh(self):
+        try:
+            self.refresh()
+        except (requests.RequestException, ValueError):
+            logger.warning("Fetching Google certs failed", exc_info=True)
+
+    def get(self):
+        """Current certs, fetching synchronously only when none are cached or they have expired."""
+        now = time.monotonic()
+        if self.certs and now < self.expires_at:
+            if now >= self.expires_at - settings.GOOGLE_CERTS_REFRESH_MARGIN:
+                self._refresh_in_background()
+            return self.certs
+        with self.fetch_lock:
+            # Another request may have fetched them while this one waited
+            if self.certs and time.monotonic() < self.expires_at:
+                return self.certs
+            return self.refresh()
+
+
+_cache = GoogleCertCache()
+os.register_at_fork(after_in_child=_cache._after_fork)
+
+
+def clear_google_certs():
+    _cache.clear()
+
+
+def prefetch_google_certs():
+    """Start fetching the certs in the background if none are cached yet."""
+    if not _cache.certs:
+        _cache._refresh_in_background()
+
+
+def verify_google_id_token(token, audience):
+    """
+    Verify a Google ID token's signature, expiry, audience and issuer and
+    return its claims. Raises ValueError for an invalid token, like
+    ``google.oauth2.id_token.verify_oauth2_token``.
+    """
+    # google.auth is slow to import; load it on the first Google login, not at startup
+    from google.auth import jwt
+
+    certs = _cache.get()
+    try:
+        claims = jwt.decode(token, certs=certs, audience=audience)
+    except ValueError:
+        # Signed with a key we have not seen yet: refetch (rate-limited) and retry
+        header = jwt.decode_header(token)
+        if header.get("kid") in certs:
+            raise
+        claims = jwt.decode(token, certs=_cache.refresh_for_unknown_key(), audience=audience)
+
+    if claims.get("iss") not in GOOGLE_ISSUERS:
+        raise ValueError(f"Wrong issuer. 'iss' should be one of {GOOGLE_ISSUERS} but is {claims.get('iss')}")
+    return claims
@@ -0,0 +1,33 @@
+from django.db.models import Q
+
+from authentication.models import Renter
+from backend.imports import Import
+
+RENTER_FIELDS = ("email", "full_name", "phone", "gender", "aadhaar", "address", "profile_pic")
+
+
+def _prepare_renters(rows, columns, added_by=None):
+    # Phone and aadhaar are unique too: reject rows that would take another
+    # renter's (or an earlier row's) instead of failing the whole INSERT
+    phones = [obj.phone for _, _, obj in rows]
+    aadhaars = [obj.aadhaar for _, _, obj in rows]
+    taken = {}
+    for email, phone, aadhaar in Renter.objects.filter(Q(phone__in=phones) | Q(aadhaar__in=aadhaars)).values_list(
+        "email", "phone", "aadhaar"
+    ):
+        taken[("phone", phone)] = email
+        taken[("aadhaar", aadhaar)] = email
+
+    rejected = {}
+    for line, _, obj in rows:
+        for name in ("phone", "aadhaar"):
+            value = getattr(obj, name)
+            holder = taken.setdefault((name, value), obj.email)
+            if holder != obj.email:
+                rejected[line] = f"{name}: {value} already belongs to {holder}"
+        # Only set on new renters; existing ones keep who added them
+        obj.addedby = added_by
+    return rejected
+
+
+RENTER_IMPORT = Import(Renter, "email", RENTER_FIELDS, prepare=_prepare_renters)
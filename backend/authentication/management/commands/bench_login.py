@@ -0,0 +1,106 @@
+import json
+import statistics
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.test import RequestFactory, override_settings
+
+from authentication.models import Client
+from authentication.passwords import hash_password, reset_pool
+from authentication.views import login
+
+
+class Command(BaseCommand):
+    help = (
+        "Fire concurrent logins at the login view for a throwaway client and "
+        "report throughput and latency percentiles."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=16,
+            help="Simultaneous request threads, like gunicorn gthread threads (default: 16).",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=200,
+            help="Total logins to perform (default: 200).",
+        )
+        parser.add_argument(
+            "--iterations",
+            type=int,
+            default=settings.PASSWORD_HASH_ITERATIONS,
+            help="PBKDF2 iterations (default: PASSWORD_HASH_ITERATIONS).",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=settings.PASSWORD_HASH_WORKERS,
+            help="KDF pool threads; 0 hashes on the request thread (default: PASSWORD_HASH_WORKERS).",
+        )
+
+    def handle(self, *args, **options):
+        with override_settings(
+            PASSWORD_HASH_ITERATIONS=options["iterations"],
+            PASSWORD_HASH_WORKERS=options["workers"],
+        ):
+            reset_pool()
+            try:
+                self._run(options["concurrency"], options["requests"])
+            finally:
+                reset_pool()
+
+    def _run(self, concurrency, total):
+        password = uuid.uuid4().hex
+        client = Client.objects.create(
+            username="bench-login",
+            email=f"bench-login-{uuid.uuid4().hex}@example.invalid",
+            password=hash_password(password),
+        )
+        body = json.dumps({"email": client.email, "password": password})
+        factory = RequestFactory()
+
+        def one_login(_):
+            request = factory.post("/authentication/login/", body, content_type="application/json")
+            started = time.perf_counter()
+            try:
+                response = login(request)
+            finally:
+                connection.close()
+            return time.perf_counter() - started, response.status_code
+
+        self.stdout.write(
+            f"{total} logins, {concurrency} concurrent, "
+            f"{settings.PASSWORD_HASH_ITERATIONS} iterations, "
+            f"{settings.PASSWORD_HASH_WORKERS} KDF workers"
+        )
+        try:
+            started = time.perf_counter()
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                results = list(executor.map(one_login, range(total)))
+            elapsed = time.perf_counter() - started
+        finally:
+            client.delete()
+
+        latencies = sorted(latency * 1000 for latency, _ in results)
+        failures = sum(1 for _, status_code in results if status_code != 200)
+        if len(latencies) > 1:
+            cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+            p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+        else:
+            p50 = p95 = p99 = latencies[0]
+
+        self.stdout.write(f"  throughput: {total / elapsed:.1f} logins/s over {elapsed:.2f}s")
+        self.stdout.write(
+            f"  latency ms: p50 {p50:.1f}  p95 {p95:.1f}  p99 {p99:.1f}  max {latencies[-1]:.1f}"
+        )
+        if failures:
+            self.stdout.write(self.style.WARNING(f"  {failures} logins did not return 200"))
+        self.stdout.write(self.style.SUCCESS("Done."))
@@ -0,0 +1,19 @@
+# Generated by Django 5.2.1 on 2025-06-02 10:15
+
+import uuid
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0010_renter_verification_status'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='client',
+            name='authToken',
+            field=models.UUIDField(default=uuid.uuid4, editable=False, unique=True),
+        ),
+    ]
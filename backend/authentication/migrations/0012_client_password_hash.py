@@ -0,0 +1,18 @@
+# Generated by Django 5.2.1 on 2025-06-02 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0011_client_authtoken_unique'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='client',
+            name='password',
+            field=models.CharField(max_length=128),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.1 on 2026-10-19 09:40
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0012_client_password_hash'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='client',
+            index=models.Index(fields=['createdAt'], name='client_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='clientdetails',
+            index=models.Index(fields=['joinedAt'], name='clientdetails_joined_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='renter',
+            index=models.Index(fields=['-joinedAt'], name='renter_joined_idx'),
+        ),
+    ]
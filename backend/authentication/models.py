@@ -1,13 +1,21 @@
 import uuid
 
 from django.core.exceptions import ValidationError
-from django.db import models
+from django.db import IntegrityError, models, router, transaction
 from django.contrib.auth import get_user_model
 from backend.utils import aadhaar_regex, phone_regex
 
 User = get_user_model()
 
 
+class DuplicateEmail(ValidationError, IntegrityError):
+    """
+    A new client's email is already registered. Both a ValidationError for
+    callers reporting it and an IntegrityError, so get_or_create still
+    recovers from a concurrent insert by fetching the existing row.
+    """
+
+
 class Client(models.Model):
     """
     Stores Client Auth Details:------------:For Personal info refer :model:`authentication.ClientDetails`
@@ -15,21 +23,37 @@ class Client(models.Model):
     user_id = models.UUIDField(default=uuid.uuid4, editable=False,unique=True)
     username = models.CharField(max_length=100)
     email = models.EmailField(max_length=100, unique=True)
-    password = models.CharField(max_length=100)
-    authToken = models.UUIDField(default=uuid.uuid4, editable=False)
+    password = models.CharField(max_length=128)
+    authToken = models.UUIDField(default=uuid.uuid4, editable=False, unique=True)
     createdAt = models.DateTimeField(auto_now_add=True, editable=False)
     updatedAt = models.DateTimeField(auto_now=True, editable=False)
 
+    class Meta:
+        indexes = [models.Index(fields=["createdAt"], name="client_created_idx")]
+
+    @property
+    def is_authenticated(self):
+        # Lets DRF permission classes treat a token-authenticated Client as a user
+        return True
+
     def save(self, *args, **kwargs):
-        # Check if this is a new object (no id exists yet)
-        if not self.id:
-            # Check if a client with this username already exists
-            if Client.objects.filter(email=self.email).exists():
-                raise ValidationError(
+        # New objects: let the unique email index reject duplicates in the
+        # INSERT itself instead of checking with a separate query first
+        if self._state.adding:
+            using = kwargs.get("using") or router.db_for_write(Client, instance=self)
+            try:
+                with transaction.atomic(using=using):
+                    super(Client, self).save(*args, **kwargs)
+            except IntegrityError as e:
+                # Only a taken email is reported as such; other unique
+                # columns (user_id, authToken) keep the database error
+                if not Client._base_manager.using(using).filter(email=self.email).exists():
+                    raise
+                raise DuplicateEmail(
                     f"A client with email '{self.email}' already exists."
-                )
+                ) from e
+            return
 
-        # If validation passes, proceed with the normal save
         super(Client, self).save(*args, **kwargs)
 
     def __str__(self):
@@ -60,6 +84,7 @@ class ClientDetails(models.Model):
     class Meta:
         verbose_name = "Client Detail"
         verbose_name_plural = "Client Details"
+        indexes = [models.Index(fields=["joinedAt"], name="clientdetails_joined_idx")]
     def __str__(self):
         return f"Name: {self.name} / Phone: {self.phone} / Gender: {self.gender}"
 
@@ -96,7 +121,10 @@ class Renter(models.Model):
     verification_status = models.BooleanField(default=False)
 
     def __str__(self):
-        return f"Renter Full Name: {self.full_name}, Added By: {self.addedby}, Id: {self.user_id}"
+        # The admin user only when already loaded, so listing renters costs no query per row
+        added_by = self.addedby if Renter.addedby.is_cached(self) else self.addedby_id
+        return f"Renter Full Name: {self.full_name}, Added By: {added_by}, Id: {self.user_id}"
 
     class Meta:
-        ordering = ['-joinedAt']
\ No newline at end of file
+        ordering = ['-joinedAt']
+        indexes = [models.Index(fields=['-joinedAt'], name='renter_joined_idx')]
\ No newline at end of file
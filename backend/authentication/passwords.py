@@ -0,0 +1,116 @@
+"""
+Client password hashing.
+
+The KDF is deliberately expensive, so it does not run on the request thread:
+hash and verify calls are handed to a small per-process thread pool of
+PASSWORD_HASH_WORKERS threads. hashlib's PBKDF2 releases the GIL, so the pool
+keeps that many cores busy while request threads just wait on the result,
+and the number of KDFs in flight stays bounded however many gunicorn threads
+ask at once. Callers that cannot get a slot within PASSWORD_HASH_QUEUE_TIMEOUT
+get PasswordHasherBusy instead of piling up behind the pool.
+"""
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import (
+    PBKDF2PasswordHasher,
+    check_password,
+    identify_hasher,
+    is_password_usable,
+    make_password,
+)
+from django.utils.crypto import constant_time_compare, get_random_string
+
+
+class ClientPBKDF2PasswordHasher(PBKDF2PasswordHasher):
+    """PBKDF2-SHA256 whose cost comes from PASSWORD_HASH_ITERATIONS; changing it rehashes on next login."""
+
+    @property
+    def iterations(self):
+        return settings.PASSWORD_HASH_ITERATIONS
+
+
+class PasswordHasherBusy(Exception):
+    """No KDF slot became free within PASSWORD_HASH_QUEUE_TIMEOUT."""
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _get_pool():
+    # Created lazily so that every (forked) worker process gets its own threads
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            workers = settings.PASSWORD_HASH_WORKERS
+            executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="password-kdf") if workers else None
+            slots = threading.BoundedSemaphore(max(workers, 1) + settings.PASSWORD_HASH_QUEUE_SIZE)
+            _pool = (executor, slots)
+        return _pool
+
+
+def reset_pool():
+    """Shut the pool down so the next call rebuilds it from the current settings."""
+    global _pool
+    with _pool_lock:
+        if _pool is not None and _pool[0] is not None:
+            _pool[0].shutdown(wait=True)
+        _pool = None
+
+
+def _run(func, *args):
+    executor, slots = _get_pool()
+    if not slots.acquire(timeout=settings.PASSWORD_HASH_QUEUE_TIMEOUT):
+        raise PasswordHasherBusy("Too many concurrent password checks, try again shortly")
+    try:
+        if executor is None:
+            # PASSWORD_HASH_WORKERS=0: run on the calling thread
+            return func(*args)
+        return executor.submit(func, *args).result()
+    finally:
+        slots.release()
+
+
+def _verify(raw_password, encoded):
+    if not encoded or not is_password_usable(encoded):
+        return False, None
+    try:
+        identify_hasher(encoded)
+    except ValueError:
+        # Row from before passwords were hashed: compare, then upgrade it
+        if constant_time_compare(raw_password, encoded):
+            return True, make_password(raw_password)
+        return False, None
+
+    rehashed = []
+    valid = check_password(raw_password, encoded, setter=lambda raw: rehashed.append(make_password(raw)))
+    return valid, (rehashed[0] if rehashed else None)
+
+
+# Hash checked when no account matches, so that answering "no such account"
+# costs a KDF run like a wrong password does. Per cost setting.
+_dummy_hashes = {}
+
+
+def dummy_hash():
+    iterations = settings.PASSWORD_HASH_ITERATIONS
+    if iterations not in _dummy_hashes:
+        _dummy_hashes[iterations] = make_password(get_random_string(32))
+    return _dummy_hashes[iterations]
+
+
+def hash_password(raw_password):
+    """Encoded hash of ``raw_password``, computed in the KDF pool."""
+    return _run(make_password, raw_password)
+
+
+def verify_password(raw_password, encoded):
+    """
+    Check ``raw_password`` against a stored value in the KDF pool.
+    Returns ``(valid, new_encoded)``; ``new_encoded`` is set when the stored
+    value is legacy plaintext or uses outdated parameters and should be
+    replaced.
+    """
+    return _run(_verify, raw_password, encoded)
@@ -1,3 +1,509 @@
-from django.test import TestCase
+import io
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
 
-# Create your tests here.
+import rsa
+from google.auth import crypt, jwt
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, identify_hasher
+from django.core.exceptions import ValidationError
+from django.db import IntegrityError, connection
+from django.db.models.query import QuerySet
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from monitoring.budgets import Budget, BudgetTestMixin, query_diff
+
+from . import urls as auth_urls
+from .google_certs import cache_lifetime, clear_google_certs, verify_google_id_token
+from .models import Client, ClientDetails, Renter
+from .passwords import hash_password, verify_password
+from .tokens import _ClientTokenCache, cached_client, clear_client_cache, invalidate_client, resolve_client
+
+# Queries counted by assertNumQueries include the SAVEPOINT / RELEASE pair
+# that atomic() issues inside the test transaction.
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class AuthQueryCountTestCase(TestCase):
+    def setUp(self):
+        clear_client_cache()
+        self.client_obj = Client.objects.create(
+            username="asha", email="asha@example.com", password=hash_password("secret")
+        )
+
+    def post(self, name, payload, token=None):
+        headers = {"HTTP_AUTHORIZATION": f"Token {token}"} if token else {}
+        return self.client.post(
+            reverse(name), json.dumps(payload), content_type="application/json", **headers
+        )
+
+
+class RegisterTests(AuthQueryCountTestCase):
+    def test_new_email_is_a_single_insert(self):
+        with self.assertNumQueries(3):
+            response = self.post(
+                "register", {"username": "ravi", "email": "ravi@example.com", "password": "pw"}
+            )
+        self.assertEqual(response.status_code, 201)
+        client = Client.objects.get(email="ravi@example.com")
+        self.assertEqual(response.json()["token"], str(client.authToken))
+        self.assertTrue(check_password("pw", client.password))
+
+    def test_other_unique_columns_keep_the_database_error(self):
+        with self.assertRaises(IntegrityError) as caught:
+            Client.objects.create(username="ravi", email="ravi@example.com", authToken=self.client_obj.authToken)
+        self.assertNotIsInstance(caught.exception, ValidationError)
+
+    def test_existing_email_is_rejected_without_its_token(self):
+        response = self.post(
+            "register", {"username": "asha", "email": "asha@example.com", "password": "pw"}
+        )
+        self.assertEqual(response.status_code, 409)
+        self.assertNotIn(str(self.client_obj.authToken), response.content.decode())
+        self.assertEqual(Client.objects.filter(email="asha@example.com").count(), 1)
+        self.client_obj.refresh_from_db()
+        self.assertTrue(check_password("secret", self.client_obj.password))
+
+
+class LoginTests(AuthQueryCountTestCase):
+    def test_login_checks_hash_then_rotates_token(self):
+        with self.assertNumQueries(2):
+            response = self.post("login", {"email": "asha@example.com", "password": "secret"})
+        self.assertEqual(response.status_code, 200)
+        self.client_obj.refresh_from_db()
+        self.assertEqual(response.json()["token"], str(self.client_obj.authToken))
+
+    def test_wrong_password(self):
+        old_token = self.client_obj.authToken
+        with self.assertNumQueries(1):
+            response = self.post("login", {"email": "asha@example.com", "password": "nope"})
+        self.assertEqual(response.status_code, 401)
+        self.client_obj.refresh_from_db()
+        self.assertEqual(self.client_obj.authToken, old_token)
+
+    def test_unknown_email_looks_like_a_wrong_password(self):
+        with mock.patch("authentication.views.verify_password", wraps=verify_password) as verify:
+            unknown = self.post("login", {"email": "nobody@example.com", "password": "secret"})
+            wrong = self.post("login", {"email": "asha@example.com", "password": "nope"})
+        self.assertEqual((unknown.status_code, unknown.content), (wrong.status_code, wrong.content))
+        self.assertEqual(unknown.status_code, 401)
+        # The KDF runs either way
+        self.assertEqual(verify.call_count, 2)
+
+    def test_plaintext_password_is_hashed_on_login(self):
+        Client.objects.filter(pk=self.client_obj.pk).update(password="legacy")
+        with self.assertNumQueries(2):
+            response = self.post("login", {"email": "asha@example.com", "password": "legacy"})
+        self.assertEqual(response.status_code, 200)
+        self.client_obj.refresh_from_db()
+        self.assertEqual(identify_hasher(self.client_obj.password).algorithm, "pbkdf2_sha256")
+        self.assertTrue(check_password("legacy", self.client_obj.password))
+
+    def test_wrong_password_for_plaintext_row(self):
+        Client.objects.filter(pk=self.client_obj.pk).update(password="legacy")
+        response = self.post("login", {"email": "asha@example.com", "password": "legac"})
+        self.assertEqual(response.status_code, 401)
+        self.client_obj.refresh_from_db()
+        self.assertEqual(self.client_obj.password, "legacy")
+
+    def test_cost_change_rehashes_on_login(self):
+        with self.settings(PASSWORD_HASH_ITERATIONS=2000):
+            response = self.post("login", {"email": "asha@example.com", "password": "secret"})
+        self.assertEqual(response.status_code, 200)
+        self.client_obj.refresh_from_db()
+        self.assertIn("$2000$", self.client_obj.password)
+
+
+@mock.patch("authentication.views.verify_google_id_token")
+class GoogleLoginTests(AuthQueryCountTestCase):
+    def test_existing_client(self, verify):
+        verify.return_value = {"email": "asha@example.com"}
+        old_token = self.client_obj.authToken
+        with self.assertNumQueries(2):
+            response = self.post(
+                "google_login",
+                {"id_token": "x", "username": "asha.g", "email": "asha@example.com"},
+            )
+        self.assertEqual(response.status_code, 200)
+        self.client_obj.refresh_from_db()
+        self.assertEqual(self.client_obj.username, "asha.g")
+        self.assertNotEqual(self.client_obj.authToken, old_token)
+        self.assertEqual(response.json()["token"], str(self.client_obj.authToken))
+
+    def test_concurrent_insert_logs_into_the_existing_client(self, verify):
+        verify.return_value = {"email": "asha@example.com"}
+        get = QuerySet.get
+        calls = []
+
+        def missing_once(queryset, *args, **kwargs):
+            # The first lookup runs before the other request's INSERT commits
+            calls.append(kwargs)
+            if len(calls) == 1:
+                raise Client.DoesNotExist
+            return get(queryset, *args, **kwargs)
+
+        with mock.patch.object(QuerySet, "get", missing_once):
+            response = self.post(
+                "google_login",
+                {"id_token": "x", "username": "asha.g", "email": "asha@example.com"},
+            )
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(len(calls), 2)
+        self.assertEqual(Client.objects.filter(email="asha@example.com").count(), 1)
+
+    def test_new_client(self, verify):
+        verify.return_value = {"email": "ravi@example.com"}
+        with self.assertNumQueries(6):
+            response = self.post(
+                "google_login",
+                {"id_token": "x", "username": "ravi", "email": "ravi@example.com"},
+            )
+        self.assertEqual(response.status_code, 201)
+        client = Client.objects.get(email="ravi@example.com")
+        self.assertEqual(response.json()["token"], str(client.authToken))
+
+
+class ClientDetailsTests(AuthQueryCountTestCase):
+    details = {"name": "Asha", "phone": "9876543210", "gender": "Female", "aadhaar": "234567890123"}
+
+    def test_add_details(self):
+        with self.assertNumQueries(3):
+            response = self.post("add_client_details", self.details, token=self.client_obj.authToken)
+        self.assertEqual(response.json()["message"], "Client details added successfully")
+        self.assertEqual(ClientDetails.objects.get(client=self.client_obj).phone, "9876543210")
+
+    def test_update_details(self):
+        ClientDetails.objects.create(client=self.client_obj, **self.details)
+        with self.assertNumQueries(2):
+            response = self.post(
+                "add_client_details",
+                {**self.details, "name": "Asha K"},
+                token=self.client_obj.authToken,
+            )
+        self.assertEqual(response.json()["message"], "Client details updated successfully")
+        self.assertEqual(ClientDetails.objects.get(client=self.client_obj).name, "Asha K")
+
+    def test_get_details_is_one_join_on_cache_miss(self):
+        ClientDetails.objects.create(client=self.client_obj, **self.details)
+        with self.assertNumQueries(1):
+            response = self.post("get_client_details", {}, token=self.client_obj.authToken)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["data"]["details"]["phone"], "9876543210")
+
+    def test_get_details_with_cached_client(self):
+        ClientDetails.objects.create(client=self.client_obj, **self.details)
+        self.post("add_client_details", self.details, token=self.client_obj.authToken)
+        with self.assertNumQueries(1):
+            response = self.post("get_client_details", {}, token=self.client_obj.authToken)
+        self.assertEqual(response.json()["data"]["details"]["name"], "Asha")
+
+    def test_cached_client_is_a_fresh_instance_per_request(self):
+        first = resolve_client(self.client_obj.authToken)
+        first.username = "changed"
+        with self.assertNumQueries(0):
+            second = resolve_client(self.client_obj.authToken)
+        self.assertIsNot(second, first)
+        self.assertEqual((second.pk, second.username), (self.client_obj.pk, "asha"))
+        self.assertFalse(second._state.adding)
+
+    def test_get_details_without_details(self):
+        with self.assertNumQueries(1):
+            response = self.post(
+                "get_client_details", {"authToken": str(self.client_obj.authToken)}
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertIsNone(response.json()["data"]["details"])
+
+    def test_get_details_invalid_token(self):
+        with self.assertNumQueries(0):
+            response = self.post("get_client_details", {}, token="not-a-uuid")
+        self.assertEqual(response.status_code, 401)
+
+
+class ClientTokenCacheTests(AuthQueryCountTestCase):
+    def test_invalidate_drops_only_that_clients_tokens(self):
+        other = Client.objects.create(username="ravi", email="ravi@example.com", password="x")
+        resolve_client(self.client_obj.authToken)
+        resolve_client(other.authToken)
+        invalidate_client(self.client_obj.pk)
+        self.assertIsNone(cached_client(self.client_obj.authToken))
+        self.assertEqual(cached_client(other.authToken).pk, other.pk)
+
+    def test_index_follows_eviction_and_expiry(self):
+        now = [0]
+        cache = _ClientTokenCache(maxsize=2, ttl=10, timer=lambda: now[0])
+        cache["a"] = (1, "default", ())
+        cache["b"] = (1, "default", ())
+        cache["c"] = (2, "default", ())
+        self.assertEqual(dict(cache.tokens_by_client), {1: {"b"}, 2: {"c"}})
+        now[0] = 20
+        cache.expire()
+        self.assertEqual(dict(cache.tokens_by_client), {})
+        cache["d"] = (3, "default", ())
+        del cache["d"]
+        self.assertEqual(dict(cache.tokens_by_client), {})
+
+
+class EndpointBudgetTests(BudgetTestMixin, AuthQueryCountTestCase):
+    """Query, size and time budgets of every authentication endpoint."""
+
+    budgets = {
+        "register": Budget(queries=1),
+        "login": Budget(queries=2),
+        "google_login": Budget(queries=2),
+        "add_client_details": Budget(queries=3),
+        "get_client_details": Budget(queries=1),
+        "get_renter_details": Budget(queries=1),
+    }
+
+    def test_every_endpoint_has_a_budget(self):
+        self.assertBudgetsCover(auth_urls.urlpatterns)
+
+    def test_accounts(self):
+        response = self.request_within_budget(
+            "register", {"username": "ravi", "email": "ravi@example.com", "password": "pw"}
+        )
+        self.assertEqual(response.status_code, 201)
+        response = self.request_within_budget("login", {"email": "ravi@example.com", "password": "pw"})
+        self.assertEqual(response.status_code, 200)
+
+        with mock.patch("authentication.views.verify_google_id_token") as verify:
+            verify.return_value = {"email": "meera@example.com"}
+            response = self.request_within_budget(
+                "google_login", {"id_token": "x", "username": "meera", "email": "meera@example.com"}
+            )
+        self.assertEqual(response.status_code, 201)
+
+    def test_details(self):
+        token = self.client_obj.authToken
+        response = self.request_within_budget("add_client_details", ClientDetailsTests.details, token=token)
+        self.assertEqual(response.status_code, 200)
+        clear_client_cache()
+        response = self.request_within_budget("get_client_details", {}, token=token)
+        self.assertEqual(response.json()["data"]["details"]["name"], "Asha")
+
+        renter = Renter.objects.create(
+            full_name="Fleet", email="fleet@example.com", phone="9876500000", gender="Other", aadhaar="345678901234"
+        )
+        response = self.request_within_budget("get_renter_details", {"renter_id": str(renter.user_id)})
+        self.assertEqual(response.json()["full_name"], "Fleet")
+
+
+class AdminChangelistTests(TestCase):
+    """Admin pages of clients and renters run a fixed number of queries, however many rows they show."""
+
+    max_queries = 12
+    rows = 20
+
+    @classmethod
+    def setUpTestData(cls):
+        User = get_user_model()
+        cls.admin_user = User.objects.create_superuser("admin", "admin@example.com", "secret")
+        for i in range(cls.rows):
+            staff = User.objects.create_user(f"staff{i}")
+            Renter.objects.create(
+                full_name=f"Renter {i}",
+                email=f"renter{i}@example.com",
+                phone=f"98765{i:05d}",
+                gender="Other",
+                aadhaar=f"3456789{i:05d}",
+                addedby=staff,
+            )
+            client = Client.objects.create(username=f"client{i}", email=f"client{i}@example.com", password="x")
+            ClientDetails.objects.create(
+                client=client, name=f"Client {i}", phone=f"91234{i:05d}", gender="Other", aadhaar=f"2345678{i:05d}"
+            )
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def get(self, name):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse(name))
+        self.assertEqual(response.status_code, 200)
+        statements = [query["sql"] for query in captured.captured_queries]
+        self.assertLessEqual(len(statements), self.max_queries, f"{name}:\n{query_diff(statements)}")
+        return response
+
+    def test_changelists_do_not_query_per_row(self):
+        for model in ("client", "clientdetails", "renter"):
+            with self.subTest(model=model):
+                response = self.get(f"admin:authentication_{model}_changelist")
+                self.assertEqual(response.context["cl"].result_count, self.rows)
+
+    def test_foreign_key_widgets_do_not_list_every_row(self):
+        self.assertNotContains(self.get("admin:authentication_clientdetails_add"), "client19@example.com")
+        self.assertNotContains(self.get("admin:authentication_renter_add"), "staff19")
+
+    def test_renter_import(self):
+        upload = io.BytesIO(
+            b"email,full_name,phone,gender,aadhaar\n"
+            b"new@example.com,New Renter,9000000001,Other,123412341234\n"
+            b"renter0@example.com,Renamed,9876500000,Other,345678900000\n"
+            b"clash@example.com,Clash,9876500001,Other,999988887777\n"
+        )
+        upload.name = "renters.csv"
+        response = self.client.post(reverse("admin:authentication_renter_import"), {"file": upload})
+        self.assertEqual((response.context["result"].saved, response.context["result"].failed), (2, 1))
+        self.assertContains(response, "phone: 9876500001 already belongs to renter1@example.com")
+
+        self.assertEqual(Renter.objects.get(email="new@example.com").addedby, self.admin_user)
+        renamed = Renter.objects.get(email="renter0@example.com")
+        self.assertEqual(renamed.full_name, "Renamed")
+        # Who added an existing renter is kept
+        self.assertEqual(renamed.addedby.username, "staff0")
+
+
+class KeyServer(ThreadingHTTPServer):
+    """Local stand-in for Google's cert endpoint; serves whatever ``keys`` holds."""
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), KeyServerHandler)
+        self.keys = {}
+        self.cache_control = "public, max-age=3600"
+        self.status = 200
+        self.hits = 0
+
+    @property
+    def url(self):
+        return f"http://127.0.0.1:{self.server_port}/certs"
+
+
+class KeyServerHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.hits += 1
+        body = json.dumps(self.server.keys).encode()
+        self.send_response(self.server.status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Cache-Control", self.server.cache_control)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+class GoogleCertCacheTests(TestCase):
+    audience = "horizoon-test.apps.googleusercontent.com"
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.key_pairs = {kid: rsa.newkeys(1024) for kid in ("key-1", "key-2")}
+        cls.server = KeyServer()
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.settings_override = override_settings(GOOGLE_CERTS_URL=cls.server.url)
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        clear_google_certs()
+        self.server.keys = {}
+        self.serve("key-1")
+        self.server.cache_control = "public, max-age=3600"
+        self.server.status = 200
+        self.server.hits = 0
+
+    def serve(self, *kids):
+        self.server.keys = {kid: self.key_pairs[kid][0].save_pkcs1().decode() for kid in kids}
+
+    def make_token(self, kid="key-1", **claims):
+        now = int(time.time())
+        payload = {
+            "iss": "https://accounts.google.com",
+            "aud": self.audience,
+            "sub": "1234567890",
+            "email": "asha@example.com",
+            "iat": now,
+            "exp": now + 3600,
+            **claims,
+        }
+        signer = crypt.RSASigner.from_string(self.key_pairs[kid][1].save_pkcs1().decode(), key_id=kid)
+        return jwt.encode(signer, payload).decode()
+
+    def test_verifies_locally_after_first_fetch(self):
+        for _ in range(3):
+            claims = verify_google_id_token(self.make_token(), self.audience)
+        self.assertEqual(claims["email"], "asha@example.com")
+        self.assertEqual(self.server.hits, 1)
+
+    def test_no_store_is_not_cached(self):
+        self.server.cache_control = "no-store"
+        verify_google_id_token(self.make_token(), self.audience)
+        verify_google_id_token(self.make_token(), self.audience)
+        self.assertEqual(self.server.hits, 2)
+
+    def test_unknown_key_id_forces_refetch(self):
+        verify_google_id_token(self.make_token(), self.audience)
+        self.serve("key-1", "key-2")
+        claims = verify_google_id_token(self.make_token(kid="key-2"), self.audience)
+        self.assertEqual(claims["sub"], "1234567890")
+        self.assertEqual(self.server.hits, 2)
+
+    def test_unknown_key_ids_refetch_at_most_once_per_interval(self):
+        verify_google_id_token(self.make_token(), self.audience)
+        for _ in range(3):
+            with self.assertRaises(ValueError):
+                verify_google_id_token(self.make_token(kid="key-2"), self.audience)
+        self.assertEqual(self.server.hits, 2)
+
+        # A key found by a refetch is cached like the others
+        self.serve("key-1", "key-2")
+        with self.settings(GOOGLE_CERTS_MIN_REFRESH_INTERVAL=0):
+            verify_google_id_token(self.make_token(kid="key-2"), self.audience)
+        verify_google_id_token(self.make_token(kid="key-2"), self.audience)
+        self.assertEqual(self.server.hits, 3)
+
+    def test_rejects_wrong_audience_issuer_and_signature(self):
+        with self.assertRaises(ValueError):
+            verify_google_id_token(self.make_token(), "someone-else")
+        with self.assertRaises(ValueError):
+            verify_google_id_token(self.make_token(iss="https://evil.example"), self.audience)
+        with self.assertRaises(ValueError):
+            verify_google_id_token(self.make_token(kid="key-2")[:-4] + "AAAA", self.audience)
+
+    def test_refreshes_in_background_before_expiry(self):
+        with self.settings(GOOGLE_CERTS_REFRESH_MARGIN=7200):
+            verify_google_id_token(self.make_token(), self.audience)
+            verify_google_id_token(self.make_token(), self.audience)
+            deadline = time.monotonic() + 5
+            while self.server.hits < 2 and time.monotonic() < deadline:
+                time.sleep(0.01)
+        self.assertEqual(self.server.hits, 2)
+
+    def test_keeps_cached_certs_when_refresh_fails(self):
+        self.server.cache_control = "max-age=0"
+        verify_google_id_token(self.make_token(), self.audience)
+        self.server.status = 503
+        with self.assertLogs("authentication.google_certs", "WARNING"):
+            claims = verify_google_id_token(self.make_token(), self.audience)
+        self.assertEqual(claims["email"], "asha@example.com")
+        self.assertEqual(self.server.hits, 2)
+
+    def test_google_login_view(self):
+        with mock.patch("authentication.views.GOOGLE_CLIENT_ID", self.audience):
+            response = self.client.post(
+                reverse("google_login"),
+                json.dumps({"id_token": self.make_token(), "username": "asha", "email": "asha@example.com"}),
+                content_type="application/json",
+            )
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Client.objects.filter(email="asha@example.com").exists())
+
+    def test_cache_lifetime(self):
+        self.assertEqual(cache_lifetime({"Cache-Control": "public, max-age=100", "Age": "40"}, 5), 60)
+        self.assertEqual(cache_lifetime({"Cache-Control": "no-cache"}, 5), 0)
+        self.assertEqual(cache_lifetime({}, 5), 5)
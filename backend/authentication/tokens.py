@@ -0,0 +1,205 @@
+import threading
+import time
+import uuid
+from collections import defaultdict
+
+from cachetools import Cache, TTLCache
+from django.conf import settings
+from django.db import connections, router
+from django.utils import timezone
+
+from .models import Client
+
+TOKEN_KEYWORDS = ("token", "bearer")
+
+
+class _ClientTokenCache(TTLCache):
+    """TTLCache of token -> client row that also indexes its tokens by client id."""
+
+    def __init__(self, maxsize, ttl, timer=time.monotonic):
+        super().__init__(maxsize, ttl, timer)
+        self.tokens_by_client = defaultdict(set)
+
+    def __setitem__(self, token, row):
+        super().__setitem__(token, row)
+        self.tokens_by_client[row[0]].add(token)
+
+    def __delitem__(self, token):
+        client_id = Cache.__getitem__(self, token)[0]
+        try:
+            super().__delitem__(token)
+        finally:
+            self._forget(token, client_id)
+
+    def expire(self, time=None):
+        # TTLCache drops expired rows without going through __delitem__
+        expired = super().expire(time)
+        for token, row in expired:
+            self._forget(token, row[0])
+        return expired
+
+    def _forget(self, token, client_id):
+        tokens = self.tokens_by_client.get(client_id)
+        if tokens is not None:
+            tokens.discard(token)
+            if not tokens:
+                del self.tokens_by_client[client_id]
+
+
+# token -> (client id, database, column values), bounded and short-lived;
+# shared by every thread of the process. Rows, not instances: each request
+# builds its own Client, so one request's changes to it can't leak into another.
+_client_cache = _ClientTokenCache(
+    maxsize=settings.CLIENT_TOKEN_CACHE_SIZE,
+    ttl=settings.CLIENT_TOKEN_CACHE_TTL,
+)
+_client_cache_lock = threading.Lock()
+
+
+def _cache_client(token, client):
+    values = tuple(getattr(client, field.attname) for field in Client._meta.concrete_fields)
+    with _client_cache_lock:
+        _client_cache[token] = (client.pk, client._state.db, values)
+
+
+def _cached(token):
+    with _client_cache_lock:
+        row = _client_cache.get(token)
+    if row is None:
+        return None
+    _, using, values = row
+    return Client.from_db(using, [field.attname for field in Client._meta.concrete_fields], values)
+
+
+def parse_token(raw):
+    try:
+        return uuid.UUID(str(raw))
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def resolve_client(raw_token):
+    """Client owning ``raw_token``, served from the per-process cache when possible."""
+    token = parse_token(raw_token)
+    if token is None:
+        return None
+
+    client = _cached(token)
+    if client is not None:
+        return client
+
+    client = Client.objects.filter(authToken=token).first()
+    if client is not None:
+        _cache_client(token, client)
+    return client
+
+
+async def aresolve_client(raw_token):
+    """``resolve_client`` for async views: same cache, async ORM on a miss."""
+    token = parse_token(raw_token)
+    if token is None:
+        return None
+
+    client = _cached(token)
+    if client is not None:
+        return client
+
+    client = await Client.objects.filter(authToken=token).afirst()
+    if client is not None:
+        _cache_client(token, client)
+    return client
+
+
+def cached_client(raw_token):
+    """Client for ``raw_token`` if it is in the per-process cache, without touching the database."""
+    token = parse_token(raw_token)
+    if token is None:
+        return None
+    return _cached(token)
+
+
+def rotate_auth_token(values=None, **filters):
+    """
+    Give the client matching ``filters`` (equality on model fields) a fresh
+    authToken in a single ``UPDATE ... RETURNING id``, also setting any
+    extra field ``values``. Returns ``(client_id, new_token)``, or
+    ``(None, None)`` if nothing matched. Evicts the client's old cached tokens.
+    """
+    new_token = uuid.uuid4()
+    using = router.db_for_write(Client)
+    connection = connections[using]
+    opts = Client._meta
+    qn = connection.ops.quote_name
+
+    def prep(name, value):
+        field = opts.get_field(name)
+        return qn(field.column), field.get_db_prep_value(value, connection)
+
+    assignments = [prep("authToken", new_token), prep("updatedAt", timezone.now())]
+    assignments += [prep(name, value) for name, value in (values or {}).items()]
+    conditions = [prep(name, value) for name, value in filters.items()]
+    sql = "UPDATE {} SET {} WHERE {}".format(
+        qn(opts.db_table),
+        ", ".join(f"{column} = %s" for column, _ in assignments),
+        " AND ".join(f"{column} = %s" for column, _ in conditions),
+    )
+    params = [value for _, value in assignments + conditions]
+
+    with connection.cursor() as cursor:
+        if connection.features.can_return_columns_from_insert:
+            cursor.execute(f"{sql} RETURNING {qn(opts.pk.column)}", params)
+            row = cursor.fetchone()
+            client_id = row[0] if row else None
+        else:
+            # Backends without RETURNING: look the id up, then update by it
+            client_id = Client.objects.using(using).filter(**filters).values_list("pk", flat=True).first()
+            if client_id is not None:
+                cursor.execute(sql, params)
+
+    if client_id is None:
+        return None, None
+    invalidate_client(client_id)
+    return client_id, new_token
+
+
+def invalidate_client(client_id):
+    """Drop every cached token of a client; call whenever its authToken is rotated."""
+    with _client_cache_lock:
+        for token in list(_client_cache.tokens_by_client.get(client_id, ())):
+            _client_cache.pop(token, None)
+
+
+def clear_client_cache():
+    with _client_cache_lock:
+        _client_cache.clear()
+
+
+def get_header_token(request):
+    """Token from an ``Authorization: Token <uuid>`` (or ``Bearer <uuid>``) header."""
+    header = request.META.get("HTTP_AUTHORIZATION", "").split()
+    if len(header) == 2 and header[0].lower() in TOKEN_KEYWORDS:
+        return header[1]
+    if len(header) == 1:
+        return header[0]
+    return None
+
+
+def authenticate_client(request, data=None):
+    """
+    Resolve the calling client from the Authorization header, falling back
+    to the ``authToken`` field of the parsed JSON body for older clients.
+    Returns ``(token, client)``; ``client`` is None for unknown tokens.
+    """
+    token = get_header_token(request) or (data or {}).get("authToken")
+    if not token:
+        return None, None
+    return token, resolve_client(token)
+
+
+async def aauthenticate_client(request, data=None):
+    """``authenticate_client`` for async views."""
+    token = get_header_token(request) or (data or {}).get("authToken")
+    if not token:
+        return None, None
+    return token, await aresolve_client(token)
+
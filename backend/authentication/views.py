@@ -1,33 +1,43 @@
 import json
 import uuid
 
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
 from django.db import IntegrityError
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
-from google.auth.transport import requests as google_requests
-from google.oauth2 import id_token
-from rest_framework.decorators import api_view
+from rest_framework.decorators import api_view, authentication_classes
 from rest_framework.views import status
 
+from backend.routers import pin_primary, read_from_replica
 from backend.settings import GOOGLE_CLIENT_ID
 
+from .google_certs import verify_google_id_token
 from .models import Client, ClientDetails, Renter
+from .passwords import PasswordHasherBusy, dummy_hash, hash_password, verify_password
+from .tokens import (
+    authenticate_client,
+    cached_client,
+    get_header_token,
+    invalidate_client,
+    parse_token,
+    rotate_auth_token,
+)
 
 
 def create_client(username, email, password):
-    try:
-        if Client.objects.filter(email=email).exists():
-            client = Client.objects.get(email=email)
-            return str(client.authToken)
-        client = Client(username=username, email=email, password=password)
-        client.save()
-        return str(client.authToken)
-    except IntegrityError:
-        return JsonResponse({"error": "Username already exists"}, status=409)
+    """
+    Token of a new client. Raises ValidationError when the email is already
+    registered: the unique email index rejects the INSERT.
+    """
+    client = Client(username=username, email=email, password=hash_password(password))
+    client.save()
+    return str(client.authToken)
 
 
 @csrf_exempt
 @api_view(["POST"])
+@authentication_classes([])
 def register(request):
     if request.method == "POST":
         try:
@@ -40,6 +50,7 @@ def register(request):
                 return JsonResponse({"error": "Missing required fields"}, status=400)
 
             auth_token = create_client(username, email, password)
+            pin_primary(auth_token)
             return JsonResponse(
                 {
                     "token": auth_token,
@@ -48,8 +59,13 @@ def register(request):
                 },
                 status=201,
             )
+        except ValidationError:
+            # Logging in is the only way to get an existing account's token
+            return JsonResponse({"error": "Email already registered"}, status=409)
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON format"}, status=400)
+        except PasswordHasherBusy as e:
+            return JsonResponse({"error": str(e)}, status=503)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
     return JsonResponse({"error": "Method not allowed"}, status=405)
@@ -57,6 +73,7 @@ def register(request):
 
 @csrf_exempt
 @api_view(["POST"])
+@authentication_classes([])
 def google_login(request):
     try:
         data = json.loads(request.body.decode("utf-8"))
@@ -68,11 +85,9 @@ def google_login(request):
         if not all([id_token_str, username, email]):
             return JsonResponse({"error": "Missing required fields"}, status=400)
 
-        # Verify Google ID token
+        # Verify Google ID token against the locally cached signing certs
         client_id = GOOGLE_CLIENT_ID
-        idinfo = id_token.verify_oauth2_token(
-            id_token_str, google_requests.Request(), client_id
-        )
+        idinfo = verify_google_id_token(id_token_str, client_id)
 
         if idinfo["email"] != email:
             return JsonResponse({"error": "Email does not match ID token"}, status=400)
@@ -83,23 +98,22 @@ def google_login(request):
                 email=email,
                 defaults={
                     "username": username,
-                    "password": str(uuid.uuid4()),  # Google users don’t need passwords
+                    "password": make_password(None),  # Google users don’t need passwords
                 },
             )
             if not created:
-                # Update existing client if needed
+                # Update existing client and rotate its token
                 client.username = username
                 client.authToken = uuid.uuid4()
-                client.save()
-            else:
-                # New client, ensure authToken is set
-                client.authToken = uuid.uuid4()
-                client.save()
+                client.save(update_fields=["username", "authToken", "updatedAt"])
+                invalidate_client(client.id)
         except IntegrityError as e:
             return JsonResponse(
                 {"error": "Email or username already exists"}, status=409
             )
 
+        pin_primary(client.authToken)
+
         message = (
             "Google registration successful" if created else "Google login successful"
         )
@@ -127,6 +141,7 @@ def google_login(request):
 
 @csrf_exempt
 @api_view(["POST"])
+@authentication_classes([])
 def login(request):
     if request.method == "POST":
         try:
@@ -142,28 +157,36 @@ def login(request):
             # Check if identifier is an email (contains @) for Client
             if "@" in identifier:
                 # Try to authenticate as Client
-                try:
-                    client = Client.objects.filter(
-                        email=identifier, password=password
-                    ).first()
-                    if client:
-                        new_token = uuid.uuid4()
-                        client.authToken = new_token
-                        client.save()
-                        response_data = {
-                            "user_type": "Client",
-                            "token": str(client.authToken),
-                        }
-                        return JsonResponse(response_data)
-                    else:
-                        return JsonResponse({"error": "Invalid password"}, status=401)
-                except Exception:
-                    return JsonResponse(
-                        {"error": "No client found with this email"}, status=404
-                    )
+                row = (
+                    Client.objects.filter(email=identifier)
+                    .values_list("id", "password")
+                    .first()
+                )
+                # An unknown email and a wrong password look the same, and
+                # take as long: both run the KDF
+                client_id, stored_password = row or (None, dummy_hash())
+                valid, new_hash = verify_password(password, stored_password)
+                if row is None or not valid:
+                    return JsonResponse({"error": "Invalid credentials"}, status=401)
+
+                # Rotate the token, and upgrade a legacy or outdated hash, in one UPDATE
+                client_id, new_token = rotate_auth_token(
+                    values={"password": new_hash} if new_hash else None,
+                    id=client_id,
+                )
+                if client_id is None:
+                    return JsonResponse({"error": "Invalid credentials"}, status=401)
+                pin_primary(new_token)
+                response_data = {
+                    "user_type": "Client",
+                    "token": str(new_token),
+                }
+                return JsonResponse(response_data)
 
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON data"}, status=400)
+        except PasswordHasherBusy as e:
+            return JsonResponse({"error": str(e)}, status=503)
         except Exception as e:
             return JsonResponse({"error": str(e)}, status=500)
 
@@ -172,6 +195,7 @@ def login(request):
 
 @csrf_exempt
 @api_view(["POST"])
+@authentication_classes([])
 def add_client_details(request):
     if request.method == "POST":
         try:
@@ -179,18 +203,14 @@ def add_client_details(request):
             data = json.loads(request.body.decode("utf-8"))
 
             # Get auth token from headers or body
-            auth_token = data.get("authToken")
+            auth_token, client = authenticate_client(request, data)
             if not auth_token:
                 return JsonResponse(
                     {"error": "Authorization token is required"}, status=400
                 )
-
-            try:
-                # Find client by auth token
-                client = Client.objects.get(authToken=auth_token)
-            except Exception as e:
+            if client is None:
                 return JsonResponse(
-                    {"error": f"Invalid authentication token provided: {str(e)}"},
+                    {"error": "Invalid authentication token provided"},
                     status=400,
                 )
 
@@ -201,62 +221,49 @@ def add_client_details(request):
                 gender = data["gender"]
                 aadhaar = data["aadhaar"]
 
-                if ClientDetails.objects.filter(client=client).exists():
-                    try:
-                        cd = ClientDetails.objects.get(client=client)
-
-                        cd.name = name
-                        cd.phone = phone
-                        cd.gender = gender
-                        cd.aadhaar = aadhaar
-                        cd.save()
-                    except:
-                        return JsonResponse(
-                            {
-                                "success": False,
-                                "message": "This Phone Number Already Registered",
-                            },
-                            status=401,
-                        )
+                fields = {
+                    "name": name,
+                    "phone": phone,
+                    "gender": gender,
+                    "aadhaar": aadhaar,
+                }
 
+                # Update in place first; only clients without details need an INSERT
+                try:
+                    updated = ClientDetails.objects.filter(client=client).update(**fields)
+                except IntegrityError:
                     return JsonResponse(
                         {
-                            "success": True,
-                            "message": "Client details updated successfully",
+                            "success": False,
+                            "message": "This Phone Number Already Registered",
                         },
-                        status=200,
+                        status=401,
                     )
 
-                else:
-                    try:
-                        # Create or update client details
-                        client_details = ClientDetails(
-                            client=client,
-                            name=name,
-                            phone=phone,
-                            gender=gender,
-                            aadhaar=aadhaar,
-                        )
-
-                        client_details.save()
-                    except Exception as e:
-                        return JsonResponse({"error": str(e)}, status=400)
-                        # return JsonResponse(
-                        #     {
-                        #         "success": False,
-                        #         "message": "This Phone Number Already Registered",
-                        #     },
-                        #     status=401,
-                        # )
-
+                if updated:
+                    pin_primary(auth_token)
                     return JsonResponse(
                         {
                             "success": True,
-                            "message": "Client details added successfully",
+                            "message": "Client details updated successfully",
                         },
                         status=200,
                     )
 
+                try:
+                    ClientDetails.objects.create(client=client, **fields)
+                except Exception as e:
+                    return JsonResponse({"error": str(e)}, status=400)
+                pin_primary(auth_token)
+
+                return JsonResponse(
+                    {
+                        "success": True,
+                        "message": "Client details added successfully",
+                    },
+                    status=200,
+                )
+
             except KeyError as e:
                 return JsonResponse(
                     {"error": f"Missing required field: {str(e)}"}, status=400
@@ -273,55 +280,40 @@ def add_client_details(request):
 
 
 @csrf_exempt
+@read_from_replica
 @api_view(["POST"])
+@authentication_classes([])
 def get_client_details(request):
     if request.method == "POST":
         try:
             # Parse request body
             data = json.loads(request.body.decode("utf-8"))
 
-            # Get auth token from request
-            auth_token = data.get("authToken")
+            # Get auth token from headers or body
+            auth_token = get_header_token(request) or data.get("authToken")
             if not auth_token:
                 return JsonResponse(
                     {"error": "Authorization token is required"}, status=400
                 )
 
-            try:
-                # Find client by auth token
-                client = Client.objects.get(authToken=auth_token)
-            except Exception:
-                return JsonResponse(
-                    {"error": "Invalid authentication token"}, status=401
+            client = cached_client(auth_token)
+            if client is not None:
+                client_details = ClientDetails.objects.filter(client=client).first()
+            else:
+                # Cache miss: load the client and its details in one LEFT JOIN
+                token = parse_token(auth_token)
+                client = token and (
+                    Client.objects.select_related("clientdetails")
+                    .filter(authToken=token)
+                    .first()
                 )
-
-            try:
-                # Get client details
-                client_details = ClientDetails.objects.get(client=client)
-
-                # Prepare response data
-                response_data = {
-                    "client": {
-                        "username": client.username,
-                        "email": client.email,
-                    },
-                    "details": {
-                        "name": client_details.name,
-                        "phone": client_details.phone,
-                        "gender": client_details.gender,
-                    },
-                }
-
+                client_details = getattr(client, "clientdetails", None)
+            if client is None:
                 return JsonResponse(
-                    {
-                        "success": True,
-                        "data": response_data,
-                        "message": "Client details retrieved successfully",
-                    },
-                    status=200,
+                    {"error": "Invalid authentication token"}, status=401
                 )
 
-            except Exception as e:
+            if client_details is None:
                 return JsonResponse(
                     {
                         "success": True,
@@ -339,6 +331,28 @@ def get_client_details(request):
                     status=200,
                 )
 
+            # Prepare response data
+            response_data = {
+                "client": {
+                    "username": client.username,
+                    "email": client.email,
+                },
+                "details": {
+                    "name": client_details.name,
+                    "phone": client_details.phone,
+                    "gender": client_details.gender,
+                },
+            }
+
+            return JsonResponse(
+                {
+                    "success": True,
+                    "data": response_data,
+                    "message": "Client details retrieved successfully",
+                },
+                status=200,
+            )
+
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON format"}, status=400)
         except Exception as e:
@@ -348,6 +362,7 @@ def get_client_details(request):
 
 
 @csrf_exempt
+@read_from_replica
 @api_view(["POST"])
 def get_renter_details(request):
     if request.method == "POST":
@@ -0,0 +1,60 @@
+"""
+Database helpers shared by the apps.
+
+``estimated_row_count`` reads the planner's row estimate of a table, for
+tables too big to ``COUNT(*)`` on every admin page view. ``copy_objects``
+writes model instances with PostgreSQL's ``COPY``, which skips building and
+binding a multi-row INSERT.
+"""
+import io
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+def estimated_row_count(model, using):
+    """
+    PostgreSQL's estimate of the rows in ``model``'s table, as of its last
+    ANALYZE; None on other backends and for tables never analyzed.
+    """
+    connection = connections[using or DEFAULT_DB_ALIAS]
+    if connection.vendor != "postgresql":
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = to_regclass(%s)", [model._meta.db_table])
+        row = cursor.fetchone()
+    # -1 until the first ANALYZE since PostgreSQL 14
+    if row is None or row[0] is None or row[0] < 0:
+        return None
+    return row[0]
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n").replace("\r", "\\r")
+
+
+def copy_objects(connection, table, fields, objs):
+    """
+    COPY the ``fields`` of ``objs`` into ``table`` on a PostgreSQL
+    ``connection``, preparing values the way bulk_create would (auto_now
+    fields are stamped).
+    """
+    buffer = io.StringIO()
+    for obj in objs:
+        buffer.write(
+            "\t".join(_copy_value(field.get_db_prep_save(field.pre_save(obj, True), connection)) for field in fields)
+        )
+        buffer.write("\n")
+    buffer.seek(0)
+    sql = "COPY {} ({}) FROM STDIN".format(
+        connection.ops.quote_name(table),
+        ", ".join(connection.ops.quote_name(field.column) for field in fields),
+    )
+    with connection.cursor() as cursor:
+        raw = cursor.cursor
+        if hasattr(raw, "copy_expert"):  # psycopg2
+            raw.copy_expert(sql, buffer)
+        else:  # psycopg 3
+            with raw.copy(sql) as copy:
+                copy.write(buffer.getvalue())
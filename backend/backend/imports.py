@@ -0,0 +1,299 @@
+"""
+Streaming CSV / JSON Lines imports that upsert rows on a natural key.
+
+An ``Import`` names the model, the unique field rows are matched on and
+the fields a file may set. ``read_records`` reads a file one record at a
+time; ``import_records`` validates the records in chunks with each field's
+own ``clean()`` (types, choices, validators; no per-row queries) and
+upserts each chunk in one statement. New rows get defaults for the columns
+a file leaves out; existing rows keep their values for them. JSON Lines
+records should all have the keys of the first.
+
+On PostgreSQL a chunk is COPYed into a temporary table and merged with
+``INSERT ... SELECT ... ON CONFLICT DO UPDATE``: building and binding the
+multi-row INSERT of ``bulk_create(update_conflicts=True)``, used on other
+databases, costs more than validating the rows.
+
+Rows that fail validation, and rows the database rejects, are reported
+with their line number and skipped; the rest of the chunk is still
+written. When a chunk's INSERT fails as a whole (say a unique field other
+than the key collides) it is retried row by row, each in a savepoint, to
+find the culprits. ``ImportAdmin`` adds an upload page to a ModelAdmin.
+"""
+import csv
+import gzip
+import io
+import json
+from typing import Callable, NamedTuple, Optional
+
+from django.core.exceptions import PermissionDenied, ValidationError
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections, transaction
+from django.template.response import TemplateResponse
+from django.urls import path
+
+from backend.db import copy_objects
+from backend.exports import chunked
+
+FORMATS = ("csv", "jsonl")
+CHUNK_ROWS = 1000
+# Errors kept for the report; all of them are counted
+MAX_REPORTED_ERRORS = 1000
+
+
+class Import(NamedTuple):
+    """
+    ``extra_columns`` maps file columns that are not model fields to the
+    field ``prepare`` sets from them. ``prepare(rows, columns, **context)``
+    gets a chunk's validated ``[(line, record, obj)]``, may fill in more of
+    each obj, and returns ``{line: message}`` for rows to skip.
+    ``save(rows, write)`` writes ``[(line, obj)]`` by calling
+    ``write(rows, using)``, once per database.
+    """
+
+    model: type
+    key: str
+    fields: tuple
+    extra_columns: dict = {}
+    prepare: Optional[Callable] = None
+    save: Optional[Callable] = None
+
+
+class RowError(NamedTuple):
+    line: int
+    message: str
+
+
+class ImportResult:
+    def __init__(self):
+        self.read = 0
+        self.saved = 0
+        self.failed = 0
+        self.errors = []
+
+    def error(self, line, message):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append(RowError(line, message))
+
+
+def detect_format(filename):
+    """``(format, gzipped)`` from a file name such as ``vehicles.csv.gz``."""
+    name = filename.lower()
+    gzipped = name.endswith(".gz")
+    if gzipped:
+        name = name[:-3]
+    for fmt in FORMATS:
+        if name.endswith(f".{fmt}"):
+            return fmt, gzipped
+    raise ValueError(f"Can't tell the format of {filename!r}; name it .csv or .jsonl, optionally with .gz.")
+
+
+def open_text(binary, gzipped=False):
+    """Text stream over a binary file object, decompressing it if ``gzipped``."""
+    if gzipped:
+        binary = gzip.GzipFile(fileobj=binary)
+    return io.TextIOWrapper(binary, encoding="utf-8-sig", newline="")
+
+
+def read_records(stream, fmt):
+    """``(line, record)`` per row of ``stream``; a record maps column names to values."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "jsonl":
+        for line, text in enumerate(stream, start=1):
+            if text.strip():
+                try:
+                    yield line, json.loads(text)
+                except ValueError as e:
+                    yield line, e
+    else:
+        raise ValueError(f"Unknown import format {fmt!r}; use one of {', '.join(FORMATS)}.")
+
+
+def _check_columns(spec, columns):
+    unknown = set(columns) - {*spec.fields, *spec.extra_columns}
+    if unknown:
+        raise ValueError(f"Unknown columns: {', '.join(sorted(unknown))}.")
+    required = [
+        name
+        for name in spec.fields
+        if not (field := spec.model._meta.get_field(name)).has_default() and not field.blank and not field.null
+    ]
+    missing = [name for name in required if name not in columns]
+    if spec.key not in columns and spec.key not in missing:
+        missing.insert(0, spec.key)
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}.")
+
+
+def _clean(fields, record, obj):
+    """Set ``obj``'s ``fields`` from ``record``; returns the validation messages."""
+    messages = []
+    for field in fields:
+        value = record.get(field.name)
+        if value is None or value == "":
+            if field.has_default():
+                continue
+            value = None if field.null else value
+        try:
+            setattr(obj, field.attname, field.clean(value, obj))
+        except ValidationError as e:
+            messages.append(f"{field.name}: {' '.join(e.messages)}")
+    return messages
+
+
+def _copy_upsert(spec, update_fields, objs, connection):
+    opts = spec.model._meta
+    fields = [field for field in opts.concrete_fields if field is not opts.auto_field]
+    quote = connection.ops.quote_name
+    table, staging = quote(opts.db_table), quote(f"import_{opts.db_table}")
+    columns = ", ".join(quote(field.column) for field in fields)
+    updates = ", ".join(
+        "{0} = EXCLUDED.{0}".format(quote(opts.get_field(name).column)) for name in update_fields
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TEMPORARY TABLE IF NOT EXISTS {staging} AS SELECT {columns} FROM {table} WITH NO DATA")
+        copy_objects(connection, f"import_{opts.db_table}", fields, objs)
+        cursor.execute(
+            f"INSERT INTO {table} ({columns}) SELECT {columns} FROM {staging} "
+            f"ON CONFLICT ({quote(opts.get_field(spec.key).column)}) DO UPDATE SET {updates}"
+        )
+        cursor.execute(f"TRUNCATE {staging}")
+
+
+def _writer(spec, update_fields, result):
+    manager = spec.model._default_manager
+
+    def upsert(objs, using):
+        manager.using(using).bulk_create(
+            objs, update_conflicts=True, unique_fields=[spec.key], update_fields=update_fields
+        )
+
+    def upsert_chunk(objs, using):
+        connection = connections[using]
+        if connection.vendor == "postgresql":
+            _copy_upsert(spec, update_fields, objs, connection)
+        else:
+            upsert(objs, using)
+
+    def write(rows, using=DEFAULT_DB_ALIAS):
+        """Upsert ``[(line, obj)]`` into ``using``; returns the objs written."""
+        objs = [obj for _, obj in rows]
+        try:
+            with transaction.atomic(using=using):
+                upsert_chunk(objs, using)
+        except DatabaseError:
+            objs = []
+            with transaction.atomic(using=using):
+                for line, obj in rows:
+                    try:
+                        with transaction.atomic(using=using):
+                            upsert([obj], using)
+                    except DatabaseError as e:
+                        result.error(line, str(e).strip().splitlines()[0])
+                    else:
+                        objs.append(obj)
+        result.saved += len(objs)
+        return objs
+
+    return write
+
+
+def import_records(spec, records, chunk_size=CHUNK_ROWS, **context):
+    """
+    Upsert ``records``, ``(line, record)`` pairs, into ``spec.model``.
+    ``context`` is passed on to ``spec.prepare``. Yields the running
+    ImportResult after each chunk; raises ValueError for a file whose
+    columns don't fit.
+    """
+    result = ImportResult()
+    columns = write = fields = None
+
+    for chunk in chunked(records, chunk_size):
+        rows = {}
+        for line, record in chunk:
+            result.read += 1
+            if not isinstance(record, dict):
+                result.error(line, f"Not a JSON object: {record}")
+                continue
+            if columns is None:
+                columns = list(record)
+                _check_columns(spec, columns)
+                fields = [spec.model._meta.get_field(name) for name in spec.fields if name in columns]
+                update_fields = [field.name for field in fields if field.name != spec.key]
+                update_fields += [target for column, target in spec.extra_columns.items() if column in columns]
+                update_fields += [
+                    field.name for field in spec.model._meta.concrete_fields if getattr(field, "auto_now", False)
+                ]
+                write = _writer(spec, update_fields, result)
+            obj = spec.model()
+            messages = _clean(fields, record, obj)
+            if messages:
+                result.error(line, "; ".join(messages))
+                continue
+            # The last row for a key wins, within a chunk as across chunks
+            rows[getattr(obj, spec.key)] = (line, record, obj)
+
+        rows = sorted(rows.values(), key=lambda row: row[0])
+        if spec.prepare and rows:
+            rejected = spec.prepare(rows, columns, **context)
+            for line, message in sorted(rejected.items()):
+                result.error(line, message)
+            rows = [row for row in rows if row[0] not in rejected]
+        if rows:
+            pairs = [(line, obj) for line, _, obj in rows]
+            if spec.save:
+                spec.save(pairs, write)
+            else:
+                write(pairs)
+        yield result
+
+
+class ImportAdmin:
+    """ModelAdmin mixin adding an upload page for ``import_spec``, at ``import/``."""
+
+    import_spec = None
+
+    def get_import_context(self, request):
+        """Keyword arguments for the spec's ``prepare``."""
+        return {}
+
+    def get_urls(self):
+        opts = self.model._meta
+        return [
+            path(
+                "import/",
+                self.admin_site.admin_view(self.import_view),
+                name=f"{opts.app_label}_{opts.model_name}_import",
+            ),
+        ] + super().get_urls()
+
+    def import_view(self, request):
+        """Import an uploaded file and list the rows that failed."""
+        if not (self.has_add_permission(request) and self.has_change_permission(request)):
+            raise PermissionDenied
+        result = error = None
+        upload = request.FILES.get("file") if request.method == "POST" else None
+        if upload is not None:
+            try:
+                fmt, gzipped = detect_format(upload.name)
+                records = read_records(open_text(upload.file, gzipped), fmt)
+                for result in import_records(self.import_spec, records, **self.get_import_context(request)):
+                    pass
+                if result is None:
+                    error = f"{upload.name} has no rows."
+            except (ValueError, OSError) as e:
+                error = str(e)
+
+        context = {
+            **self.admin_site.each_context(request),
+            "title": f"Import {self.model._meta.verbose_name_plural}",
+            "opts": self.model._meta,
+            "columns": [*self.import_spec.fields, *self.import_spec.extra_columns],
+            "key": self.import_spec.key,
+            "result": result,
+            "error": error,
+        }
+        return TemplateResponse(request, "admin/import.html", context)
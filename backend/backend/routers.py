@@ -0,0 +1,121 @@
+"""
+Primary/replica routing.
+
+Writes, and every read outside a ``read_from_replica`` view, go to the
+primary (``default``). A view marked ``read_from_replica`` sends its reads,
+ORM and raw SQL alike, to one of settings.DATABASE_REPLICAS, picked per
+request. Raw SQL gets its alias from ``router.db_for_read(Model)``.
+
+Replicas lag behind the primary, so a client that has just written keeps
+reading from the primary for REPLICA_PIN_SECONDS: write views call
+``pin_primary`` with the client's token, and ``read_from_replica`` checks
+for a pin before choosing a replica. Views running inside a transaction on
+the primary read from it too. Pins live in the default cache, which
+must be shared (REDIS_URL) when more than one process serves requests.
+"""
+import json
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Alias the current request reads from; None means the primary
+_read_alias = ContextVar("read_alias", default=None)
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        # Inside a transaction on the primary (ATOMIC_REQUESTS, a TestCase) a
+        # replica can't see the uncommitted writes. Asked where the query runs,
+        # which for async views is the thread that holds the connection.
+        # Answer even outside replica views: left to Django, a related lookup
+        # would read from its instance's database, which may be a shard
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return DEFAULT_DB_ALIAS
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Replicas hold the same rows as the primary
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas get the schema through replication
+        return db == DEFAULT_DB_ALIAS
+
+
+def _pin_key(token):
+    return f"replica-pin:{token.hex}"
+
+
+def _request_token(request):
+    from authentication.tokens import get_header_token, parse_token
+
+    raw_token = get_header_token(request)
+    if raw_token is None and request.body:
+        try:
+            raw_token = json.loads(request.body).get("authToken")
+        except (ValueError, AttributeError):
+            pass
+    return parse_token(raw_token)
+
+
+def pin_primary(raw_token):
+    """Read from the primary for REPLICA_PIN_SECONDS on behalf of this client."""
+    from authentication.tokens import parse_token
+
+    token = parse_token(raw_token)
+    if settings.DATABASE_REPLICAS and token is not None:
+        cache.set(_pin_key(token), True, settings.REPLICA_PIN_SECONDS)
+
+
+async def apin_primary(raw_token):
+    """``pin_primary`` for async views."""
+    from authentication.tokens import parse_token
+
+    token = parse_token(raw_token)
+    if settings.DATABASE_REPLICAS and token is not None:
+        await cache.aset(_pin_key(token), True, settings.REPLICA_PIN_SECONDS)
+
+
+def _choose(pinned):
+    return None if pinned else random.choice(settings.DATABASE_REPLICAS)
+
+
+def read_from_replica(view):
+    """Route the reads of a read-only view, sync or async, to a replica."""
+    if iscoroutinefunction(view):
+
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if not settings.DATABASE_REPLICAS:
+                return await view(request, *args, **kwargs)
+            token = _request_token(request)
+            pinned = token is not None and await cache.aget(_pin_key(token), False)
+            reset = _read_alias.set(_choose(pinned))
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _read_alias.reset(reset)
+
+    else:
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if not settings.DATABASE_REPLICAS:
+                return view(request, *args, **kwargs)
+            token = _request_token(request)
+            pinned = token is not None and cache.get(_pin_key(token), False)
+            reset = _read_alias.set(_choose(pinned))
+            try:
+                return view(request, *args, **kwargs)
+            finally:
+                _read_alias.reset(reset)
+
+    return wrapper
@@ -1,3 +1,4 @@
+import copy
 import os
 from pathlib import Path
 
@@ -30,6 +31,7 @@ INSTALLED_APPS = [
     "corsheaders",
     "business",
     "authentication",
+    "monitoring",
     "jazzmin",
     "django.contrib.admindocs",
     "django.contrib.admin",
@@ -41,17 +43,19 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "monitoring.middleware.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
-    "django.middleware.security.SecurityMiddleware",
-    'django.middleware.common.CommonMiddleware',
-    "django.contrib.sessions.middleware.SessionMiddleware",
-    "django.middleware.csrf.CsrfViewMiddleware",
-    "django.contrib.auth.middleware.AuthenticationMiddleware",
-    "django.contrib.messages.middleware.MessageMiddleware",
-    "django.middleware.clickjacking.XFrameOptionsMiddleware",
-    'django.middleware.security.SecurityMiddleware', 
+    "backend.middleware.SecurityMiddleware",
+    'backend.middleware.CommonMiddleware',
+    "backend.middleware.SessionMiddleware",
+    "backend.middleware.CsrfViewMiddleware",
+    "backend.middleware.AuthenticationMiddleware",
+    "monitoring.middleware.ProfilingMiddleware",
+    "backend.middleware.MessageMiddleware",
+    "backend.middleware.XFrameOptionsMiddleware",
+    'backend.middleware.SecurityMiddleware', 
     #whitenoise middleware1
-    'whitenoise.middleware.WhiteNoiseMiddleware', 
+    'backend.middleware.AsyncWhiteNoiseMiddleware',
     #whitenoise middleware2
     "django.contrib.admindocs.middleware.XViewMiddleware",
 ]
@@ -84,11 +88,92 @@ import dj_database_url
 DATABASES = {
     'default': dj_database_url.config(
         default=os.getenv('DATABASE_URL'),
-        conn_max_age=600,
-        ssl_require=True
+        # Persistent connections are per thread; under ASGI every request
+        # gets a new thread, so set CONN_MAX_AGE=0 (or use DB_POOL) there
+        conn_max_age=int(os.getenv('CONN_MAX_AGE', '600')),
+        conn_health_checks=os.getenv('CONN_HEALTH_CHECKS', 'False').lower() in ('1', 'true', 'yes'),
+        # SSL for the hosted database; local SQLite files take no sslmode option
+        ssl_require=os.getenv(
+            'DB_SSL_REQUIRE', str(not os.getenv('DATABASE_URL', '').startswith('sqlite'))
+        ).lower() in ('1', 'true', 'yes'),
     )
 }
 
+# Server-side prepared statements (PostgreSQL, psycopg 3), off by default.
+# With DB_PREPARE_THRESHOLD set, every query binds its parameters on the
+# server (OPTIONS server_side_binding) and psycopg prepares a statement once
+# it has run that many times on a connection; the plan then lives as long as
+# the connection. Leave it unset behind a transaction-pooling proxy such as
+# PgBouncer.
+DB_PREPARE_THRESHOLD = os.getenv('DB_PREPARE_THRESHOLD', '')
+if DATABASES['default'].get('ENGINE') == 'django.db.backends.postgresql' and DB_PREPARE_THRESHOLD.lower() not in ('', 'none'):
+    DATABASES['default'].setdefault('OPTIONS', {}).update(
+        server_side_binding=True,
+        prepare_threshold=int(DB_PREPARE_THRESHOLD),
+    )
+
+# Connection pool (PostgreSQL with psycopg 3 and psycopg_pool). Each process
+# keeps DB_POOL_MIN_SIZE..DB_POOL_MAX_SIZE connections shared by all of its
+# threads instead of one per thread, so bursts skip connect + TLS. Pooled
+# connections are replaced after DB_POOL_MAX_LIFETIME seconds, closed after
+# DB_POOL_MAX_IDLE idle seconds above the minimum, and with
+# CONN_HEALTH_CHECKS checked (one round trip) on every checkout. A request
+# waits up to DB_POOL_TIMEOUT seconds for a free connection. Keep
+# DB_POOL_MAX_SIZE at least GUNICORN_THREADS. Pooling replaces CONN_MAX_AGE.
+DB_POOL = os.getenv('DB_POOL', 'False').lower() in ('1', 'true', 'yes')
+if DB_POOL and DATABASES['default'].get('ENGINE') == 'django.db.backends.postgresql':
+    DATABASES['default']['CONN_MAX_AGE'] = 0
+    DATABASES['default'].setdefault('OPTIONS', {})['pool'] = {
+        'min_size': int(os.getenv('DB_POOL_MIN_SIZE', '2')),
+        'max_size': int(os.getenv('DB_POOL_MAX_SIZE', '10')),
+        'max_lifetime': float(os.getenv('DB_POOL_MAX_LIFETIME', '1800')),
+        'max_idle': float(os.getenv('DB_POOL_MAX_IDLE', '300')),
+        'timeout': float(os.getenv('DB_POOL_TIMEOUT', '10')),
+    }
+
+# Read replicas, as comma-separated DATABASE_REPLICA_URLS; each becomes a
+# replica_<n> alias with the primary's connection options. Views marked
+# read_from_replica (backend/routers.py) read from a random replica, and a
+# client that wrote reads from the primary for REPLICA_PIN_SECONDS after.
+# Tests use the primary's test database for every replica.
+DATABASE_REPLICAS = []
+for index, replica_url in enumerate(filter(None, os.getenv('DATABASE_REPLICA_URLS', '').split(','))):
+    replica = dj_database_url.parse(replica_url.strip())
+    alias = f'replica_{index}'
+    DATABASES[alias] = {
+        **copy.deepcopy(DATABASES['default']),
+        **{key: replica[key] for key in ('ENGINE', 'NAME', 'USER', 'PASSWORD', 'HOST', 'PORT')},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_REPLICAS.append(alias)
+REPLICA_PIN_SECONDS = float(os.getenv('REPLICA_PIN_SECONDS', '5'))
+
+# Region shards for vehicles and their orders, as comma-separated
+# DATABASE_SHARD_URLS; each becomes a shard_<n> alias with the primary's
+# connection options and the full schema. Which region lives where is the
+# RegionShard table, changed with the move_region command; regions without a
+# row, and everything else, stay on the primary (business/sharding.py).
+DATABASE_SHARDS = []
+for index, shard_url in enumerate(filter(None, os.getenv('DATABASE_SHARD_URLS', '').split(','))):
+    shard = dj_database_url.parse(shard_url.strip())
+    alias = f'shard_{index}'
+    DATABASES[alias] = {
+        **copy.deepcopy(DATABASES['default']),
+        **{key: shard[key] for key in ('ENGINE', 'NAME', 'USER', 'PASSWORD', 'HOST', 'PORT')},
+    }
+    DATABASE_SHARDS.append(alias)
+DATABASE_ROUTERS = ['business.sharding.ShardRouter', 'backend.routers.PrimaryReplicaRouter']
+
+# Cache shared by every worker process (replica pins). Without REDIS_URL each
+# process has its own memory cache.
+if os.getenv('REDIS_URL'):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv('REDIS_URL'),
+        }
+    }
+
 # DATABASES = {
 #     "default": {
 #         "ENGINE": "django.db.backends.sqlite3",
@@ -116,6 +201,24 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+PASSWORD_HASHERS = [
+    "authentication.passwords.ClientPBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
+# Client password KDF (authentication/passwords.py): PBKDF2 cost, and a
+# per-process pool of PASSWORD_HASH_WORKERS threads (0 runs inline) with at
+# most PASSWORD_HASH_QUEUE_SIZE further calls waiting up to
+# PASSWORD_HASH_QUEUE_TIMEOUT seconds for a slot before answering 503.
+PASSWORD_HASH_ITERATIONS = int(os.getenv("PASSWORD_HASH_ITERATIONS", "1000000"))
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 2)))
+PASSWORD_HASH_QUEUE_SIZE = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", "64"))
+PASSWORD_HASH_QUEUE_TIMEOUT = float(os.getenv("PASSWORD_HASH_QUEUE_TIMEOUT", "5"))
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -150,6 +253,30 @@ JAZZMIN_SETTINGS = {
     "login_logo": None,
     "login_logo_dark": None,
     "site_icon": None,
+    "custom_links": {
+        "business": [
+            {
+                "name": "Earnings Dashboard",
+                "url": "admin:business_renterdailyrollup_dashboard",
+                "icon": "fas fa-chart-line",
+                "permissions": ["business.view_renterdailyrollup"],
+            },
+            {
+                "name": "Import Vehicles",
+                "url": "admin:business_vehicle_import",
+                "icon": "fas fa-file-upload",
+                "permissions": ["business.add_vehicle", "business.change_vehicle"],
+            },
+        ],
+        "authentication": [
+            {
+                "name": "Import Renters",
+                "url": "admin:authentication_renter_import",
+                "icon": "fas fa-file-upload",
+                "permissions": ["authentication.add_renter", "authentication.change_renter"],
+            },
+        ],
+    },
     # "topmenu_links": [
     # {"name": "Home",  "url": "admin:index", "permissions": ["auth.view_user"]},
     # {"name": "Support", "url": "https://github.com/farridav/django-jazzmin/issues", "new_window": True},
@@ -172,5 +299,69 @@ STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
 
 GOOGLE_CLIENT_ID = os.getenv("GOOGLE_CLIENT_ID")
 
+# Google ID-token signing certs (authentication/google_certs.py) are cached
+# per process for the response's max-age, or GOOGLE_CERTS_DEFAULT_TTL seconds
+# without one, and refreshed in the background GOOGLE_CERTS_REFRESH_MARGIN
+# seconds before they expire. A token with an unknown key id refetches them
+# at most once per GOOGLE_CERTS_MIN_REFRESH_INTERVAL seconds.
+GOOGLE_CERTS_URL = os.getenv("GOOGLE_CERTS_URL", "https://www.googleapis.com/oauth2/v1/certs")
+GOOGLE_CERTS_TIMEOUT = float(os.getenv("GOOGLE_CERTS_TIMEOUT", "5"))
+GOOGLE_CERTS_DEFAULT_TTL = int(os.getenv("GOOGLE_CERTS_DEFAULT_TTL", "300"))
+GOOGLE_CERTS_REFRESH_MARGIN = int(os.getenv("GOOGLE_CERTS_REFRESH_MARGIN", "300"))
+GOOGLE_CERTS_MIN_REFRESH_INTERVAL = int(os.getenv("GOOGLE_CERTS_MIN_REFRESH_INTERVAL", "60"))
+
 SECURE_CONTENT_TYPE_NOSNIFF = False
-X_FRAME_OPTIONS = 'SAMEORIGIN'
\ No newline at end of file
+X_FRAME_OPTIONS = 'SAMEORIGIN'
+
+# Order archival: closed orders older than this many days are moved to ArchivedOrder
+ORDER_ARCHIVE_AFTER_DAYS = int(os.getenv("ORDER_ARCHIVE_AFTER_DAYS", "180"))
+ORDER_ARCHIVE_BATCH_SIZE = int(os.getenv("ORDER_ARCHIVE_BATCH_SIZE", "1000"))
+
+# Admin changelists of big tables (backend/changelists.py) show PostgreSQL's
+# row estimate instead of an exact count for unfiltered lists of more rows
+ADMIN_EXACT_COUNT_LIMIT = int(os.getenv("ADMIN_EXACT_COUNT_LIMIT", "100000"))
+
+
+# /metrics: Prometheus exposition of the per-view request metrics. Set
+# PROMETHEUS_MULTIPROC_DIR in the environment to aggregate across gunicorn
+# workers. Only scrapers sending "Authorization: Bearer <METRICS_TOKEN>", or
+# connecting from METRICS_ALLOWED_NETWORKS (comma-separated addresses or CIDR
+# ranges; none by default), get an answer. Requests carrying X-Forwarded-For,
+# X-Real-IP or Forwarded came through a proxy and always need the token: behind
+# a reverse proxy on the same host every client would otherwise be 127.0.0.1.
+# /readyz?deep=1 applies the same check.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_ALLOWED_NETWORKS = [
+    network.strip() for network in os.getenv("METRICS_ALLOWED_NETWORKS", "").split(",") if network.strip()
+]
+
+# Slow-query log (monitoring/slow_queries.py): queries of a request taking at
+# least SLOW_QUERY_THRESHOLD_MS (0 disables) are aggregated by fingerprint in
+# the admin. The first slow run of a SELECT and then a
+# SLOW_QUERY_EXPLAIN_SAMPLE_RATE fraction of the rest get an EXPLAIN plan
+# (ANALYZE, BUFFERS on PostgreSQL), captured on a background thread.
+SLOW_QUERY_THRESHOLD_MS = float(os.getenv("SLOW_QUERY_THRESHOLD_MS", "200"))
+SLOW_QUERY_EXPLAIN_SAMPLE_RATE = float(os.getenv("SLOW_QUERY_EXPLAIN_SAMPLE_RATE", "0.05"))
+SLOW_QUERY_EXPLAIN_TIMEOUT_MS = int(os.getenv("SLOW_QUERY_EXPLAIN_TIMEOUT_MS", "5000"))
+SLOW_QUERY_QUEUE_SIZE = int(os.getenv("SLOW_QUERY_QUEUE_SIZE", "1000"))
+
+# On-demand request profiling (monitoring/profiling.py) for staff users
+# sending "X-Profile: 1" or "?_profile=1". When disabled the middleware is
+# dropped at startup. Profile dumps are written to PROFILING_DIR.
+PROFILING_ENABLED = os.getenv("PROFILING_ENABLED", "False").lower() in ("1", "true", "yes")
+PROFILING_DIR = os.getenv("PROFILING_DIR", str(BASE_DIR / "profiles"))
+PROFILING_TRACEBACK_FRAMES = int(os.getenv("PROFILING_TRACEBACK_FRAMES", "1"))
+
+# Wall-time limits of the endpoint budget tests (monitoring/budgets.py) are
+# multiplied by this factor; raise it on slow CI machines
+PERF_BUDGET_TIME_SCALE = float(os.getenv("PERF_BUDGET_TIME_SCALE", "1"))
+
+# /readyz reuses its database check for this many seconds per process
+READINESS_CHECK_TTL = float(os.getenv("READINESS_CHECK_TTL", "5"))
+
+
+# Client API tokens: resolved clients are cached per process. A rotated token
+# is dropped immediately in the worker that rotated it and expires from the
+# other workers' caches after CLIENT_TOKEN_CACHE_TTL seconds.
+CLIENT_TOKEN_CACHE_SIZE = int(os.getenv("CLIENT_TOKEN_CACHE_SIZE", "4096"))
+CLIENT_TOKEN_CACHE_TTL = int(os.getenv("CLIENT_TOKEN_CACHE_TTL", "30"))
@@ -2,6 +2,9 @@ from django.contrib import admin
 from django.urls import include, path
 from django.shortcuts import redirect
 
+from cron.views import healthz, readyz
+from monitoring.views import metrics
+
 urlpatterns = [
     path('', lambda request: redirect('/admin/')),
     path('admin/doc/', include('django.contrib.admindocs.urls')),
@@ -9,4 +12,7 @@ urlpatterns = [
     path("authentication/", include("authentication.urls")),
     path("business/", include("business.urls")),
     path('cron', include('cron.urls')),
+    path("healthz", healthz, name="healthz"),
+    path("readyz", readyz, name="readyz"),
+    path("metrics", metrics, name="metrics"),
 ]
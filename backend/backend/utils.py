@@ -1,3 +1,8 @@
+import os
+import threading
+import time
+import uuid
+
 from django.core.validators import RegexValidator
 
 phone_regex = RegexValidator(
@@ -10,3 +15,48 @@ aadhaar_regex = RegexValidator(
     message="Aadhaar number must be 12 digits long, should not start with 0 or 1, and should not contain any spaces or special characters",
     code="invalid_aadhaar",
 )
+
+_uuid7_lock = threading.Lock()
+_uuid7_last_ms = 0
+_uuid7_counter = 0
+_UUID7_COUNTER_MAX = (1 << 42) - 1
+
+
+def _uuid7():
+    """
+    RFC 9562 UUIDv7: 48 bits of Unix time in milliseconds, then a 42-bit
+    counter seeded at random every millisecond and 32 random bits, so ids
+    from one process keep increasing. What ``uuid.uuid7`` does on Python 3.14.
+    """
+    global _uuid7_last_ms, _uuid7_counter
+    with _uuid7_lock:
+        now_ms = time.time_ns() // 1_000_000
+        if now_ms > _uuid7_last_ms:
+            # Top bit left clear, so the counter has room to count up
+            _uuid7_counter = int.from_bytes(os.urandom(6)) >> 7
+            _uuid7_last_ms = now_ms
+        else:
+            _uuid7_counter += 1
+            if _uuid7_counter > _UUID7_COUNTER_MAX:
+                # Counter used up within one millisecond: borrow the next one
+                _uuid7_last_ms += 1
+                _uuid7_counter = 0
+        timestamp_ms, counter = _uuid7_last_ms, _uuid7_counter
+    value = (timestamp_ms & 0xFFFF_FFFF_FFFF) << 80
+    value |= 0x7 << 76
+    value |= (counter >> 30) << 64
+    value |= 0b10 << 62
+    value |= (counter & 0x3FFF_FFFF) << 32
+    value |= int.from_bytes(os.urandom(4))
+    return uuid.UUID(int=value)
+
+
+def uuid7():
+    """
+    Time-ordered UUID for primary keys: new rows land at the right-hand
+    edge of the index instead of at random pages, as with uuid4. The ids
+    reveal when a row was created, so keep uuid4 for tokens.
+    """
+    if hasattr(uuid, "uuid7"):
+        return uuid.uuid7()
+    return _uuid7()
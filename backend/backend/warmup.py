@@ -0,0 +1,60 @@
+"""
+Warm-up steps run before a process serves its first request.
+
+``warm_up(connect=False)`` only does work worth sharing between workers
+(importing every view through the URLconf, compiling hot templates) and is
+safe in the gunicorn master before it forks. ``warm_up()`` additionally
+opens the database connections and starts the Google cert fetch, which
+must happen in each worker after the fork.
+"""
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+HOT_TEMPLATES = ["admin/login.html", "admin/index.html"]
+
+
+def _load_urls():
+    from django.urls import get_resolver
+
+    # Resolving the URLconf imports every view module
+    get_resolver().url_patterns
+
+
+def _load_templates():
+    from django.template.loader import get_template
+
+    for name in HOT_TEMPLATES:
+        get_template(name)
+
+
+def _connect():
+    from django.db import connections
+
+    # Only the calling thread's connections; gthread workers open the rest on first use
+    for connection in connections.all():
+        connection.ensure_connection()
+
+
+def _prefetch_google_certs():
+    from authentication.google_certs import prefetch_google_certs
+
+    prefetch_google_certs()
+
+
+def warm_up(connect=True):
+    """Run the warm-up steps; a failing step is logged and skipped. Returns seconds per step."""
+    steps = [("urls", _load_urls), ("templates", _load_templates)]
+    if connect:
+        steps += [("database", _connect), ("google_certs", _prefetch_google_certs)]
+
+    timings = {}
+    for name, step in steps:
+        started = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.warning("Warm-up step %s failed", name, exc_info=True)
+        timings[name] = time.perf_counter() - started
+    return timings
@@ -1,14 +1,36 @@
 from django.contrib import admin
-from .models import Vehicle, Order
+from django.template.response import TemplateResponse
+from django.urls import path
+from .events import record_order_event, record_status_transitions
+from .exports import ORDER_EXPORT, VEHICLE_EXPORT
+from .imports import VEHICLE_IMPORT
+from authentication.models import Renter
+from backend.changelists import LargeTableAdmin
+from backend.exports import export_actions
+from backend.imports import ImportAdmin
+from .models import (
+    ArchivedOrder,
+    EventCursor,
+    Order,
+    OrderEvent,
+    OrderSummary,
+    RegionShard,
+    RenterDailyRollup,
+    Vehicle,
+    VehicleDailyRollup,
+)
+from .projections import sync_order_summary_status, write_order_summary
+from .rollups import month_view
 
 @admin.register(Vehicle)
-class VehicleAdmin(admin.ModelAdmin):
+class VehicleAdmin(ImportAdmin, LargeTableAdmin, admin.ModelAdmin):
     search_fields = ['vehicle_number', 'name', 'brand', 'model', 'location']
     list_filter = [
         'vehicle_type',
         'transmission',
         'fuel_type',
         'current_status',
+        'region',
         'added_on',
     ]
     date_hierarchy = 'added_on'
@@ -28,6 +50,10 @@ class VehicleAdmin(admin.ModelAdmin):
         'owner',
         'added_on',
     ]
+    list_select_related = ['owner']
+    autocomplete_fields = ['owner']
+    actions = export_actions(VEHICLE_EXPORT)
+    import_spec = VEHICLE_IMPORT
 
     readonly_fields = ['added_on', 'last_updated']
 
@@ -51,13 +77,13 @@ class VehicleAdmin(admin.ModelAdmin):
             'fields': ('rating', 'total_trips')
         }),
         ('Location', {
-            'fields': ('location',)
+            'fields': ('location', 'region')
         }),
     )
 
 
 @admin.register(Order)
-class OrderAdmin(admin.ModelAdmin):
+class OrderAdmin(LargeTableAdmin, admin.ModelAdmin):
     search_fields = ['client__username', 'vehicle__vehicle_number']
     list_filter = ['payment_status', 'order_status', 'pickup_datetime', 'return_datetime']
     date_hierarchy = 'pickup_datetime'
@@ -74,6 +100,9 @@ class OrderAdmin(admin.ModelAdmin):
         'late_fee',
         'created_at',
     ]
+    list_select_related = ['client', 'vehicle']
+    autocomplete_fields = ['client', 'vehicle']
+    actions = export_actions(ORDER_EXPORT)
 
     readonly_fields = ['created_at', 'updated_at']
 
@@ -97,3 +126,164 @@ class OrderAdmin(admin.ModelAdmin):
             'fields': ('created_at', 'updated_at'),
         }),
     )
+
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        owner = obj.vehicle.owner
+        owner_id = owner.user_id if owner else None
+        if not change:
+            write_order_summary(obj)
+            record_order_event(obj, OrderEvent.EventTypes.CREATED, owner_id=owner_id)
+            return
+        sync_order_summary_status(obj)
+        record_status_transitions(
+            obj,
+            form.initial.get('order_status'),
+            form.initial.get('payment_status'),
+            owner_id=owner_id,
+        )
+
+
+@admin.register(OrderSummary)
+class OrderSummaryAdmin(LargeTableAdmin, admin.ModelAdmin):
+    search_fields = ['vehicle_name', 'vehicle_number']
+    list_filter = ['order_status', 'payment_status']
+    list_display = [
+        'order_id',
+        'vehicle_name',
+        'vehicle_number',
+        'agreed_price',
+        'pickup_datetime',
+        'return_datetime',
+        'order_status',
+        'payment_status',
+        'created_at',
+    ]
+    raw_id_fields = ['client']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ArchivedOrder)
+class ArchivedOrderAdmin(LargeTableAdmin, admin.ModelAdmin):
+    search_fields = ['client__username', 'vehicle__vehicle_number']
+    list_filter = ['payment_status', 'order_status']
+    list_display = [
+        'id',
+        'client',
+        'vehicle',
+        'pickup_datetime',
+        'return_datetime',
+        'order_status',
+        'payment_status',
+        'rental_amount',
+        'archived_at',
+    ]
+    list_select_related = ['client', 'vehicle']
+    raw_id_fields = ['client', 'vehicle']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(OrderEvent)
+class OrderEventAdmin(LargeTableAdmin, admin.ModelAdmin):
+    search_fields = ['order_id']
+    list_filter = ['event_type']
+    list_display = ['id', 'event_type', 'order_id', 'vehicle_id', 'amount', 'created_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(EventCursor)
+class EventCursorAdmin(admin.ModelAdmin):
+    list_display = ['consumer', 'position', 'updated_at']
+
+
+@admin.register(RegionShard)
+class RegionShardAdmin(admin.ModelAdmin):
+    """Read-only: moving a region means moving its rows, which the move_region command does"""
+    list_display = ['region', 'database', 'updated_at']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(VehicleDailyRollup)
+class VehicleDailyRollupAdmin(LargeTableAdmin, admin.ModelAdmin):
+    search_fields = ['vehicle_id', 'owner_id']
+    date_hierarchy = 'date'
+    list_display = ['date', 'vehicle_id', 'bookings', 'cancellations', 'revenue', 'paid_revenue', 'booked_seconds']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(RenterDailyRollup)
+class RenterDailyRollupAdmin(admin.ModelAdmin):
+    search_fields = ['owner_id']
+    date_hierarchy = 'date'
+    list_display = ['date', 'owner_id', 'bookings', 'cancellations', 'revenue', 'paid_revenue', 'booked_seconds']
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def get_urls(self):
+        return [
+            path(
+                'dashboard/',
+                self.admin_site.admin_view(self.dashboard_view),
+                name='business_renterdailyrollup_dashboard',
+            ),
+        ] + super().get_urls()
+
+    def dashboard_view(self, request):
+        """Month of daily earnings and utilization for one renter, or the whole fleet"""
+        renter_id = request.GET.get('renter') or None
+        vehicles = Vehicle.objects.all()
+        filters = {}
+        if renter_id:
+            vehicles = vehicles.filter(owner__user_id=renter_id)
+            filters['owner_id'] = renter_id
+        try:
+            dashboard = month_view(
+                RenterDailyRollup,
+                request.GET.get('month'),
+                capacity=vehicles.count(),
+                **filters,
+            )
+        except ValueError:
+            dashboard = month_view(RenterDailyRollup, capacity=vehicles.count(), **filters)
+
+        context = {
+            **self.admin_site.each_context(request),
+            'title': 'Earnings & Utilization',
+            'opts': self.model._meta,
+            'dashboard': dashboard,
+            'renters': Renter.objects.only('user_id', 'full_name').order_by('full_name'),
+            'selected_renter': renter_id,
+        }
+        return TemplateResponse(request, 'admin/business/rollup_dashboard.html', context)
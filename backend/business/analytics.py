@@ -0,0 +1,205 @@
+"""
+Fleet utilization and demand analytics over booking intervals.
+
+Intervals are loaded as parallel int64 arrays (vehicle code, start and end
+in epoch seconds) and every metric is computed with vectorized interval
+arithmetic, so the cost is a handful of sorts and linear passes regardless
+of how many orders are involved.
+"""
+from datetime import timezone as dt_timezone
+from itertools import product
+from typing import NamedTuple
+
+import numpy as np
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import BigIntegerField
+from django.db.models.functions import Cast, Extract
+from django.utils import timezone
+
+from business.models import ArchivedOrder, Order
+from business.sharding import databases
+
+SECONDS_PER_HOUR = 3600
+
+# Statuses whose time counts as the vehicle being in use
+UTILIZED_ORDER_STATUSES = ("upcoming", "ongoing", "completed")
+
+# Idle-gap histogram bin edges, in hours
+IDLE_GAP_BINS_HOURS = [0, 1, 2, 4, 8, 12, 24, 48, 72, 168, 336, 720, np.inf]
+
+LOAD_CHUNK_SIZE = 100_000
+
+
+def _epoch_columns(queryset, alias=None):
+    """
+    ``(vehicle_id, start, end)`` rows with the datetimes as epoch seconds.
+    PostgreSQL converts in SQL; other backends convert per row in Python.
+    The extraction is in UTC: in the current time zone PostgreSQL would
+    return the local wall-clock time as epoch seconds.
+    """
+    if connections[alias or DEFAULT_DB_ALIAS].vendor == "postgresql":
+        return queryset.annotate(
+            start_epoch=Cast(Extract("pickup_datetime", "epoch", tzinfo=dt_timezone.utc), BigIntegerField()),
+            end_epoch=Cast(Extract("return_datetime", "epoch", tzinfo=dt_timezone.utc), BigIntegerField()),
+        ).values_list("vehicle_id", "start_epoch", "end_epoch"), False
+    return queryset.values_list("vehicle_id", "pickup_datetime", "return_datetime"), True
+
+
+def load_intervals(window_start, window_end):
+    """
+    Load booked intervals overlapping ``[window_start, window_end)`` from Order
+    and ArchivedOrder on the primary and every shard. Returns ``(vehicle_ids, codes, starts, ends)`` where
+    ``codes`` indexes into ``vehicle_ids`` and times are int64 epoch seconds.
+    """
+    vehicle_index = {}
+    codes, starts, ends = [], [], []
+    for alias, model in product(databases(), (Order, ArchivedOrder)):
+        queryset = model.objects.using(alias).order_by().filter(
+            order_status__in=UTILIZED_ORDER_STATUSES,
+            pickup_datetime__lt=window_end,
+            return_datetime__gt=window_start,
+        )
+        rows, needs_conversion = _epoch_columns(queryset, alias)
+        chunk = []
+        for row in rows.iterator(chunk_size=LOAD_CHUNK_SIZE):
+            chunk.append(row)
+            if len(chunk) == LOAD_CHUNK_SIZE:
+                _append_chunk(chunk, needs_conversion, vehicle_index, codes, starts, ends)
+                chunk = []
+        if chunk:
+            _append_chunk(chunk, needs_conversion, vehicle_index, codes, starts, ends)
+
+    vehicle_ids = list(vehicle_index)
+    if not codes:
+        empty = np.empty(0, dtype=np.int64)
+        return vehicle_ids, empty, empty, empty
+    return vehicle_ids, np.concatenate(codes), np.concatenate(starts), np.concatenate(ends)
+
+
+def _append_chunk(chunk, needs_conversion, vehicle_index, codes, starts, ends):
+    n = len(chunk)
+    vehicle_col, start_col, end_col = zip(*chunk)
+    codes.append(
+        np.fromiter(
+            (vehicle_index.setdefault(v, len(vehicle_index)) for v in vehicle_col),
+            dtype=np.int64,
+            count=n,
+        )
+    )
+    if needs_conversion:
+        starts.append(np.fromiter((int(t.timestamp()) for t in start_col), dtype=np.int64, count=n))
+        ends.append(np.fromiter((int(t.timestamp()) for t in end_col), dtype=np.int64, count=n))
+    else:
+        starts.append(np.asarray(start_col, dtype=np.int64))
+        ends.append(np.asarray(end_col, dtype=np.int64))
+
+
+class GroupedIntervals(NamedTuple):
+    """Intervals clipped to the window and sorted by (vehicle, start)."""
+
+    codes: np.ndarray
+    shifted_starts: np.ndarray
+    shifted_ends: np.ndarray
+    previous_reach: np.ndarray
+    window_seconds: int
+
+
+def group_intervals(codes, starts, ends, window_start, window_end):
+    """
+    Clip intervals to the window and shift each vehicle into its own
+    disjoint time range (``code * (span + 1)``). Sorting that single int64
+    key orders intervals by (vehicle, start), and one cumulative maximum
+    over the whole array never crosses vehicle boundaries.
+    """
+    starts = np.maximum(starts, window_start)
+    ends = np.minimum(ends, window_end)
+    keep = ends > starts
+    codes, starts, ends = codes[keep], starts[keep], ends[keep]
+
+    span = window_end - window_start
+    offset = codes * (span + 1) - window_start
+    shifted_starts = starts + offset
+    order = np.argsort(shifted_starts)
+    codes = codes[order]
+    shifted_starts = shifted_starts[order]
+    shifted_ends = (ends + offset)[order]
+
+    # Furthest end reached by any earlier interval of the same vehicle
+    previous_reach = np.empty_like(shifted_ends)
+    if len(shifted_ends):
+        previous_reach[0] = np.iinfo(np.int64).min
+        previous_reach[1:] = np.maximum.accumulate(shifted_ends)[:-1]
+    return GroupedIntervals(codes, shifted_starts, shifted_ends, previous_reach, span)
+
+
+def vehicle_utilization(grouped, n_vehicles):
+    """Busy seconds (overlaps merged) and utilization ratio per vehicle code."""
+    covered = np.maximum(
+        0, grouped.shifted_ends - np.maximum(grouped.shifted_starts, grouped.previous_reach)
+    )
+    busy = np.bincount(grouped.codes, weights=covered, minlength=n_vehicles).astype(np.int64)
+    return busy, busy / float(grouped.window_seconds)
+
+
+def idle_gaps(grouped):
+    """Seconds between the end of one booking and the start of the next one for the same vehicle."""
+    codes = grouped.codes
+    if len(codes) < 2:
+        return np.empty(0, dtype=np.int64)
+    same_vehicle = np.empty(len(codes), dtype=bool)
+    same_vehicle[0] = False
+    same_vehicle[1:] = codes[1:] == codes[:-1]
+    gaps = grouped.shifted_starts - grouped.previous_reach
+    return gaps[same_vehicle & (gaps > 0)]
+
+
+def idle_gap_histogram(gaps):
+    counts, _ = np.histogram(gaps / SECONDS_PER_HOUR, bins=IDLE_GAP_BINS_HOURS)
+    return counts
+
+
+def hourly_demand(starts, ends, window_start, window_end):
+    """
+    Number of bookings active in each hour of the window. With starts and
+    ends sorted independently, bookings touching hour ``[a, b)`` are those
+    started before ``b`` minus those already ended by ``a``; both counts are
+    a ``searchsorted`` of the hour edges.
+    """
+    edges = np.arange(window_start, window_end + SECONDS_PER_HOUR, SECONDS_PER_HOUR, dtype=np.int64)
+    starts = np.maximum(starts, window_start)
+    ends = np.minimum(ends, window_end)
+    keep = ends > starts
+    sorted_starts = np.sort(starts[keep])
+    sorted_ends = np.sort(ends[keep])
+    started = np.searchsorted(sorted_starts, edges[1:], side="left")
+    ended = np.searchsorted(sorted_ends, edges[:-1], side="right")
+    return edges[:-1], started - ended
+
+
+def demand_by_hour_of_day(hour_starts, active, utc_offset_seconds=0):
+    """Mean and peak active bookings for each local hour of the day (0-23)."""
+    hour_of_day = ((hour_starts + utc_offset_seconds) // SECONDS_PER_HOUR) % 24
+    samples = np.bincount(hour_of_day, minlength=24)
+    totals = np.bincount(hour_of_day, weights=active, minlength=24)
+    mean = np.divide(totals, samples, out=np.zeros(24), where=samples > 0)
+    peak = np.zeros(24, dtype=np.int64)
+    np.maximum.at(peak, hour_of_day, active)
+    return mean, peak
+
+
+def fleet_report(codes, starts, ends, n_vehicles, window_start, window_end):
+    """Compute every metric for the given interval arrays."""
+    grouped = group_intervals(codes, starts, ends, window_start, window_end)
+    busy, utilization = vehicle_utilization(grouped, n_vehicles)
+    gaps = idle_gaps(grouped)
+    hour_starts, active = hourly_demand(starts, ends, window_start, window_end)
+    utc_offset = int(timezone.localtime().utcoffset().total_seconds())
+    mean, peak = demand_by_hour_of_day(hour_starts, active, utc_offset)
+    return {
+        "busy_seconds": busy,
+        "utilization": utilization,
+        "idle_gaps": gaps,
+        "idle_gap_histogram": idle_gap_histogram(gaps),
+        "demand_mean": mean,
+        "demand_peak": peak,
+    }
@@ -4,3 +4,11 @@ from django.apps import AppConfig
 class BusinessConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'business'
+
+    def ready(self):
+        from django.db.models.signals import post_save
+
+        from .models import Vehicle
+        from .sharding import record_vehicle_region
+
+        post_save.connect(record_vehicle_region, sender=Vehicle, dispatch_uid="business.record_vehicle_region")
@@ -0,0 +1,70 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+from django.utils import timezone
+
+from business.models import ArchivedOrder, Order
+from business.sharding import databases
+
+CLOSED_ORDER_STATUSES = ("completed", "cancelled")
+
+# Every concrete Order column has a same-named counterpart on ArchivedOrder
+ARCHIVED_COLUMNS = [field.attname for field in Order._meta.concrete_fields]
+
+
+def archive_cutoff(older_than_days=None):
+    if older_than_days is None:
+        older_than_days = settings.ORDER_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=older_than_days)
+
+
+def archivable_orders(cutoff, using=DEFAULT_DB_ALIAS):
+    return Order.objects.using(using).filter(
+        order_status__in=CLOSED_ORDER_STATUSES,
+        return_datetime__lt=cutoff,
+    )
+
+
+def archive_batch(cutoff, batch_size, using=DEFAULT_DB_ALIAS):
+    """
+    Move at most ``batch_size`` closed orders of the database ``using`` into
+    its ArchivedOrder table (an archived order stays on its vehicle's shard)
+    in a single transaction. Returns the number of orders moved.
+    """
+    with transaction.atomic(using=using):
+        queryset = archivable_orders(cutoff, using).order_by("pk")
+        if connections[using].features.has_select_for_update_skip_locked:
+            queryset = queryset.select_for_update(skip_locked=True)
+        orders = list(queryset[:batch_size])
+        if not orders:
+            return 0
+
+        ArchivedOrder.objects.using(using).bulk_create(
+            [
+                ArchivedOrder(**{column: getattr(order, column) for column in ARCHIVED_COLUMNS})
+                for order in orders
+            ],
+            ignore_conflicts=True,
+        )
+        Order.objects.using(using).filter(pk__in=[order.pk for order in orders]).delete()
+    return len(orders)
+
+
+def archive_closed_orders(older_than_days=None, batch_size=None, max_batches=None):
+    """
+    Move closed orders older than the configured age in bounded chunks, on
+    the primary and then on each shard. Yields the number of orders moved
+    per batch so callers can report progress or throttle between batches;
+    ``max_batches`` counts batches over all databases.
+    """
+    cutoff = archive_cutoff(older_than_days)
+    batch_size = batch_size or settings.ORDER_ARCHIVE_BATCH_SIZE
+    batches = 0
+    for alias in databases():
+        while max_batches is None or batches < max_batches:
+            moved = archive_batch(cutoff, batch_size, alias or DEFAULT_DB_ALIAS)
+            if not moved:
+                break
+            batches += 1
+            yield moved
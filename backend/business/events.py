@@ -0,0 +1,118 @@
+import threading
+import weakref
+from datetime import timedelta
+
+from django.db import router, transaction
+from django.utils import timezone
+
+from business.models import EventCursor, OrderEvent
+
+_local = threading.local()
+
+
+def _buffers():
+    buffers = getattr(_local, "buffers", None)
+    if buffers is None:
+        buffers = _local.buffers = weakref.WeakValueDictionary()
+    return buffers
+
+
+class _PendingEvents:
+    """
+    Events recorded inside one transaction, written with a single
+    bulk_create when it commits. The buffer is itself the transaction's
+    on_commit callback and the thread-local map only holds it weakly, so a
+    transaction (or the savepoint the callback was registered in) that rolls
+    back takes the buffer with it and the next event starts a new one.
+    """
+
+    def __init__(self, using):
+        self.using = using
+        self.events = []
+
+    def __call__(self):
+        buffers = _buffers()
+        if buffers.get(self.using) is self:
+            del buffers[self.using]
+        events, self.events = self.events, []
+        if events:
+            OrderEvent.objects.using(self.using).bulk_create(events)
+
+
+def _pending_for(using):
+    """Return the buffer for the transaction currently open on ``using``."""
+    buffers = _buffers()
+    pending = buffers.get(using)
+    if pending is None:
+        pending = buffers[using] = _PendingEvents(using)
+        transaction.on_commit(pending, using=using)
+    return pending
+
+
+def record_order_event(order, event_type, owner_id=None):
+    """
+    Append an event for ``order``. Inside a transaction the event is
+    buffered and flushed in bulk when it commits (and dropped if it rolls
+    back); outside one it is written immediately.
+    """
+    event = OrderEvent(
+        event_type=event_type,
+        order_id=order.id,
+        client_id=order.client_id,
+        vehicle_id=order.vehicle_id,
+        owner_id=owner_id,
+        amount=order.rental_amount,
+        pickup_datetime=order.pickup_datetime,
+        return_datetime=order.return_datetime,
+    )
+    using = router.db_for_write(OrderEvent)
+    if not transaction.get_connection(using).in_atomic_block:
+        event.save(using=using)
+        return
+    _pending_for(using).events.append(event)
+
+
+def record_status_transitions(order, previous_order_status, previous_payment_status, owner_id=None):
+    """Record the events implied by moving ``order`` away from the given previous statuses."""
+    if order.order_status != previous_order_status:
+        event_type = {
+            "ongoing": OrderEvent.EventTypes.STARTED,
+            "completed": OrderEvent.EventTypes.COMPLETED,
+            "cancelled": OrderEvent.EventTypes.CANCELLED,
+        }.get(order.order_status)
+        if event_type:
+            record_order_event(order, event_type, owner_id=owner_id)
+    if order.payment_status == "paid" and previous_payment_status != "paid":
+        record_order_event(order, OrderEvent.EventTypes.PAID, owner_id=owner_id)
+
+
+def read_order_events(after=0, limit=500, settle_seconds=5):
+    """
+    Events with id greater than ``after``, oldest first. Events younger than
+    ``settle_seconds`` are held back so that ids handed out to transactions
+    still committing are not skipped by a cursor that has moved past them.
+    """
+    queryset = OrderEvent.objects.filter(pk__gt=after).order_by("pk")
+    if settle_seconds:
+        queryset = queryset.filter(created_at__lte=timezone.now() - timedelta(seconds=settle_seconds))
+    return list(queryset[:limit])
+
+
+def consume_order_events(consumer, handler, batch_size=500, settle_seconds=5):
+    """
+    Feed events after the stored cursor of ``consumer`` to ``handler`` in
+    batches. Each batch is handled and the cursor advanced in one
+    transaction, so a failed batch is retried on the next run.
+    Returns the number of events processed.
+    """
+    processed = 0
+    while True:
+        with transaction.atomic():
+            cursor, _ = EventCursor.objects.select_for_update().get_or_create(consumer=consumer)
+            events = read_order_events(cursor.position, batch_size, settle_seconds)
+            if not events:
+                return processed
+            handler(events)
+            cursor.position = events[-1].pk
+            cursor.save(update_fields=["position", "updated_at"])
+        processed += len(events)
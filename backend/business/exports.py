@@ -0,0 +1,81 @@
+from django.db import DEFAULT_DB_ALIAS
+
+from authentication.exports import CLIENT_EXPORT
+from authentication.models import Client
+from backend.exports import Export, chunked, values_export
+from business.models import Order, Vehicle
+
+VEHICLE_EXPORT = values_export(
+    Vehicle,
+    {
+        name: name
+        for name in (
+            "id",
+            "vehicle_number",
+            "name",
+            "brand",
+            "model",
+            "vehicle_type",
+            "color",
+            "transmission",
+            "fuel_type",
+            "seating_capacity",
+            "price_per_hour",
+            "price_per_day",
+            "security_deposit",
+            "late_fee_per_hour",
+            "current_status",
+            "location",
+            "region",
+            "rating",
+            "total_trips",
+            "owner_id",
+            "added_on",
+            "last_updated",
+        )
+    },
+)
+
+# The vehicle shares the order's database and is joined in; clients live on
+# the primary, so on a shard they are looked up once per chunk instead
+ORDER_FIELDS = {
+    "id": "id",
+    "created_at": "created_at",
+    "updated_at": "updated_at",
+    "pickup_datetime": "pickup_datetime",
+    "return_datetime": "return_datetime",
+    "actual_return_datetime": "actual_return_datetime",
+    "pickup_location": "pickup_location",
+    "dropoff_location": "dropoff_location",
+    "rental_amount": "rental_amount",
+    "security_deposit": "security_deposit",
+    "late_fee": "late_fee",
+    "payment_status": "payment_status",
+    "order_status": "order_status",
+    "notes": "notes",
+    "vehicle_id": "vehicle_id",
+    "vehicle_number": "vehicle__vehicle_number",
+    "vehicle_name": "vehicle__name",
+    "vehicle_region": "vehicle__region",
+    "client_id": "client_id",
+}
+ORDER_CLIENT_FIELDS = {"client_user_id": "user_id", "client_username": "username", "client_email": "email"}
+
+
+def _order_rows(queryset, chunk_size):
+    rows = queryset.values_list(*ORDER_FIELDS.values()).iterator(chunk_size=chunk_size)
+    missing = (None,) * len(ORDER_CLIENT_FIELDS)
+    for chunk in chunked(rows, chunk_size):
+        clients = {
+            pk: rest
+            for pk, *rest in Client.objects.using(DEFAULT_DB_ALIAS)
+            .filter(pk__in={row[-1] for row in chunk})
+            .values_list("pk", *ORDER_CLIENT_FIELDS.values())
+        }
+        for row in chunk:
+            yield (*row, *clients.get(row[-1], missing))
+
+
+ORDER_EXPORT = Export(Order, [*ORDER_FIELDS, *ORDER_CLIENT_FIELDS], _order_rows)
+
+EXPORTS = {"orders": ORDER_EXPORT, "vehicles": VEHICLE_EXPORT, "clients": CLIENT_EXPORT}
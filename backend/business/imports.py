@@ -0,0 +1,99 @@
+from django.db import DEFAULT_DB_ALIAS
+
+from authentication.imports import RENTER_IMPORT
+from authentication.models import Renter
+from backend.imports import Import
+from business.models import Vehicle
+from business.sharding import databases, is_shard, record_vehicle_regions, region_shard
+
+VEHICLE_FIELDS = (
+    "vehicle_number",
+    "name",
+    "brand",
+    "model",
+    "vehicle_type",
+    "color",
+    "transmission",
+    "fuel_type",
+    "seating_capacity",
+    "mileage",
+    "engine_cc",
+    "top_speed",
+    "current_odometer",
+    "insurance_expiry_date",
+    "price_per_hour",
+    "price_per_day",
+    "security_deposit",
+    "late_fee_per_hour",
+    "current_status",
+    "location",
+    "region",
+    "image_1",
+    "image_2",
+    "image_3",
+)
+
+
+def _vehicle_databases(numbers):
+    """``{vehicle_number: {alias}}`` of the vehicles that already exist, usually on one database."""
+    found = {}
+    for alias in databases():
+        alias = alias or DEFAULT_DB_ALIAS
+        for number in Vehicle.objects.using(alias).filter(vehicle_number__in=numbers).values_list(
+            "vehicle_number", flat=True
+        ):
+            found.setdefault(number, set()).add(alias)
+    return found
+
+
+def _prepare_vehicles(rows, columns):
+    """
+    Owners are given by email, looked up once per chunk. An existing vehicle
+    is updated on the database it is on; a region change that would move it
+    to another database is rejected, that is move_region's job.
+    """
+    rejected = {}
+    if "owner_email" in columns:
+        emails = {record.get("owner_email") or "" for _, record, _ in rows} - {""}
+        owners = dict(Renter.objects.filter(email__in=emails).values_list("email", "pk"))
+        for line, record, obj in rows:
+            email = record.get("owner_email") or ""
+            if email and email not in owners:
+                rejected[line] = f"owner_email: no renter with email {email}"
+            obj.owner_id = owners.get(email)
+
+    current = _vehicle_databases([obj.vehicle_number for _, _, obj in rows])
+    for line, _, obj in rows:
+        target = region_shard(obj.region) or DEFAULT_DB_ALIAS
+        existing = current.get(obj.vehicle_number, {target})
+        # On two databases only while move_region copies it
+        database = target if target in existing else min(existing)
+        if "region" in columns and database != target:
+            rejected[line] = f"region: {obj.region} would move the vehicle from {database} to {target}; use move_region"
+        # Where _save_vehicles writes it
+        obj._state.db = database
+    return rejected
+
+
+def _save_vehicles(rows, write):
+    by_database = {}
+    for line, obj in rows:
+        by_database.setdefault(obj._state.db, []).append((line, obj))
+    for alias, group in by_database.items():
+        saved = write(group, alias)
+        if is_shard(alias) and saved:
+            # Updated rows keep their id, so read the ids back for the directory
+            vehicles = Vehicle.objects.using(alias).filter(vehicle_number__in=[obj.vehicle_number for obj in saved])
+            record_vehicle_regions(dict(vehicles.values_list("pk", "region")))
+
+
+VEHICLE_IMPORT = Import(
+    Vehicle,
+    "vehicle_number",
+    VEHICLE_FIELDS,
+    extra_columns={"owner_email": "owner"},
+    prepare=_prepare_vehicles,
+    save=_save_vehicles,
+)
+
+IMPORTS = {"vehicles": VEHICLE_IMPORT, "renters": RENTER_IMPORT}
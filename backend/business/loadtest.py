@@ -0,0 +1,314 @@
+"""
+Load-test harness for the REST endpoints.
+
+``seed_loadtest_data`` creates (once) a renter, vehicles and clients tagged
+with the LOADTEST_DOMAIN email domain. ``build_plan`` turns a seed and an
+endpoint mix into a fixed list of requests, and ``run_plan`` fires them from
+a pool of threads, either in-process through Django's test client or over
+HTTP against a running server, timing every request. ``summarize`` and
+``compare`` produce the JSON results and the regression check.
+"""
+import json
+import random
+import statistics
+import threading
+import time
+from collections import defaultdict
+from datetime import date, timedelta
+from decimal import Decimal
+
+from django.contrib.auth.hashers import make_password
+from django.db import connections
+from django.db.models import Max
+from django.utils import timezone
+
+from authentication.models import Client, Renter
+from business.models import Order, Vehicle
+
+LOADTEST_DOMAIN = "loadtest.invalid"
+VEHICLE_NUMBER_PREFIX = "LT"
+
+DEFAULT_MIX = {
+    "get_all_vehicles": 15,
+    "get_vehicle_details": 30,
+    "check_availability": 25,
+    "create_booking": 10,
+    "list_user_orders": 20,
+}
+
+PATHS = {
+    "get_all_vehicles": "/business/vehicles/",
+    "get_vehicle_details": "/business/vehicle_details/",
+    "check_availability": "/business/booking/availability/",
+    "create_booking": "/business/booking/",
+    "list_user_orders": "/business/user_orders/",
+}
+
+BRANDS = ["Maruti", "Hyundai", "Tata", "Mahindra", "Honda", "Toyota", "Kia", "Royal Enfield"]
+CITIES = ["Kolkata", "Bengaluru", "Mumbai", "Delhi", "Pune", "Hyderabad", "Chennai"]
+
+
+def seed_loadtest_data(vehicles=200, clients=50, seed=0):
+    """
+    Make sure at least ``vehicles`` vehicles and ``clients`` clients of the
+    load-test tenant exist, creating the missing ones deterministically.
+    Returns ``(vehicle_ids, client_tokens)``.
+    """
+    rng = random.Random(seed)
+    owner, _ = Renter.objects.get_or_create(
+        email=f"owner@{LOADTEST_DOMAIN}",
+        defaults={
+            "full_name": "Load Test Fleet",
+            "phone": "+1999000000000",
+            "gender": "Other",
+            "aadhaar": "999900000000",
+            "verification_status": True,
+        },
+    )
+
+    existing = Vehicle.objects.filter(vehicle_number__startswith=VEHICLE_NUMBER_PREFIX).count()
+    new_vehicles = []
+    for index in range(existing, vehicles):
+        brand = rng.choice(BRANDS)
+        vehicle_type = rng.choice(Vehicle.VehicleTypeChoices.values)
+        price_per_day = Decimal(rng.randrange(800, 6000, 50))
+        new_vehicles.append(
+            Vehicle(
+                vehicle_number=f"{VEHICLE_NUMBER_PREFIX}{index:08d}",
+                name=f"{brand} {vehicle_type} {index}",
+                brand=brand,
+                model=f"M{rng.randint(1, 9)}",
+                vehicle_type=vehicle_type,
+                transmission=rng.choice(Vehicle.TransmissionChoices.values),
+                fuel_type=rng.choice(Vehicle.FuelChoices.values),
+                seating_capacity=rng.choice([2, 4, 5, 7]),
+                mileage=round(rng.uniform(8, 40), 1),
+                color=rng.choice(["White", "Black", "Red", "Silver", "Blue"]),
+                location=rng.choice(CITIES),
+                current_odometer=round(rng.uniform(1000, 90000), 1),
+                insurance_expiry_date=date.today() + timedelta(days=rng.randint(30, 700)),
+                price_per_hour=(price_per_day / 10).quantize(Decimal("0.01")),
+                price_per_day=price_per_day,
+                security_deposit=Decimal(rng.randrange(1000, 10000, 500)),
+                image_1="https://example.invalid/1.jpg",
+                image_2="https://example.invalid/2.jpg",
+                image_3="https://example.invalid/3.jpg",
+                rating=round(rng.uniform(3, 5), 1),
+                owner=owner,
+            )
+        )
+    Vehicle.objects.bulk_create(new_vehicles, batch_size=1000)
+
+    existing = Client.objects.filter(email__endswith=f"@{LOADTEST_DOMAIN}").count()
+    Client.objects.bulk_create(
+        [
+            Client(username=f"loadtest{index}", email=f"client{index}@{LOADTEST_DOMAIN}", password=make_password(None))
+            for index in range(existing, clients)
+        ],
+        batch_size=1000,
+    )
+
+    vehicle_ids = list(
+        Vehicle.objects.filter(vehicle_number__startswith=VEHICLE_NUMBER_PREFIX)
+        .order_by("vehicle_number")
+        .values_list("id", flat=True)[:vehicles]
+    )
+    tokens = list(
+        Client.objects.filter(email__endswith=f"@{LOADTEST_DOMAIN}")
+        .order_by("id")
+        .values_list("authToken", flat=True)[:clients]
+    )
+    return [str(v) for v in vehicle_ids], [str(t) for t in tokens]
+
+
+def parse_mix(text):
+    """``"name=weight,name=weight"`` to a mix dict; unknown endpoint names raise ValueError."""
+    mix = {}
+    for part in filter(None, (p.strip() for p in text.split(","))):
+        name, _, weight = part.partition("=")
+        if name not in PATHS:
+            raise ValueError(f"Unknown endpoint '{name}'; choose from {', '.join(PATHS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+
+def build_plan(total, mix, vehicle_ids, tokens, seed=0):
+    """
+    The fixed list of ``(endpoint, method, path, body, token)`` requests for a run.
+    Bookings get consecutive 3-hour windows after every earlier load-test
+    booking, so they mostly succeed and each run adds fresh orders.
+    """
+    rng = random.Random(seed)
+    names = list(mix)
+    weights = [mix[name] for name in names]
+    latest = Order.objects.filter(client__email__endswith=f"@{LOADTEST_DOMAIN}").aggregate(
+        last=Max("return_datetime")
+    )["last"]
+    booking_start = max(latest or timezone.now(), timezone.now()) + timedelta(days=1)
+    booking_start = booking_start.replace(minute=0, second=0, microsecond=0)
+
+    plan = []
+    for index, name in enumerate(rng.choices(names, weights, k=total)):
+        vehicle_id = rng.choice(vehicle_ids)
+        token = rng.choice(tokens)
+        pickup = booking_start + timedelta(hours=3 * index)
+        window = {
+            "vehicle_id": vehicle_id,
+            "pickup_datetime": pickup.isoformat(),
+            "return_datetime": (pickup + timedelta(hours=rng.randint(1, 3))).isoformat(),
+        }
+        if name == "get_all_vehicles":
+            plan.append((name, "GET", PATHS[name], None, None))
+        elif name == "get_vehicle_details":
+            plan.append((name, "POST", PATHS[name], {"vehicle_id": vehicle_id}, None))
+        elif name == "check_availability":
+            plan.append((name, "POST", PATHS[name], window, None))
+        elif name == "create_booking":
+            body = {**window, "pickup_location": "Load test", "dropoff_location": "Load test"}
+            plan.append((name, "POST", PATHS[name], body, token))
+        else:
+            plan.append((name, "POST", PATHS[name], {}, token))
+    return plan
+
+
+class _InProcessTransport:
+    def __init__(self):
+        from django.test import Client as TestClient
+
+        self.client = TestClient(raise_request_exception=False)
+
+    def send(self, method, path, body, token):
+        headers = {"Authorization": f"Token {token}"} if token else {}
+        data = json.dumps(body) if body is not None else ""
+        return self.client.generic(method, path, data, content_type="application/json", headers=headers).status_code
+
+    def close(self):
+        for connection in connections.all(initialized_only=True):
+            connection.close()
+
+
+class _HttpTransport:
+    def __init__(self, base_url):
+        import requests
+
+        self.base_url = base_url.rstrip("/")
+        self.session = requests.Session()
+
+    def send(self, method, path, body, token):
+        headers = {"Authorization": f"Token {token}"} if token else {}
+        response = self.session.request(method, self.base_url + path, json=body, headers=headers, timeout=60)
+        return response.status_code
+
+    def close(self):
+        self.session.close()
+
+
+def run_plan(plan, concurrency=8, base_url=None):
+    """
+    Execute ``plan`` from ``concurrency`` threads. Returns
+    ``(samples, elapsed)`` with one ``(endpoint, status, seconds)`` per request;
+    status 0 means the request raised.
+    """
+    samples = []
+    samples_lock = threading.Lock()
+    next_index = iter(range(len(plan)))
+    index_lock = threading.Lock()
+
+    def worker():
+        transport = _HttpTransport(base_url) if base_url else _InProcessTransport()
+        local = []
+        try:
+            while True:
+                with index_lock:
+                    index = next(next_index, None)
+                if index is None:
+                    break
+                name, method, path, body, token = plan[index]
+                started = time.perf_counter()
+                try:
+                    status = transport.send(method, path, body, token)
+                except Exception:
+                    status = 0
+                local.append((name, status, time.perf_counter() - started))
+        finally:
+            transport.close()
+            with samples_lock:
+                samples.extend(local)
+
+    threads = [threading.Thread(target=worker, name=f"loadtest-{i}") for i in range(concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return samples, time.perf_counter() - started
+
+
+def _latency_stats(latencies, elapsed, errors):
+    latencies = sorted(seconds * 1000 for seconds in latencies)
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        p50, p95, p99 = cuts[49], cuts[94], cuts[98]
+    else:
+        p50 = p95 = p99 = latencies[0] if latencies else 0.0
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "mean_ms": round(statistics.fmean(latencies), 2) if latencies else 0.0,
+        "p50_ms": round(p50, 2),
+        "p95_ms": round(p95, 2),
+        "p99_ms": round(p99, 2),
+        "max_ms": round(latencies[-1], 2) if latencies else 0.0,
+    }
+
+
+def summarize(samples, elapsed):
+    """Overall and per-endpoint stats; errors are exceptions and 5xx responses."""
+    by_endpoint = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample[0]].append(sample)
+
+    def errors(group):
+        return sum(1 for _, status, _ in group if status == 0 or status >= 500)
+
+    def statuses(group):
+        counts = defaultdict(int)
+        for _, status, _ in group:
+            counts[str(status)] += 1
+        return dict(sorted(counts.items()))
+
+    return {
+        "overall": _latency_stats([s for _, _, s in samples], elapsed, errors(samples)),
+        "endpoints": {
+            name: {
+                **_latency_stats([s for _, _, s in group], elapsed, errors(group)),
+                "statuses": statuses(group),
+            }
+            for name, group in sorted(by_endpoint.items())
+        },
+    }
+
+
+def compare(current, baseline, threshold_percent):
+    """
+    Regressions of ``current`` against ``baseline`` beyond ``threshold_percent``:
+    a higher p95 for any endpoint present in both, or lower overall throughput.
+    Returns a list of human-readable findings; empty means no regression.
+    """
+    regressions = []
+    for name, stats in current["endpoints"].items():
+        old = baseline.get("endpoints", {}).get(name)
+        if not old or not old["p95_ms"]:
+            continue
+        change = (stats["p95_ms"] - old["p95_ms"]) / old["p95_ms"] * 100
+        if change > threshold_percent:
+            regressions.append(f"{name}: p95 {old['p95_ms']}ms -> {stats['p95_ms']}ms (+{change:.1f}%)")
+
+    old_rps = baseline.get("overall", {}).get("throughput_rps")
+    new_rps = current["overall"]["throughput_rps"]
+    if old_rps:
+        change = (old_rps - new_rps) / old_rps * 100
+        if change > threshold_percent:
+            regressions.append(f"throughput: {old_rps} -> {new_rps} req/s (-{change:.1f}%)")
+    return regressions
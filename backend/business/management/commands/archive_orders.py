@@ -0,0 +1,49 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from business.archival import archive_closed_orders
+
+
+class Command(BaseCommand):
+    help = "Move completed/cancelled orders older than a cutoff into the ArchivedOrder table."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--older-than-days",
+            type=int,
+            default=None,
+            help="Archive closed orders that returned more than this many days ago "
+            "(default: settings.ORDER_ARCHIVE_AFTER_DAYS).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Orders moved per transaction (default: settings.ORDER_ARCHIVE_BATCH_SIZE).",
+        )
+        parser.add_argument(
+            "--max-batches",
+            type=int,
+            default=None,
+            help="Stop after this many batches (default: run until nothing is left).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="Seconds to pause between batches to limit load on the primary.",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for moved in archive_closed_orders(
+            older_than_days=options["older_than_days"],
+            batch_size=options["batch_size"],
+            max_batches=options["max_batches"],
+        ):
+            total += moved
+            self.stdout.write(f"Archived {total} orders...")
+            if options["sleep"]:
+                time.sleep(options["sleep"])
+        self.stdout.write(self.style.SUCCESS(f"Done. {total} orders archived."))
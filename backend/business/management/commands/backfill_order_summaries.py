@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from business.projections import backfill_order_summaries
+
+
+class Command(BaseCommand):
+    help = "Build (or refresh) OrderSummary rows for all existing orders."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of orders upserted per batch (default: 1000).",
+        )
+
+    def handle(self, *args, **options):
+        total = 0
+        for written in backfill_order_summaries(batch_size=options["batch_size"]):
+            total += written
+            self.stdout.write(f"Backfilled {total} order summaries...")
+        self.stdout.write(self.style.SUCCESS(f"Done. {total} order summaries written."))
@@ -0,0 +1,270 @@
+import copy
+import statistics
+import threading
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.backends.signals import connection_created
+
+from business.models import Vehicle
+from business.views import VEHICLE_DETAILS_SQL, _fetch_vehicle_details
+
+MODES = ("direct", "persistent", "pool")
+PREPARE_THRESHOLD = 5
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare database connection handling under bursty load: a new "
+        "connection per request, persistent per-thread connections and a "
+        "psycopg 3 pool. Also times connection setup and the vehicle details "
+        "query with and without a prepared statement."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--modes",
+            default=",".join(MODES),
+            help="Connection modes to compare, from %s (default: all)." % ", ".join(MODES),
+        )
+        parser.add_argument(
+            "--bursts",
+            type=int,
+            default=20,
+            help="Bursts of simultaneous requests per mode (default: 20).",
+        )
+        parser.add_argument(
+            "--burst-size",
+            type=int,
+            default=16,
+            help="Requests per burst, each on its own thread like gunicorn gthread threads (default: 16).",
+        )
+        parser.add_argument(
+            "--idle",
+            type=float,
+            default=0.5,
+            help="Seconds of idle time between bursts (default: 0.5).",
+        )
+        parser.add_argument(
+            "--pool-min-size",
+            type=int,
+            default=2,
+            help="Connections the pool keeps open (default: 2).",
+        )
+        parser.add_argument(
+            "--pool-max-size",
+            type=int,
+            help="Most connections the pool opens (default: --burst-size).",
+        )
+        parser.add_argument(
+            "--connects",
+            type=int,
+            default=50,
+            help="Connections to open for the setup-cost measurement (default: 50).",
+        )
+        parser.add_argument(
+            "--executions",
+            type=int,
+            default=500,
+            help="Vehicle details queries for the prepared-statement measurement (default: 500).",
+        )
+        parser.add_argument(
+            "--database",
+            default=DEFAULT_DB_ALIAS,
+            help="Database alias to benchmark (default: default).",
+        )
+
+    def handle(self, *args, **options):
+        modes = [mode.strip() for mode in options["modes"].split(",") if mode.strip()]
+        unknown = set(modes) - set(MODES)
+        if unknown:
+            raise CommandError(f"Unknown modes: {', '.join(sorted(unknown))}")
+
+        base = connections[options["database"]]
+        if "pool" in modes and base.vendor != "postgresql":
+            raise CommandError("The pool mode needs PostgreSQL with psycopg 3.")
+        vehicle_id = Vehicle.objects.using(options["database"]).values_list("pk", flat=True).first()
+        if vehicle_id is None:
+            raise CommandError("No vehicles to query; run generate_synthetic_data first.")
+
+        pool_options = {
+            "min_size": options["pool_min_size"],
+            "max_size": options["pool_max_size"] or options["burst_size"],
+        }
+        self.stdout.write(
+            f"{base.vendor} database, {options['bursts']} bursts of {options['burst_size']} requests, "
+            f"{options['idle']}s idle between bursts"
+        )
+
+        self.stdout.write("Connection setup, ms per request:")
+        for mode in modes:
+            with _bench_alias(base, mode, pool_options) as alias:
+                cuts = _percentiles(_connect_times(alias, options["connects"]))
+                self.stdout.write(f"  {mode:<11} p50 {cuts[0]:.2f}  p95 {cuts[1]:.2f}  p99 {cuts[2]:.2f}")
+
+        self.stdout.write("Bursty load:")
+        for mode in modes:
+            with _bench_alias(base, mode, pool_options) as alias:
+                result = _run_bursts(
+                    alias, vehicle_id, options["bursts"], options["burst_size"], options["idle"]
+                )
+            p50, p95, p99 = _percentiles(result["latencies"])
+            self.stdout.write(
+                f"  {mode:<11} {result['throughput']:.1f} req/s in bursts, "
+                f"p50 {p50:.2f}ms p95 {p95:.2f}ms p99 {p99:.2f}ms, "
+                f"{result['connects']} connections opened"
+            )
+            if result["errors"]:
+                self.stdout.write(self.style.WARNING(f"    {result['errors']} requests failed"))
+
+        if base.vendor == "postgresql":
+            self.stdout.write(f"Vehicle details query, {options['executions']} executions on one connection:")
+            for label, prepare in (("client-side binding", False), ("prepared", True)):
+                with _bench_alias(base, "persistent", pool_options, prepare=prepare) as alias:
+                    per_query = _query_time(alias, vehicle_id, options["executions"])
+                self.stdout.write(f"  {label:<20} {per_query * 1000:.3f}ms per query")
+
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+
+class _bench_alias:
+    """
+    A throwaway copy of ``base``'s alias configured for ``mode``, binding
+    parameters on the server and preparing statements if ``prepare``.
+    """
+
+    def __init__(self, base, mode, pool_options, prepare=False):
+        self.alias = f"bench_{mode}_prepared" if prepare else f"bench_{mode}"
+        settings_dict = copy.deepcopy(base.settings_dict)
+        for option in ("pool", "server_side_binding", "prepare_threshold"):
+            settings_dict["OPTIONS"].pop(option, None)
+        settings_dict["CONN_MAX_AGE"] = 600 if mode == "persistent" else 0
+        if mode == "pool":
+            settings_dict["OPTIONS"]["pool"] = dict(pool_options)
+        if prepare:
+            settings_dict["OPTIONS"].update(server_side_binding=True, prepare_threshold=PREPARE_THRESHOLD)
+        self.settings_dict = settings_dict
+
+    def __enter__(self):
+        connections.settings[self.alias] = self.settings_dict
+        return self.alias
+
+    def __exit__(self, *exc_info):
+        connection = connections[self.alias]
+        connection.close()
+        if hasattr(connection, "close_pool"):
+            connection.close_pool()
+        del connections[self.alias]
+        del connections.settings[self.alias]
+
+
+def _connect_times(alias, count):
+    """Seconds to get a usable connection, once per simulated request."""
+    times = []
+    errors = []
+
+    def run():
+        connection = connections[alias]
+        try:
+            for _ in range(count):
+                started = time.perf_counter()
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT 1")
+                times.append(time.perf_counter() - started)
+                # What request_finished does
+                connection.close_if_unusable_or_obsolete()
+        except Exception as e:
+            errors.append(e)
+        finally:
+            connection.close()
+
+    # A fresh thread, so the first iteration really connects
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+    if errors:
+        raise errors[0]
+    return times
+
+
+def _run_bursts(alias, vehicle_id, bursts, burst_size, idle):
+    opened = []
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    barrier = threading.Barrier(burst_size + 1)
+
+    def count_connects(sender, connection, **kwargs):
+        if connection.alias == alias:
+            opened.append(1)
+
+    def worker():
+        connection = connections[alias]
+        for _ in range(bursts):
+            barrier.wait()
+            started = time.perf_counter()
+            try:
+                _fetch_vehicle_details(vehicle_id, using=alias)
+            except Exception:
+                with lock:
+                    errors.append(1)
+            finally:
+                connection.close_if_unusable_or_obsolete()
+            with lock:
+                latencies.append(time.perf_counter() - started)
+            barrier.wait()
+        connection.close()
+
+    connection_created.connect(count_connects)
+    threads = [threading.Thread(target=worker) for _ in range(burst_size)]
+    for thread in threads:
+        thread.start()
+    busy = 0.0
+    try:
+        for _ in range(bursts):
+            started = time.perf_counter()
+            barrier.wait()
+            barrier.wait()
+            busy += time.perf_counter() - started
+            time.sleep(idle)
+    finally:
+        for thread in threads:
+            thread.join()
+        connection_created.disconnect(count_connects)
+
+    pool = getattr(connections[alias], "pool", None)
+    return {
+        "throughput": len(latencies) / busy if busy else 0.0,
+        "latencies": latencies,
+        # connection_created also fires on every checkout from a pool
+        "connects": pool.get_stats()["connections_num"] if pool is not None else len(opened),
+        "errors": len(errors),
+    }
+
+
+def _query_time(alias, vehicle_id, executions):
+    connection = connections[alias]
+    params = [Vehicle._meta.pk.get_db_prep_value(vehicle_id, connection)]
+    try:
+        # Past psycopg's prepare_threshold before timing
+        for _ in range(PREPARE_THRESHOLD + 5):
+            with connection.cursor() as cursor:
+                cursor.execute(VEHICLE_DETAILS_SQL, params)
+                cursor.fetchone()
+        started = time.perf_counter()
+        for _ in range(executions):
+            with connection.cursor() as cursor:
+                cursor.execute(VEHICLE_DETAILS_SQL, params)
+                cursor.fetchone()
+        return (time.perf_counter() - started) / executions
+    finally:
+        connection.close()
+
+
+def _percentiles(seconds):
+    latencies = sorted(value * 1000 for value in seconds)
+    if len(latencies) > 1:
+        cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+        return cuts[49], cuts[94], cuts[98]
+    return latencies[0], latencies[0], latencies[0]
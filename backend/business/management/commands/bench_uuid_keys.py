@@ -0,0 +1,102 @@
+import time
+import uuid
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from backend.utils import uuid7
+
+GENERATORS = {"uuid4": uuid.uuid4, "uuid7": uuid7}
+
+INSERT_SQL = """
+    INSERT INTO {table} (id, payload)
+    SELECT id, %s FROM unnest(%s::uuid[]) AS id
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Insert rows keyed by uuid4 and by uuid7 into scratch PostgreSQL tables shaped "
+        "like business_order's key, and compare insert throughput, index size and how "
+        "well the key follows insertion order."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--rows",
+            type=int,
+            default=10_000_000,
+            help="Rows inserted per key type (default: 10000000).",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows per INSERT, each committed on its own (default: 5000).",
+        )
+        parser.add_argument(
+            "--row-bytes",
+            type=int,
+            default=200,
+            help="Payload per row, roughly an order's width (default: 200).",
+        )
+        parser.add_argument(
+            "--keep",
+            action="store_true",
+            help="Leave the bench_uuid_* tables in place for inspection.",
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != "postgresql":
+            raise CommandError("This benchmark needs PostgreSQL.")
+        rows, batch_size = options["rows"], options["batch_size"]
+        payload = "x" * options["row_bytes"]
+        self.stdout.write(f"{rows} rows per key type, {batch_size} per committed INSERT")
+
+        for name, generate in GENERATORS.items():
+            table = connection.ops.quote_name(f"bench_uuid_{name}")
+            with connection.cursor() as cursor:
+                cursor.execute(f"DROP TABLE IF EXISTS {table}")
+                cursor.execute(
+                    f"CREATE TABLE {table} (id uuid PRIMARY KEY, created_at timestamptz NOT NULL DEFAULT now(), "
+                    "payload text NOT NULL)"
+                )
+            try:
+                batch_seconds = []
+                for offset in range(0, rows, batch_size):
+                    ids = [generate() for _ in range(min(batch_size, rows - offset))]
+                    batch_started = time.perf_counter()
+                    with connection.cursor() as cursor:
+                        cursor.execute(INSERT_SQL.format(table=table), [payload, ids])
+                    batch_seconds.append((len(ids), time.perf_counter() - batch_started))
+
+                with connection.cursor() as cursor:
+                    cursor.execute(f"ANALYZE {table}")
+                    cursor.execute(
+                        "SELECT pg_relation_size(%s), pg_relation_size(%s)",
+                        [f"bench_uuid_{name}", f"bench_uuid_{name}_pkey"],
+                    )
+                    table_bytes, index_bytes = cursor.fetchone()
+                    cursor.execute(
+                        "SELECT correlation FROM pg_stats WHERE tablename = %s AND attname = 'id'",
+                        [f"bench_uuid_{name}"],
+                    )
+                    correlation = cursor.fetchone()[0]
+            finally:
+                if not options["keep"]:
+                    with connection.cursor() as cursor:
+                        cursor.execute(f"DROP TABLE IF EXISTS {table}")
+
+            # Time spent in the database only, not generating ids; the last
+            # tenth is when the index is at its largest
+            tail = batch_seconds[-max(1, len(batch_seconds) // 10):]
+            self.stdout.write(
+                f"  {name}: {_rate(batch_seconds):,.0f} rows/s overall, {_rate(tail):,.0f} rows/s in the last 10%, "
+                f"index {index_bytes / 2**20:,.1f} MiB, table {table_bytes / 2**20:,.1f} MiB, "
+                f"key/insertion-order correlation {correlation:.2f}"
+            )
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+
+def _rate(batches):
+    return sum(rows for rows, _ in batches) / sum(seconds for _, seconds in batches)
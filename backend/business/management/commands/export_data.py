@@ -0,0 +1,63 @@
+import gzip
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.exports import CHUNK_ROWS, FORMATS, export_chunks
+from business.exports import EXPORTS
+from business.sharding import SHARDED_MODELS, databases
+
+
+class Command(BaseCommand):
+    help = (
+        "Export every order (with its client and vehicle), vehicle or client to a CSV "
+        "or JSON Lines file, streamed from a server-side cursor so memory use does not "
+        "grow with the table. Orders and vehicles are read from every shard."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("table", choices=sorted(EXPORTS), help="What to export.")
+        parser.add_argument(
+            "--format",
+            choices=sorted(FORMATS),
+            default="csv",
+            help="Output format (default: csv).",
+        )
+        parser.add_argument(
+            "--output",
+            help="File to write (default: ./<table>.<format>, plus .gz with --gzip).",
+        )
+        parser.add_argument(
+            "--gzip",
+            action="store_true",
+            help="Compress the output with gzip.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_ROWS,
+            help=f"Rows fetched from the cursor at a time (default: {CHUNK_ROWS}).",
+        )
+
+    def handle(self, *args, **options):
+        export = EXPORTS[options["table"]]
+        fmt = options["format"]
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        output = options["output"] or f"{options['table']}.{fmt}" + (".gz" if options["gzip"] else "")
+        opener = gzip.open if options["gzip"] else open
+
+        started = time.perf_counter()
+        written = 0
+        with opener(output, "wt", encoding="utf-8", newline="") as f:
+            for index, alias in enumerate(databases() if export.model in SHARDED_MODELS else [None]):
+                queryset = export.model.objects.using(alias).order_by("pk")
+                for chunk in export_chunks(export, queryset, fmt, options["chunk_size"], header=index == 0):
+                    f.write(chunk)
+                    written += len(chunk)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Exported {options['table']} to {output} "
+                f"({written / 2**20:,.1f} MiB of text in {time.perf_counter() - started:.1f}s)."
+            )
+        )
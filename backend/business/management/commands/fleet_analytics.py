@@ -0,0 +1,101 @@
+import csv
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+
+import numpy as np
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from business.analytics import IDLE_GAP_BINS_HOURS, fleet_report, load_intervals
+
+
+class Command(BaseCommand):
+    help = (
+        "Compute per-vehicle utilization, hour-of-day demand and idle-gap "
+        "distribution over booking history and write them as CSV files."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=90,
+            help="Length of the analysed window, ending now (default: 90).",
+        )
+        parser.add_argument(
+            "--output-dir",
+            default="analytics",
+            help="Directory the CSV files are written to (default: ./analytics).",
+        )
+        parser.add_argument(
+            "--synthetic",
+            type=int,
+            default=0,
+            help="Skip the database and benchmark on this many random intervals instead.",
+        )
+
+    def handle(self, *args, **options):
+        window_end = int(timezone.now().timestamp())
+        window_start = window_end - int(timedelta(days=options["days"]).total_seconds())
+
+        started = time.perf_counter()
+        if options["synthetic"]:
+            vehicle_ids, codes, starts, ends = self._synthetic(
+                options["synthetic"], window_start, window_end
+            )
+        else:
+            vehicle_ids, codes, starts, ends = load_intervals(
+                datetime.fromtimestamp(window_start, tz=dt_timezone.utc),
+                datetime.fromtimestamp(window_end, tz=dt_timezone.utc),
+            )
+        loaded = time.perf_counter()
+
+        report = fleet_report(codes, starts, ends, len(vehicle_ids), window_start, window_end)
+        computed = time.perf_counter()
+
+        output_dir = Path(options["output_dir"])
+        output_dir.mkdir(parents=True, exist_ok=True)
+        self._write_reports(output_dir, vehicle_ids, report)
+
+        self.stdout.write(
+            f"{len(codes)} intervals over {len(vehicle_ids)} vehicles: "
+            f"load {loaded - started:.2f}s, compute {computed - loaded:.2f}s"
+        )
+        self.stdout.write(self.style.SUCCESS(f"Reports written to {output_dir.resolve()}"))
+
+    def _synthetic(self, n, window_start, window_end):
+        rng = np.random.default_rng(0)
+        n_vehicles = max(1, n // 100)
+        codes = rng.integers(0, n_vehicles, n, dtype=np.int64)
+        starts = rng.integers(window_start, window_end, n, dtype=np.int64)
+        ends = starts + rng.integers(3600, 3 * 24 * 3600, n, dtype=np.int64)
+        return [f"synthetic-{i}" for i in range(n_vehicles)], codes, starts, ends
+
+    def _write_reports(self, output_dir, vehicle_ids, report):
+        with open(output_dir / "vehicle_utilization.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["vehicle_id", "busy_hours", "utilization"])
+            busy_hours = report["busy_seconds"] / 3600
+            for vehicle_id, hours, ratio in zip(vehicle_ids, busy_hours, report["utilization"]):
+                writer.writerow([vehicle_id, f"{hours:.2f}", f"{ratio:.4f}"])
+
+        with open(output_dir / "demand_by_hour.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["hour", "mean_active_bookings", "peak_active_bookings"])
+            for hour in range(24):
+                writer.writerow([hour, f"{report['demand_mean'][hour]:.2f}", report["demand_peak"][hour]])
+
+        with open(output_dir / "idle_gaps.csv", "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["from_hours", "to_hours", "count"])
+            for lower, upper, count in zip(
+                IDLE_GAP_BINS_HOURS, IDLE_GAP_BINS_HOURS[1:], report["idle_gap_histogram"]
+            ):
+                writer.writerow([lower, upper, count])
+            gaps = report["idle_gaps"] / 3600
+            if len(gaps):
+                p50, p90 = np.percentile(gaps, [50, 90])
+                writer.writerow([])
+                writer.writerow(["median_hours", f"{p50:.2f}"])
+                writer.writerow(["p90_hours", f"{p90:.2f}"])
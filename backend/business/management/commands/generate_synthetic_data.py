@@ -0,0 +1,135 @@
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from business.synthetic import (
+    DEFAULT_AS_OF,
+    DEFAULT_START,
+    generate_synthetic_data,
+    purge_synthetic_data,
+    synthetic_data_exists,
+)
+
+
+def _utc_date(value):
+    return datetime.fromisoformat(value).replace(tzinfo=dt_timezone.utc)
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a deterministic synthetic data set (renters, vehicles, clients with details, "
+        "non-overlapping orders) for scale testing, and report rows/sec per table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--renters",
+            type=int,
+            default=2000,
+            help="Renters owning the vehicles (default: 2000).",
+        )
+        parser.add_argument(
+            "--vehicles",
+            type=int,
+            default=100_000,
+            help="Vehicles, spread over the renters (default: 100000).",
+        )
+        parser.add_argument(
+            "--clients",
+            type=int,
+            default=1_000_000,
+            help="Clients, each with a ClientDetails row (default: 1000000).",
+        )
+        parser.add_argument(
+            "--orders",
+            type=int,
+            default=10_000_000,
+            help="Orders, spread evenly over the vehicles (default: 10000000).",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed; the same seed and counts always produce the same rows (default: 0).",
+        )
+        parser.add_argument(
+            "--start",
+            type=_utc_date,
+            default=DEFAULT_START,
+            help="Earliest booking date, YYYY-MM-DD in UTC (default: %s)." % DEFAULT_START.date(),
+        )
+        parser.add_argument(
+            "--as-of",
+            type=_utc_date,
+            default=DEFAULT_AS_OF,
+            help="Bookings returned before this date are closed, later ones ongoing or upcoming "
+            "(default: %s)." % DEFAULT_AS_OF.date(),
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=5000,
+            help="Rows written per transaction (default: 5000).",
+        )
+        parser.add_argument(
+            "--no-copy",
+            action="store_true",
+            help="Use bulk_create on PostgreSQL too instead of COPY.",
+        )
+        parser.add_argument(
+            "--purge",
+            action="store_true",
+            help="Delete previously generated synthetic rows first.",
+        )
+
+    def handle(self, *args, **options):
+        if options["orders"] and not (options["vehicles"] and options["clients"]):
+            raise CommandError("Orders need at least one vehicle and one client.")
+
+        if synthetic_data_exists():
+            if not options["purge"]:
+                raise CommandError("Synthetic data already exists; pass --purge to replace it.")
+            self.stdout.write("Purging existing synthetic data...")
+            purge_synthetic_data()
+
+        use_copy = connection.vendor == "postgresql" and not options["no_copy"]
+        self.stdout.write(
+            f"Writing to the {connection.vendor} database with {'COPY' if use_copy else 'bulk_create'} "
+            f"in batches of {options['batch_size']}"
+        )
+
+        reported = {}
+
+        def progress(table, rows):
+            # Report roughly every 100k rows
+            if rows // 100_000 != reported.get(table, 0) // 100_000:
+                self.stdout.write(f"  {table}: {rows} rows...")
+            reported[table] = rows
+
+        started = time.perf_counter()
+        stats = generate_synthetic_data(
+            renters=options["renters"],
+            vehicles=options["vehicles"],
+            clients=options["clients"],
+            orders=options["orders"],
+            seed=options["seed"],
+            start=options["start"],
+            as_of=options["as_of"],
+            batch_size=options["batch_size"],
+            use_copy=use_copy,
+            progress=progress,
+        )
+        elapsed = time.perf_counter() - started
+
+        total = 0
+        for table, (rows, seconds) in stats.items():
+            total += rows
+            rate = rows / seconds if seconds else 0
+            self.stdout.write(f"  {table:<16}{rows:>12} rows {seconds:>9.1f}s {rate:>12,.0f} rows/sec")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Done. {total} rows in {elapsed:.1f}s ({total / elapsed if elapsed else 0:,.0f} rows/sec)."
+            )
+        )
@@ -0,0 +1,80 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from backend.imports import CHUNK_ROWS, FORMATS, detect_format, import_records, open_text, read_records
+from business.imports import IMPORTS
+
+
+class Command(BaseCommand):
+    help = (
+        "Import vehicles or renters from a CSV or JSON Lines file (optionally gzipped), "
+        "inserting new rows and updating existing ones matched on vehicle_number / email. "
+        "Invalid rows are reported by line and skipped."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("table", choices=sorted(IMPORTS), help="What to import.")
+        parser.add_argument("path", help="File to read; .csv or .jsonl, optionally with .gz.")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Format of the file, when its name doesn't tell.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=CHUNK_ROWS,
+            help=f"Rows validated and written per transaction (default: {CHUNK_ROWS}).",
+        )
+        parser.add_argument(
+            "--added-by",
+            help="Username of the admin user recorded as adding new renters.",
+        )
+
+    def handle(self, *args, **options):
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be positive.")
+        if options["format"]:
+            fmt, gzipped = options["format"], options["path"].lower().endswith(".gz")
+        else:
+            try:
+                fmt, gzipped = detect_format(options["path"])
+            except ValueError as e:
+                raise CommandError(e)
+
+        context = {}
+        if options["added_by"]:
+            if options["table"] != "renters":
+                raise CommandError("--added-by only applies to renters.")
+            try:
+                context["added_by"] = get_user_model().objects.get_by_natural_key(options["added_by"])
+            except get_user_model().DoesNotExist:
+                raise CommandError(f"No user {options['added_by']!r}.")
+
+        started = time.perf_counter()
+        result = None
+        try:
+            with open(options["path"], "rb") as f:
+                records = read_records(open_text(f, gzipped), fmt)
+                for result in import_records(IMPORTS[options["table"]], records, options["chunk_size"], **context):
+                    if options["verbosity"] > 1:
+                        self.stdout.write(f"{result.read} rows read, {result.saved} saved, {result.failed} failed...")
+        except ValueError as e:
+            raise CommandError(e)
+        except OSError as e:
+            raise CommandError(f"Can't read {options['path']}: {e}")
+        if result is None:
+            raise CommandError(f"{options['path']} has no rows.")
+
+        for error in result.errors:
+            self.stderr.write(f"Line {error.line}: {error.message}")
+        if result.failed > len(result.errors):
+            self.stderr.write(f"...and {result.failed - len(result.errors)} more.")
+        elapsed = time.perf_counter() - started
+        summary = (
+            f"Done. {result.saved} of {result.read} {options['table']} saved, {result.failed} failed, "
+            f"in {elapsed:.1f}s ({result.read / elapsed:,.0f} rows/s)."
+        )
+        self.stdout.write(self.style.WARNING(summary) if result.failed else self.style.SUCCESS(summary))
@@ -0,0 +1,168 @@
+import json
+import platform
+import subprocess
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.utils import timezone
+
+from business.loadtest import (
+    DEFAULT_MIX,
+    build_plan,
+    compare,
+    parse_mix,
+    run_plan,
+    seed_loadtest_data,
+    summarize,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed load-test data and drive a weighted mix of the vehicle, availability, "
+        "booking and order endpoints; report throughput and latency percentiles, "
+        "write them as JSON and optionally fail on regressions against a baseline."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=2000,
+            help="Total requests in the measured run (default: 2000).",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=8,
+            help="Client threads sending requests (default: 8).",
+        )
+        parser.add_argument(
+            "--mix",
+            default=",".join(f"{name}={weight}" for name, weight in DEFAULT_MIX.items()),
+            help="Endpoint weights as name=weight,... (default: %(default)s).",
+        )
+        parser.add_argument(
+            "--seed",
+            type=int,
+            default=0,
+            help="Seed for the generated data and the request sequence (default: 0).",
+        )
+        parser.add_argument(
+            "--vehicles",
+            type=int,
+            default=200,
+            help="Load-test vehicles to seed and target (default: 200).",
+        )
+        parser.add_argument(
+            "--clients",
+            type=int,
+            default=50,
+            help="Load-test clients to seed and send requests as (default: 50).",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=100,
+            help="Unmeasured requests sent first (default: 100).",
+        )
+        parser.add_argument(
+            "--base-url",
+            help="Send requests over HTTP to this running server (same database) instead of in-process.",
+        )
+        parser.add_argument(
+            "--output",
+            help="Write the results as JSON to this file.",
+        )
+        parser.add_argument(
+            "--baseline",
+            help="Results JSON of an earlier run to compare against.",
+        )
+        parser.add_argument(
+            "--threshold",
+            type=float,
+            default=10.0,
+            help="Percent regression in an endpoint's p95 or in overall throughput that fails the run (default: 10).",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            mix = parse_mix(options["mix"])
+        except ValueError as e:
+            raise CommandError(str(e))
+
+        vehicle_ids, tokens = seed_loadtest_data(options["vehicles"], options["clients"], options["seed"])
+        self.stdout.write(f"Seeded {len(vehicle_ids)} vehicles and {len(tokens)} clients")
+
+        target = options["base_url"] or "in-process"
+        self.stdout.write(
+            f"{options['requests']} requests, {options['concurrency']} concurrent, "
+            f"{connection.vendor} database, {target}"
+        )
+        if options["warmup"]:
+            warmup = build_plan(options["warmup"], mix, vehicle_ids, tokens, seed=options["seed"] + 1)
+            run_plan(warmup, options["concurrency"], options["base_url"])
+        plan = build_plan(options["requests"], mix, vehicle_ids, tokens, seed=options["seed"])
+        samples, elapsed = run_plan(plan, options["concurrency"], options["base_url"])
+
+        results = {
+            "meta": {
+                "commit": self._git_commit(),
+                "timestamp": timezone.now().isoformat(),
+                "database": connection.vendor,
+                "target": target,
+                "python": platform.python_version(),
+                "requests": options["requests"],
+                "concurrency": options["concurrency"],
+                "seed": options["seed"],
+                "mix": mix,
+                "elapsed_s": round(elapsed, 3),
+            },
+            **summarize(samples, elapsed),
+        }
+        self._report(results)
+
+        if options["output"]:
+            Path(options["output"]).write_text(json.dumps(results, indent=2))
+            self.stdout.write(f"Results written to {options['output']}")
+
+        if options["baseline"]:
+            baseline = json.loads(Path(options["baseline"]).read_text())
+            regressions = compare(results, baseline, options["threshold"])
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(f"  regression {regression}"))
+                raise CommandError(
+                    f"{len(regressions)} regression(s) beyond {options['threshold']}% "
+                    f"against {baseline['meta'].get('commit') or options['baseline']}"
+                )
+            self.stdout.write(f"No regressions beyond {options['threshold']}% against the baseline")
+
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def _git_commit(self):
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"],
+                cwd=settings.BASE_DIR,
+                capture_output=True,
+                text=True,
+                check=True,
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def _report(self, results):
+        overall = results["overall"]
+        self.stdout.write(
+            f"Overall: {overall['throughput_rps']} req/s, {overall['errors']} errors, "
+            f"p50 {overall['p50_ms']}ms p95 {overall['p95_ms']}ms p99 {overall['p99_ms']}ms"
+        )
+        self.stdout.write(f"  {'endpoint':<22}{'reqs':>7}{'errors':>8}{'p50':>10}{'p95':>10}{'p99':>10}  statuses")
+        for name, stats in results["endpoints"].items():
+            self.stdout.write(
+                f"  {name:<22}{stats['requests']:>7}{stats['errors']:>8}"
+                f"{stats['p50_ms']:>10}{stats['p95_ms']:>10}{stats['p99_ms']:>10}  {stats['statuses']}"
+            )
@@ -0,0 +1,43 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from business.sharding import move_region
+
+
+class Command(BaseCommand):
+    help = (
+        "Move a region's vehicles, orders and archived orders to another database "
+        "(a shard in settings.DATABASE_SHARDS, or default) in batches."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("region", help="Region to move, as in Vehicle.region.")
+        parser.add_argument("database", help="Alias of the database to move it to.")
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Rows copied or deleted per transaction (default: 500).",
+        )
+        parser.add_argument(
+            "--sleep",
+            type=float,
+            default=0.0,
+            help="Seconds to pause between batches to limit load on both databases.",
+        )
+
+    def handle(self, *args, **options):
+        totals = {}
+        try:
+            for step, model, rows in move_region(options["region"], options["database"], options["batch_size"]):
+                key = (step, model._meta.verbose_name_plural)
+                totals[key] = totals.get(key, 0) + rows
+                self.stdout.write(f"{step.capitalize()} {totals[key]} {key[1]}...")
+                if options["sleep"]:
+                    time.sleep(options["sleep"])
+        except ValueError as e:
+            raise CommandError(e)
+        if not totals:
+            self.stdout.write(f"{options['region']} is already on {options['database']}.")
+        self.stdout.write(self.style.SUCCESS(f"Done. {options['region']} lives on {options['database']}."))
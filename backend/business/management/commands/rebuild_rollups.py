@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from business.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute the daily vehicle and renter rollups from scratch out of Order and ArchivedOrder. "
+        "refresh_rollups runs are blocked until it finishes."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=5000,
+            help="Orders read and folded per chunk (default: 5000).",
+        )
+
+    def handle(self, *args, **options):
+        replayed = rebuild_rollups(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Done. Rollups rebuilt from {replayed} orders."))
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from business.rollups import refresh_rollups
+
+
+class Command(BaseCommand):
+    help = "Fold new order events into the daily vehicle and renter rollups."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Events applied per transaction (default: 500).",
+        )
+        parser.add_argument(
+            "--settle-seconds",
+            type=int,
+            default=5,
+            help="Ignore events younger than this to avoid skipping in-flight commits (default: 5).",
+        )
+
+    def handle(self, *args, **options):
+        processed = refresh_rollups(
+            batch_size=options["batch_size"],
+            settle_seconds=options["settle_seconds"],
+        )
+        self.stdout.write(self.style.SUCCESS(f"Done. {processed} events applied."))
@@ -0,0 +1,126 @@
+import json
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+# Run in a fresh interpreter so nothing is already imported
+IMPORT_SCRIPT = """
+from backend.wsgi import application
+from django.urls import get_resolver
+get_resolver().url_patterns
+"""
+
+FIRST_RESPONSE_SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from wsgiref.util import setup_testing_defaults
+from backend.wsgi import application
+booted = time.perf_counter()
+timings = {}
+if sys.argv[2] == "warm":
+    from backend.warmup import warm_up
+    timings = warm_up()
+warmed = time.perf_counter()
+environ = {"PATH_INFO": sys.argv[1], "REQUEST_METHOD": "GET"}
+setup_testing_defaults(environ)
+status = []
+b"".join(application(environ, lambda code, headers, exc_info=None: status.append(code)))
+done = time.perf_counter()
+print(json.dumps({
+    "status": status[0],
+    "boot": booted - started,
+    "warm_up": warmed - booted,
+    "first_request": done - warmed,
+    "steps": timings,
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Profile cold start: import time per top-level module (python -X importtime) "
+        "and time to first response with and without the warm-up hooks."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--top",
+            type=int,
+            default=25,
+            help="Number of modules listed (default: 25).",
+        )
+        parser.add_argument(
+            "--path",
+            default="/admin/login/",
+            help="Path requested for the time-to-first-response run (default: /admin/login/).",
+        )
+        parser.add_argument(
+            "--runs",
+            type=int,
+            default=3,
+            help="Fresh processes started per measurement; the median is reported (default: 3).",
+        )
+
+    def handle(self, *args, **options):
+        self._report_imports(options["top"])
+        for mode in ("cold", "warm"):
+            self._report_first_response(options["path"], mode, options["runs"])
+        self.stdout.write(self.style.SUCCESS("Done."))
+
+    def _run(self, *args):
+        started = time.perf_counter()
+        result = subprocess.run(
+            [sys.executable, *args],
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        return result, time.perf_counter() - started
+
+    def _report_imports(self, top):
+        result, elapsed = self._run("-X", "importtime", "-c", IMPORT_SCRIPT)
+
+        # importtime lines: "import time: self [us] | cumulative | imported package"
+        self_us = defaultdict(int)
+        cumulative_us = {}
+        for line in result.stderr.splitlines():
+            if not line.startswith("import time:") or "imported package" in line:
+                continue
+            own, cumulative, name = line[len("import time:"):].split("|")
+            indent = len(name) - len(name.lstrip())
+            package = name.strip().split(".")[0]
+            self_us[package] += int(own)
+            if indent == 1:
+                cumulative_us[name.strip()] = int(cumulative)
+
+        self.stdout.write(f"Startup imports (process total {elapsed * 1000:.0f}ms)")
+        self.stdout.write("  self ms by top-level package:")
+        for package, own in sorted(self_us.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f"    {own / 1000:8.1f}  {package}")
+        self.stdout.write("  cumulative ms by module imported first-hand:")
+        for module, cumulative in sorted(cumulative_us.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f"    {cumulative / 1000:8.1f}  {module}")
+
+    def _report_first_response(self, path, mode, runs):
+        samples = []
+        for _ in range(max(runs, 1)):
+            result, elapsed = self._run("-c", FIRST_RESPONSE_SCRIPT, path, mode)
+            sample = json.loads(result.stdout.strip().splitlines()[-1])
+            sample["total"] = elapsed
+            samples.append(sample)
+        samples.sort(key=lambda sample: sample["total"])
+        median = samples[len(samples) // 2]
+
+        label = "with warm-up" if mode == "warm" else "without warm-up"
+        self.stdout.write(f"Time to first response, {label} ({path} -> {median['status']})")
+        self.stdout.write(
+            f"  process {median['total'] * 1000:.0f}ms: boot {median['boot'] * 1000:.0f}ms, "
+            f"warm-up {median['warm_up'] * 1000:.0f}ms, first request {median['first_request'] * 1000:.0f}ms"
+        )
+        for step, seconds in median["steps"].items():
+            self.stdout.write(f"    {step}: {seconds * 1000:.0f}ms")
@@ -0,0 +1,40 @@
+# Generated by Django 5.2.1 on 2025-06-02 10:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0010_renter_verification_status'),
+        ('business', '0004_order_otp'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='OrderSummary',
+            fields=[
+                ('order_id', models.UUIDField(editable=False, help_text='Id of the summarized order.', primary_key=True, serialize=False)),
+                ('vehicle_id', models.UUIDField(help_text='Id of the booked vehicle.')),
+                ('owner_id', models.UUIDField(blank=True, help_text='user_id of the renter owning the vehicle when it was booked.', null=True)),
+                ('vehicle_name', models.CharField(help_text='Vehicle name at booking time.', max_length=100)),
+                ('vehicle_number', models.CharField(help_text='Vehicle registration number at booking time.', max_length=15)),
+                ('vehicle_thumbnail', models.TextField(blank=True, help_text='Primary vehicle image at booking time.')),
+                ('agreed_price', models.DecimalField(decimal_places=2, help_text='Rental amount agreed at booking time.', max_digits=10)),
+                ('security_deposit', models.DecimalField(decimal_places=2, help_text='Security deposit agreed at booking time.', max_digits=10)),
+                ('pickup_datetime', models.DateTimeField(help_text='Scheduled pickup date and time.')),
+                ('return_datetime', models.DateTimeField(help_text='Scheduled return date and time.')),
+                ('order_status', models.CharField(help_text='Mirrors Order.order_status.', max_length=20)),
+                ('payment_status', models.CharField(help_text='Mirrors Order.payment_status.', max_length=20)),
+                ('created_at', models.DateTimeField(help_text='Timestamp when the order was created.')),
+                ('client', models.ForeignKey(help_text='Client who placed the order.', on_delete=django.db.models.deletion.CASCADE, related_name='order_summaries', to='authentication.client')),
+            ],
+            options={
+                'verbose_name': 'Order Summary',
+                'verbose_name_plural': 'Order Summaries',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['client', '-created_at'], name='ordersummary_client_idx'), models.Index(fields=['owner_id', '-created_at'], name='ordersummary_owner_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2025-06-02 10:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0010_renter_verification_status'),
+        ('business', '0005_ordersummary'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedOrder',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('pickup_datetime', models.DateTimeField(help_text='Scheduled pickup date and time.')),
+                ('return_datetime', models.DateTimeField(help_text='Scheduled return date and time.')),
+                ('actual_return_datetime', models.DateTimeField(blank=True, help_text='Actual date and time when the vehicle was returned (optional).', null=True)),
+                ('pickup_location', models.TextField(help_text='Pickup location for the vehicle.')),
+                ('dropoff_location', models.TextField(help_text='Drop-off location for the vehicle.')),
+                ('rental_amount', models.DecimalField(decimal_places=2, help_text='Total rental cost for the booking.', max_digits=10)),
+                ('security_deposit', models.DecimalField(decimal_places=2, help_text='Security deposit collected.', max_digits=10)),
+                ('late_fee', models.DecimalField(decimal_places=2, default=0.0, help_text='Late return penalty fee.', max_digits=10)),
+                ('otp', models.CharField(blank=True, help_text='One-time passcode used at handover.', max_length=6, null=True)),
+                ('payment_status', models.CharField(help_text='Payment status when archived.', max_length=20)),
+                ('order_status', models.CharField(help_text='Order status when archived.', max_length=20)),
+                ('created_at', models.DateTimeField(help_text='Timestamp when the order was created.')),
+                ('updated_at', models.DateTimeField(help_text='Timestamp when the order was last updated.')),
+                ('notes', models.TextField(blank=True, help_text='Any additional notes or remarks.')),
+                ('archived_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the order was archived.')),
+                ('client', models.ForeignKey(help_text='Client who placed this order.', on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to='authentication.client')),
+                ('vehicle', models.ForeignKey(help_text='Vehicle associated with this order.', on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to='business.vehicle')),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['client', '-created_at'], name='archivedorder_client_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.1 on 2025-06-02 10:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0010_renter_verification_status'),
+        ('business', '0006_archivedorder'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('consumer', models.CharField(help_text='Name of the consumer.', max_length=100, unique=True)),
+                ('position', models.BigIntegerField(default=0, help_text='Id of the last event processed.')),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Last time the cursor advanced.')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='OrderEvent',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('event_type', models.CharField(choices=[('created', 'Created'), ('cancelled', 'Cancelled'), ('started', 'Started'), ('completed', 'Completed'), ('paid', 'Paid')], help_text='Kind of state change.', max_length=20)),
+                ('order_id', models.UUIDField(db_index=True, help_text='Id of the order that changed.')),
+                ('client_id', models.BigIntegerField(help_text='Id of the client who placed the order.')),
+                ('vehicle_id', models.UUIDField(help_text='Id of the booked vehicle.')),
+                ('owner_id', models.UUIDField(blank=True, help_text='user_id of the renter owning the vehicle.', null=True)),
+                ('amount', models.DecimalField(decimal_places=2, help_text='Rental amount of the order at the time of the event.', max_digits=10)),
+                ('pickup_datetime', models.DateTimeField(help_text='Scheduled pickup of the order.')),
+                ('return_datetime', models.DateTimeField(help_text='Scheduled return of the order.')),
+                ('created_at', models.DateTimeField(auto_now_add=True, help_text='Timestamp when the event was recorded.')),
+            ],
+            options={
+                'ordering': ['id'],
+            },
+        ),
+    ]
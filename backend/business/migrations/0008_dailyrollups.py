@@ -0,0 +1,51 @@
+# Generated by Django 5.2.1 on 2025-06-02 10:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0010_renter_verification_status'),
+        ('business', '0007_ordereventlog'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RenterDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Local calendar day.')),
+                ('owner_id', models.UUIDField(help_text='user_id of the renter.')),
+                ('bookings', models.IntegerField(default=0, help_text='Active bookings picking up on this day.')),
+                ('cancellations', models.IntegerField(default=0, help_text='Bookings for this day that were cancelled.')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Rental amount of active bookings picking up on this day.', max_digits=12)),
+                ('paid_revenue', models.DecimalField(decimal_places=2, default=0, help_text='Rental amount of paid bookings picking up on this day.', max_digits=12)),
+                ('booked_seconds', models.BigIntegerField(default=0, help_text='Seconds of this day covered by active bookings.')),
+            ],
+            options={
+                'ordering': ['date'],
+                'indexes': [models.Index(fields=['date'], name='renterdailyrollup_date_idx')],
+                'constraints': [models.UniqueConstraint(fields=('owner_id', 'date'), name='renterdailyrollup_owner_date_uniq')],
+            },
+        ),
+        migrations.CreateModel(
+            name='VehicleDailyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(help_text='Local calendar day.')),
+                ('vehicle_id', models.UUIDField(help_text='Id of the vehicle.')),
+                ('owner_id', models.UUIDField(blank=True, help_text='user_id of the renter owning the vehicle.', null=True)),
+                ('bookings', models.IntegerField(default=0, help_text='Active bookings picking up on this day.')),
+                ('cancellations', models.IntegerField(default=0, help_text='Bookings for this day that were cancelled.')),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, help_text='Rental amount of active bookings picking up on this day.', max_digits=12)),
+                ('paid_revenue', models.DecimalField(decimal_places=2, default=0, help_text='Rental amount of paid bookings picking up on this day.', max_digits=12)),
+                ('booked_seconds', models.BigIntegerField(default=0, help_text='Seconds of this day covered by active bookings.')),
+            ],
+            options={
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('vehicle_id', 'date'), name='vehicledailyrollup_vehicle_date_uniq')],
+            },
+        ),
+    ]
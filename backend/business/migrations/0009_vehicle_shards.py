@@ -0,0 +1,54 @@
+# Generated by Django 5.2.1 on 2026-10-19 05:20
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('authentication', '0012_client_password_hash'),
+        ('business', '0008_dailyrollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RegionShard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('region', models.CharField(help_text='City/region, as in Vehicle.region.', max_length=50, unique=True)),
+                ('database', models.CharField(help_text='Alias of the shard in settings.DATABASE_SHARDS.', max_length=50)),
+                ('updated_at', models.DateTimeField(auto_now=True, help_text='Last time the region moved.')),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VehicleDirectory',
+            fields=[
+                ('vehicle_id', models.UUIDField(help_text='Id of the vehicle.', primary_key=True, serialize=False)),
+                ('region', models.CharField(help_text='Region of the vehicle.', max_length=50)),
+            ],
+            options={
+                'verbose_name_plural': 'Vehicle directory',
+            },
+        ),
+        migrations.AddField(
+            model_name='vehicle',
+            name='region',
+            field=models.CharField(blank=True, db_index=True, default='', help_text='City/region the vehicle is listed in; decides which database holds it (see business/sharding.py). Use the move_region command to move a region.', max_length=50),
+        ),
+        migrations.AlterField(
+            model_name='archivedorder',
+            name='client',
+            field=models.ForeignKey(db_constraint=False, help_text='Client who placed this order.', on_delete=django.db.models.deletion.CASCADE, related_name='archived_orders', to='authentication.client'),
+        ),
+        migrations.AlterField(
+            model_name='order',
+            name='client',
+            field=models.ForeignKey(db_constraint=False, help_text='Client who placed this order.', on_delete=django.db.models.deletion.CASCADE, related_name='orders', to='authentication.client'),
+        ),
+        migrations.AlterField(
+            model_name='vehicle',
+            name='owner',
+            field=models.ForeignKey(blank=True, db_constraint=False, help_text='Renter who owns this vehicle.', null=True, on_delete=django.db.models.deletion.SET_NULL, to='authentication.renter'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.1 on 2026-10-19 06:10
+
+import backend.utils
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('business', '0009_vehicle_shards'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='order',
+            name='id',
+            field=models.UUIDField(default=backend.utils.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+        migrations.AlterField(
+            model_name='vehicle',
+            name='id',
+            field=models.UUIDField(default=backend.utils.uuid7, editable=False, primary_key=True, serialize=False),
+        ),
+    ]
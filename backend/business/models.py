@@ -1,8 +1,7 @@
-import uuid
-
 from django.db import models
 
 from authentication.models import Client, Renter
+from backend.utils import uuid7
 
 
 class Vehicle(models.Model):
@@ -27,7 +26,7 @@ class Vehicle(models.Model):
         TRUCK = "Truck"
         OTHER = "Other"
 
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     vehicle_number = models.CharField(
         max_length=15,
@@ -64,6 +63,14 @@ class Vehicle(models.Model):
         help_text="Top speed in km/h (optional)."
     )
     location = models.TextField(help_text="Current location of the vehicle.")
+    region = models.CharField(
+        max_length=50,
+        blank=True,
+        default="",
+        db_index=True,
+        help_text="City/region the vehicle is listed in; decides which database holds it "
+        "(see business/sharding.py). Use the move_region command to move a region.",
+    )
     current_odometer = models.FloatField(help_text="Current odometer reading in kilometers.")
     insurance_expiry_date = models.DateField(help_text="Insurance expiry date of the vehicle.")
 
@@ -99,6 +106,8 @@ class Vehicle(models.Model):
         on_delete=models.SET_NULL,
         null=True,
         blank=True,
+        # Renters stay on the primary while vehicles may live on a shard
+        db_constraint=False,
         help_text="Renter who owns this vehicle."
     )
 
@@ -113,17 +122,25 @@ class Vehicle(models.Model):
     def __str__(self):
         return f"{self.name} ({self.vehicle_number})"
 
+    class Meta:
+        indexes = [
+            # The admin's date drill-down
+            models.Index(fields=["added_on"], name="vehicle_added_on_idx"),
+        ]
+
 
 class Order(models.Model):
     """
     Represents a Order on the Platform
     """
-    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    id = models.UUIDField(primary_key=True, default=uuid7, editable=False)
 
     client = models.ForeignKey(
         Client,
         on_delete=models.CASCADE,
         related_name="orders",
+        # Clients stay on the primary while orders may live on a shard
+        db_constraint=False,
         help_text="Client who placed this order."
     )
     vehicle = models.ForeignKey(
@@ -194,7 +211,250 @@ class Order(models.Model):
     notes = models.TextField(blank=True, help_text="Any additional notes or remarks.")
 
     def __str__(self):
-        return f"Order {self.id} | {self.client.username} -> {self.vehicle.name}"
+        # Names only when already loaded, so listing orders costs no query per row
+        client = self.client.username if Order.client.is_cached(self) else self.client_id
+        vehicle = self.vehicle.name if Order.vehicle.is_cached(self) else self.vehicle_id
+        return f"Order {self.id} | {client} -> {vehicle}"
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["-created_at"], name="order_created_idx"),
+            # The admin's date drill-down
+            models.Index(fields=["pickup_datetime"], name="order_pickup_idx"),
+        ]
+
+
+class ArchivedOrder(models.Model):
+    """
+    Cold storage for closed :model:`business.Order` rows, moved here by the archival job
+    """
+    id = models.UUIDField(primary_key=True, editable=False)
+
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name="archived_orders",
+        db_constraint=False,
+        help_text="Client who placed this order."
+    )
+    vehicle = models.ForeignKey(
+        Vehicle,
+        on_delete=models.CASCADE,
+        related_name="archived_orders",
+        help_text="Vehicle associated with this order."
+    )
+
+    pickup_datetime = models.DateTimeField(help_text="Scheduled pickup date and time.")
+    return_datetime = models.DateTimeField(help_text="Scheduled return date and time.")
+    actual_return_datetime = models.DateTimeField(
+        null=True, blank=True,
+        help_text="Actual date and time when the vehicle was returned (optional)."
+    )
+
+    pickup_location = models.TextField(help_text="Pickup location for the vehicle.")
+    dropoff_location = models.TextField(help_text="Drop-off location for the vehicle.")
+
+    rental_amount = models.DecimalField(max_digits=10, decimal_places=2, help_text="Total rental cost for the booking.")
+    security_deposit = models.DecimalField(max_digits=10, decimal_places=2, help_text="Security deposit collected.")
+    late_fee = models.DecimalField(max_digits=10, decimal_places=2, default=0.00, help_text="Late return penalty fee.")
+
+    otp = models.CharField(max_length=6, null=True, blank=True, help_text="One-time passcode used at handover.")
+    payment_status = models.CharField(max_length=20, help_text="Payment status when archived.")
+    order_status = models.CharField(max_length=20, help_text="Order status when archived.")
+
+    created_at = models.DateTimeField(help_text="Timestamp when the order was created.")
+    updated_at = models.DateTimeField(help_text="Timestamp when the order was last updated.")
+    notes = models.TextField(blank=True, help_text="Any additional notes or remarks.")
+
+    archived_at = models.DateTimeField(auto_now_add=True, help_text="Timestamp when the order was archived.")
+
+    def __str__(self):
+        return f"Archived order {self.id} ({self.order_status})"
+
+    class Meta:
+        ordering = ["-created_at"]
+        indexes = [
+            models.Index(fields=["client", "-created_at"], name="archivedorder_client_idx"),
+        ]
+
+
+class OrderSummary(models.Model):
+    """
+    Denormalized read-model of an :model:`business.Order`, snapshotting the vehicle at booking time
+    """
+    order_id = models.UUIDField(primary_key=True, editable=False, help_text="Id of the summarized order.")
+
+    client = models.ForeignKey(
+        Client,
+        on_delete=models.CASCADE,
+        related_name="order_summaries",
+        help_text="Client who placed the order."
+    )
+    vehicle_id = models.UUIDField(help_text="Id of the booked vehicle.")
+    owner_id = models.UUIDField(
+        null=True, blank=True,
+        help_text="user_id of the renter owning the vehicle when it was booked."
+    )
+
+    vehicle_name = models.CharField(max_length=100, help_text="Vehicle name at booking time.")
+    vehicle_number = models.CharField(max_length=15, help_text="Vehicle registration number at booking time.")
+    vehicle_thumbnail = models.TextField(blank=True, help_text="Primary vehicle image at booking time.")
+    agreed_price = models.DecimalField(
+        max_digits=10, decimal_places=2,
+        help_text="Rental amount agreed at booking time."
+    )
+    security_deposit = models.DecimalField(
+        max_digits=10, decimal_places=2,
+        help_text="Security deposit agreed at booking time."
+    )
+
+    pickup_datetime = models.DateTimeField(help_text="Scheduled pickup date and time.")
+    return_datetime = models.DateTimeField(help_text="Scheduled return date and time.")
+    order_status = models.CharField(max_length=20, help_text="Mirrors Order.order_status.")
+    payment_status = models.CharField(max_length=20, help_text="Mirrors Order.payment_status.")
+    created_at = models.DateTimeField(help_text="Timestamp when the order was created.")
+
+    def __str__(self):
+        return f"Order {self.order_id} | {self.vehicle_name} ({self.order_status})"
 
     class Meta:
         ordering = ["-created_at"]
+        verbose_name = "Order Summary"
+        verbose_name_plural = "Order Summaries"
+        indexes = [
+            models.Index(fields=["client", "-created_at"], name="ordersummary_client_idx"),
+            models.Index(fields=["owner_id", "-created_at"], name="ordersummary_owner_idx"),
+        ]
+
+
+class OrderEvent(models.Model):
+    """
+    Append-only log of :model:`business.Order` state changes. Rows are never updated; consumers read them in id order
+    """
+    class EventTypes(models.TextChoices):
+        CREATED = "created"
+        CANCELLED = "cancelled"
+        STARTED = "started"
+        COMPLETED = "completed"
+        PAID = "paid"
+
+    event_type = models.CharField(max_length=20, choices=EventTypes.choices, help_text="Kind of state change.")
+    order_id = models.UUIDField(db_index=True, help_text="Id of the order that changed.")
+    client_id = models.BigIntegerField(help_text="Id of the client who placed the order.")
+    vehicle_id = models.UUIDField(help_text="Id of the booked vehicle.")
+    owner_id = models.UUIDField(
+        null=True, blank=True,
+        help_text="user_id of the renter owning the vehicle."
+    )
+    amount = models.DecimalField(
+        max_digits=10, decimal_places=2,
+        help_text="Rental amount of the order at the time of the event."
+    )
+    pickup_datetime = models.DateTimeField(help_text="Scheduled pickup of the order.")
+    return_datetime = models.DateTimeField(help_text="Scheduled return of the order.")
+    created_at = models.DateTimeField(auto_now_add=True, help_text="Timestamp when the event was recorded.")
+
+    def __str__(self):
+        return f"#{self.pk} {self.event_type} order {self.order_id}"
+
+    class Meta:
+        ordering = ["id"]
+
+
+class EventCursor(models.Model):
+    """
+    Last :model:`business.OrderEvent` id processed by a named consumer
+    """
+    consumer = models.CharField(max_length=100, unique=True, help_text="Name of the consumer.")
+    position = models.BigIntegerField(default=0, help_text="Id of the last event processed.")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Last time the cursor advanced.")
+
+    def __str__(self):
+        return f"{self.consumer} @ {self.position}"
+
+
+class VehicleDailyRollup(models.Model):
+    """
+    Per-vehicle, per-day booking totals maintained from :model:`business.OrderEvent`
+    """
+    date = models.DateField(help_text="Local calendar day.")
+    vehicle_id = models.UUIDField(help_text="Id of the vehicle.")
+    owner_id = models.UUIDField(null=True, blank=True, help_text="user_id of the renter owning the vehicle.")
+    bookings = models.IntegerField(default=0, help_text="Active bookings picking up on this day.")
+    cancellations = models.IntegerField(default=0, help_text="Bookings for this day that were cancelled.")
+    revenue = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0,
+        help_text="Rental amount of active bookings picking up on this day."
+    )
+    paid_revenue = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0,
+        help_text="Rental amount of paid bookings picking up on this day."
+    )
+    booked_seconds = models.BigIntegerField(default=0, help_text="Seconds of this day covered by active bookings.")
+
+    def __str__(self):
+        return f"{self.date} / vehicle {self.vehicle_id}"
+
+    class Meta:
+        ordering = ["date"]
+        constraints = [
+            models.UniqueConstraint(fields=["vehicle_id", "date"], name="vehicledailyrollup_vehicle_date_uniq"),
+        ]
+
+
+class RenterDailyRollup(models.Model):
+    """
+    Per-renter, per-day booking totals maintained from :model:`business.OrderEvent`
+    """
+    date = models.DateField(help_text="Local calendar day.")
+    owner_id = models.UUIDField(help_text="user_id of the renter.")
+    bookings = models.IntegerField(default=0, help_text="Active bookings picking up on this day.")
+    cancellations = models.IntegerField(default=0, help_text="Bookings for this day that were cancelled.")
+    revenue = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0,
+        help_text="Rental amount of active bookings picking up on this day."
+    )
+    paid_revenue = models.DecimalField(
+        max_digits=12, decimal_places=2, default=0,
+        help_text="Rental amount of paid bookings picking up on this day."
+    )
+    booked_seconds = models.BigIntegerField(default=0, help_text="Seconds of this day covered by active bookings.")
+
+    def __str__(self):
+        return f"{self.date} / renter {self.owner_id}"
+
+    class Meta:
+        ordering = ["date"]
+        constraints = [
+            models.UniqueConstraint(fields=["owner_id", "date"], name="renterdailyrollup_owner_date_uniq"),
+        ]
+        indexes = [
+            models.Index(fields=["date"], name="renterdailyrollup_date_idx"),
+        ]
+
+
+class RegionShard(models.Model):
+    """
+    Database holding the :model:`business.Vehicle` rows of a region, with their orders. Regions without a row live on the primary
+    """
+    region = models.CharField(max_length=50, unique=True, help_text="City/region, as in Vehicle.region.")
+    database = models.CharField(max_length=50, help_text="Alias of the shard in settings.DATABASE_SHARDS.")
+    updated_at = models.DateTimeField(auto_now=True, help_text="Last time the region moved.")
+
+    def __str__(self):
+        return f"{self.region} -> {self.database}"
+
+
+class VehicleDirectory(models.Model):
+    """
+    Region of every :model:`business.Vehicle` stored on a shard, kept on the primary so a vehicle id finds its database
+    """
+    vehicle_id = models.UUIDField(primary_key=True, help_text="Id of the vehicle.")
+    region = models.CharField(max_length=50, help_text="Region of the vehicle.")
+
+    def __str__(self):
+        return f"{self.vehicle_id} in {self.region}"
+
+    class Meta:
+        verbose_name_plural = "Vehicle directory"
@@ -0,0 +1,80 @@
+from business.models import Order, OrderSummary
+
+SUMMARY_UPDATE_FIELDS = [
+    "client",
+    "vehicle_id",
+    "owner_id",
+    "vehicle_name",
+    "vehicle_number",
+    "vehicle_thumbnail",
+    "agreed_price",
+    "security_deposit",
+    "pickup_datetime",
+    "return_datetime",
+    "order_status",
+    "payment_status",
+    "created_at",
+]
+
+
+def build_order_summary(order):
+    """
+    Build (without saving) the read-model row for an order.
+    Expects ``order.vehicle`` and its owner to be loaded, e.g. via
+    ``select_related("vehicle__owner")``.
+    """
+    vehicle = order.vehicle
+    owner = vehicle.owner
+    return OrderSummary(
+        order_id=order.id,
+        client_id=order.client_id,
+        vehicle_id=vehicle.id,
+        owner_id=owner.user_id if owner else None,
+        vehicle_name=vehicle.name,
+        vehicle_number=vehicle.vehicle_number,
+        vehicle_thumbnail=vehicle.image_1,
+        agreed_price=order.rental_amount,
+        security_deposit=order.security_deposit,
+        pickup_datetime=order.pickup_datetime,
+        return_datetime=order.return_datetime,
+        order_status=order.order_status,
+        payment_status=order.payment_status,
+        created_at=order.created_at,
+    )
+
+
+def write_order_summary(order):
+    """Insert the read-model row; call inside the transaction that creates the order."""
+    summary = build_order_summary(order)
+    summary.save(force_insert=True)
+    return summary
+
+
+def sync_order_summary_status(order):
+    """Mirror status changes of an existing order onto its read-model row."""
+    return OrderSummary.objects.filter(order_id=order.id).update(
+        order_status=order.order_status,
+        payment_status=order.payment_status,
+    )
+
+
+def backfill_order_summaries(batch_size=1000):
+    """
+    Upsert read-model rows for every order, walking ``Order`` by primary key
+    in batches. Yields the number of rows written per batch.
+    """
+    queryset = Order.objects.select_related("vehicle__owner").order_by("pk")
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        orders = list(batch[:batch_size])
+        if not orders:
+            return
+        OrderSummary.objects.bulk_create(
+            [build_order_summary(order) for order in orders],
+            update_conflicts=True,
+            unique_fields=["order_id"],
+            update_fields=SUMMARY_UPDATE_FIELDS,
+        )
+        last_pk = orders[-1].pk
+        yield len(orders)
@@ -0,0 +1,274 @@
+import calendar
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+from decimal import Decimal
+
+from django.db import transaction
+from django.db.models import Max
+from django.utils import timezone
+
+from authentication.models import Renter
+from backend.exports import chunked
+from business.events import consume_order_events
+from business.models import (
+    ArchivedOrder,
+    EventCursor,
+    Order,
+    OrderEvent,
+    RenterDailyRollup,
+    VehicleDailyRollup,
+)
+from business.sharding import databases
+
+ROLLUP_CONSUMER = "daily_rollups"
+ROLLUP_METRICS = ["bookings", "cancellations", "revenue", "paid_revenue", "booked_seconds"]
+SECONDS_PER_DAY = 24 * 60 * 60
+
+
+def _zero_metrics():
+    return {
+        "bookings": 0,
+        "cancellations": 0,
+        "revenue": Decimal("0"),
+        "paid_revenue": Decimal("0"),
+        "booked_seconds": 0,
+    }
+
+
+def split_by_day(start, end):
+    """Yield ``(local_date, seconds)`` for every local calendar day overlapped by ``[start, end)``."""
+    tz = timezone.get_current_timezone()
+    current = timezone.localtime(start, tz)
+    end = timezone.localtime(end, tz)
+    while current < end:
+        next_midnight = datetime.combine(current.date() + timedelta(days=1), time.min, tzinfo=tz)
+        segment_end = min(next_midnight, end)
+        yield current.date(), int((segment_end - current).total_seconds())
+        current = segment_end
+
+
+class RollupDeltas:
+    """Accumulates metric changes per (vehicle, day) and (renter, day) before they are written."""
+
+    def __init__(self):
+        self.vehicles = defaultdict(_zero_metrics)
+        self.renters = defaultdict(_zero_metrics)
+        self.owners = {}
+
+    def _add(self, vehicle_id, owner_id, day, metric, value):
+        self.vehicles[(vehicle_id, day)][metric] += value
+        self.owners[vehicle_id] = owner_id
+        if owner_id:
+            self.renters[(owner_id, day)][metric] += value
+
+    def apply(self, event_type, vehicle_id, owner_id, amount, pickup, return_):
+        pickup_day = timezone.localtime(pickup).date()
+        if event_type in (OrderEvent.EventTypes.CREATED, OrderEvent.EventTypes.CANCELLED):
+            sign = 1 if event_type == OrderEvent.EventTypes.CREATED else -1
+            self._add(vehicle_id, owner_id, pickup_day, "bookings", sign)
+            self._add(vehicle_id, owner_id, pickup_day, "revenue", sign * amount)
+            if sign < 0:
+                self._add(vehicle_id, owner_id, pickup_day, "cancellations", 1)
+            for day, seconds in split_by_day(pickup, return_):
+                self._add(vehicle_id, owner_id, day, "booked_seconds", sign * seconds)
+        elif event_type == OrderEvent.EventTypes.PAID:
+            self._add(vehicle_id, owner_id, pickup_day, "paid_revenue", amount)
+
+    def apply_event(self, event):
+        self.apply(
+            event.event_type,
+            event.vehicle_id,
+            event.owner_id,
+            event.amount,
+            event.pickup_datetime,
+            event.return_datetime,
+        )
+
+    def apply_order(self, order, owner_id):
+        """Replay the events an order in its current state would have produced."""
+        args = (
+            order["vehicle_id"],
+            owner_id,
+            order["rental_amount"],
+            order["pickup_datetime"],
+            order["return_datetime"],
+        )
+        self.apply(OrderEvent.EventTypes.CREATED, *args)
+        if order["order_status"] == "cancelled":
+            self.apply(OrderEvent.EventTypes.CANCELLED, *args)
+        if order["payment_status"] == "paid":
+            self.apply(OrderEvent.EventTypes.PAID, *args)
+
+    def write(self, batch_size=1000):
+        """Add the accumulated deltas onto the stored rollup rows and reset."""
+        vehicle_keys = list(self.vehicles)
+        for i in range(0, len(vehicle_keys), batch_size):
+            _merge_rows(
+                VehicleDailyRollup,
+                "vehicle_id",
+                {key: self.vehicles[key] for key in vehicle_keys[i : i + batch_size]},
+                extra=lambda vehicle_id: {"owner_id": self.owners.get(vehicle_id)},
+            )
+        renter_keys = list(self.renters)
+        for i in range(0, len(renter_keys), batch_size):
+            _merge_rows(
+                RenterDailyRollup,
+                "owner_id",
+                {key: self.renters[key] for key in renter_keys[i : i + batch_size]},
+            )
+        self.__init__()
+
+
+def _merge_rows(model, key_field, deltas, extra=None):
+    """
+    Read the existing rows for ``deltas`` in one query (keys x days, a
+    superset of what is needed), add the deltas and upsert the result in
+    one more. Callers must serialize writers (the rollup consumer holds its
+    EventCursor row lock while doing this).
+    """
+    candidates = model.objects.filter(
+        **{
+            f"{key_field}__in": {key_value for key_value, _ in deltas},
+            "date__in": {day for _, day in deltas},
+        }
+    )
+    existing = {(getattr(row, key_field), row.date): row for row in candidates}
+
+    rows = []
+    for (key_value, day), delta in deltas.items():
+        current = existing.get((key_value, day))
+        values = {
+            metric: (getattr(current, metric) if current else 0) + delta[metric]
+            for metric in ROLLUP_METRICS
+        }
+        if extra:
+            values.update(extra(key_value))
+        rows.append(model(date=day, **{key_field: key_value}, **values))
+
+    update_fields = ROLLUP_METRICS + (["owner_id"] if extra else [])
+    model.objects.bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=[key_field, "date"],
+        update_fields=update_fields,
+    )
+
+
+def _apply_events(events):
+    deltas = RollupDeltas()
+    for event in events:
+        deltas.apply_event(event)
+    deltas.write()
+
+
+def refresh_rollups(batch_size=500, settle_seconds=5):
+    """Fold order events recorded since the last run into the rollups. Returns events processed."""
+    return consume_order_events(
+        ROLLUP_CONSUMER, _apply_events, batch_size=batch_size, settle_seconds=settle_seconds
+    )
+
+
+# The owner is read as the renter id: renters live on the primary only, so a
+# join to their user id would find nothing on a shard
+ORDER_ROLLUP_FIELDS = [
+    "vehicle_id",
+    "vehicle__owner_id",
+    "rental_amount",
+    "pickup_datetime",
+    "return_datetime",
+    "order_status",
+    "payment_status",
+]
+
+
+def rebuild_rollups(chunk_size=5000):
+    """
+    Recompute every rollup row from Order and ArchivedOrder on the primary
+    and every shard, and move the rollup consumer's cursor to the latest
+    event. Returns the number of orders replayed.
+
+    Everything runs in one transaction on the primary that holds the
+    cursor's row lock until the last order of the last database has been
+    replayed, so the lock is held for a full scan of both tables on every
+    database. Meanwhile refresh_rollups waits on the lock and dashboards
+    keep reading the old rows; bookings are not blocked, as their events
+    are only appended. Committing per chunk would let a refresh fold events
+    of orders the rebuild has yet to replay, counting them twice.
+    """
+    replayed = 0
+    owner_users = {None: None}
+    with transaction.atomic():
+        cursor, _ = EventCursor.objects.select_for_update().get_or_create(consumer=ROLLUP_CONSUMER)
+        VehicleDailyRollup.objects.all().delete()
+        RenterDailyRollup.objects.all().delete()
+
+        deltas = RollupDeltas()
+        for alias in databases():
+            for model in (Order, ArchivedOrder):
+                rows = model.objects.using(alias).order_by().values(*ORDER_ROLLUP_FIELDS)
+                for chunk in chunked(rows.iterator(chunk_size=chunk_size), chunk_size):
+                    missing = {order["vehicle__owner_id"] for order in chunk} - owner_users.keys()
+                    owner_users.update(Renter.objects.filter(pk__in=missing).values_list("pk", "user_id"))
+                    for order in chunk:
+                        deltas.apply_order(order, owner_users.get(order["vehicle__owner_id"]))
+                    replayed += len(chunk)
+                    deltas.write()
+
+        cursor.position = OrderEvent.objects.aggregate(last=Max("pk"))["last"] or 0
+        cursor.save(update_fields=["position", "updated_at"])
+    return replayed
+
+
+def month_bounds(month=None):
+    """First and last day of ``month`` ("YYYY-MM"), defaulting to the current local month."""
+    if month:
+        first = datetime.strptime(month, "%Y-%m").date()
+    else:
+        first = timezone.localdate().replace(day=1)
+    last = first.replace(day=calendar.monthrange(first.year, first.month)[1])
+    return first, last
+
+
+def month_view(model, month=None, capacity=1, **filters):
+    """
+    Day-by-day totals for one month read from a rollup table: one indexed
+    range scan over at most one row per day (per matching key), so the cost
+    follows the number of days rather than the number of orders.
+    ``capacity`` is the number of vehicles whose time the utilization is
+    measured against.
+    """
+    first, last = month_bounds(month)
+    by_day = defaultdict(_zero_metrics)
+    rows = model.objects.filter(date__gte=first, date__lte=last, **filters).values("date", *ROLLUP_METRICS)
+    for row in rows:
+        for metric in ROLLUP_METRICS:
+            by_day[row["date"]][metric] += row[metric]
+
+    days = []
+    totals = _zero_metrics()
+    day = first
+    while day <= last:
+        metrics = by_day[day]
+        for metric in ROLLUP_METRICS:
+            totals[metric] += metrics[metric]
+        days.append(_format_metrics(metrics, capacity, 1, date=day.isoformat()))
+        day += timedelta(days=1)
+
+    return {
+        "month": first.strftime("%Y-%m"),
+        "days": days,
+        "totals": _format_metrics(totals, capacity, len(days)),
+    }
+
+
+def _format_metrics(metrics, capacity, days, **extra):
+    available = SECONDS_PER_DAY * days * max(capacity, 1)
+    return {
+        **extra,
+        "bookings": metrics["bookings"],
+        "cancellations": metrics["cancellations"],
+        "revenue": float(metrics["revenue"]),
+        "paid_revenue": float(metrics["paid_revenue"]),
+        "utilization": round(metrics["booked_seconds"] / available, 4),
+    }
+
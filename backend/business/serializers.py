@@ -1,7 +1,8 @@
 # business/serializers.py
 from rest_framework import serializers
 
-from business.models import Order, Vehicle
+from business.models import ArchivedOrder, Order, Vehicle
+from business.sharding import vehicle_shard
 
 
 class OrderSerializer(serializers.ModelSerializer):
@@ -26,6 +27,13 @@ class OrderSerializer(serializers.ModelSerializer):
         depth = 1  # Show nested vehicle details
 
 
+class ArchivedOrderSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = ArchivedOrder
+        fields = OrderSerializer.Meta.fields
+        depth = 1
+
+
 class CreateOrderSerializer(serializers.ModelSerializer):
     vehicle_id = serializers.UUIDField(write_only=True)
 
@@ -48,10 +56,17 @@ class CreateOrderSerializer(serializers.ModelSerializer):
 
         # Get the vehicle instance
         try:
-            vehicle = Vehicle.objects.get(id=attrs["vehicle_id"])
+            vehicle = Vehicle.objects.using(vehicle_shard(attrs["vehicle_id"])).get(id=attrs["vehicle_id"])
         except Exception:
             raise serializers.ValidationError("Invalid vehicle_id, Vehicle not found")
 
         # Add vehicle to validated data
         attrs["vehicle"] = vehicle
         return attrs
+
+    def create(self, validated_data):
+        # Not the default manager's create(), which writes to the primary:
+        # saving the instance lets the router put it next to its vehicle
+        order = Order(**validated_data)
+        order.save(force_insert=True)
+        return order
@@ -0,0 +1,287 @@
+"""
+Region sharding of vehicles and their orders.
+
+The Vehicle, Order and ArchivedOrder rows of a region live on the database
+named by its RegionShard row, one of settings.DATABASE_SHARDS; regions
+without a row, and every other table, stay on the primary. Shards carry the
+full schema but only those three tables are written there, which is why
+their foreign keys to clients and renters have no database constraint.
+
+A vehicle id finds its database through VehicleDirectory, a table on the
+primary filled whenever a vehicle is saved on a shard. Views query that
+database with ``.using()``, where None stands for the primary so replica
+routing still applies to it. Listings fan out over ``databases()`` and
+combine the per-database results, each already sorted, with
+``merge_sorted``. ShardRouter places saved rows: a vehicle by its region, an
+order next to its vehicle.
+
+Lookups are cached in the default cache, which must be shared (REDIS_URL)
+when more than one process serves requests. Without DATABASE_SHARDS every
+helper answers "the primary" without a query.
+"""
+import heapq
+import uuid
+from contextlib import nullcontext
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DEFAULT_DB_ALIAS, transaction
+from django.utils import timezone
+
+from business.models import ArchivedOrder, Order, RegionShard, Vehicle, VehicleDirectory
+
+SHARDED_MODELS = (Vehicle, Order, ArchivedOrder)
+
+SHARD_MAP_KEY = "region-shards"
+CACHE_SECONDS = 300
+
+
+def _vehicle_key(vehicle_id):
+    return f"vehicle-region:{vehicle_id.hex}"
+
+
+def _parse_id(vehicle_id):
+    if isinstance(vehicle_id, uuid.UUID):
+        return vehicle_id
+    try:
+        return uuid.UUID(str(vehicle_id))
+    except ValueError:
+        return None
+
+
+def is_shard(alias):
+    return alias in settings.DATABASE_SHARDS
+
+
+def databases():
+    """Every database that may hold sharded rows, the primary (None) first."""
+    return [None, *settings.DATABASE_SHARDS]
+
+
+def merge_sorted(results, key, reverse=False):
+    """Merge per-database result lists, each sorted by ``key``, into one sorted list."""
+    if len(results) == 1:
+        return list(results[0])
+    return list(heapq.merge(*results, key=key, reverse=reverse))
+
+
+def atomic_on(alias):
+    """
+    A transaction on the shard ``alias``, for writes that also touch the
+    primary; nothing for the primary itself. Nested inside the primary's
+    transaction, the shard commits first. There is no two-phase commit: if
+    the primary then fails to commit, the shard's rows stay.
+    """
+    return transaction.atomic(using=alias) if is_shard(alias) else nullcontext()
+
+
+def _shard_of(region, shards):
+    alias = shards.get(region)
+    if alias is None or alias == DEFAULT_DB_ALIAS:
+        return None
+    if not is_shard(alias):
+        raise ImproperlyConfigured(f"Region {region!r} is mapped to {alias!r}, which is not in DATABASE_SHARDS.")
+    return alias
+
+
+def shard_map():
+    """``{region: alias}`` of every region that lives on a shard."""
+    shards = cache.get(SHARD_MAP_KEY)
+    if shards is None:
+        shards = dict(RegionShard.objects.using(DEFAULT_DB_ALIAS).values_list("region", "database"))
+        cache.set(SHARD_MAP_KEY, shards, CACHE_SECONDS)
+    return shards
+
+
+async def ashard_map():
+    shards = await cache.aget(SHARD_MAP_KEY)
+    if shards is None:
+        rows = RegionShard.objects.using(DEFAULT_DB_ALIAS).values_list("region", "database")
+        shards = {region: alias async for region, alias in rows}
+        await cache.aset(SHARD_MAP_KEY, shards, CACHE_SECONDS)
+    return shards
+
+
+def region_shard(region):
+    """Shard holding ``region``, or None for the primary."""
+    if not settings.DATABASE_SHARDS or not region:
+        return None
+    return _shard_of(region, shard_map())
+
+
+def vehicle_shard(vehicle_id):
+    """Shard holding a vehicle and its orders, or None for the primary."""
+    vehicle_id = _parse_id(vehicle_id) if settings.DATABASE_SHARDS else None
+    if vehicle_id is None:
+        return None
+    region = cache.get(_vehicle_key(vehicle_id))
+    if region is None:
+        region = (
+            VehicleDirectory.objects.using(DEFAULT_DB_ALIAS)
+            .filter(vehicle_id=vehicle_id)
+            .values_list("region", flat=True)
+            .first()
+        ) or ""
+        cache.set(_vehicle_key(vehicle_id), region, CACHE_SECONDS)
+    return region_shard(region)
+
+
+async def avehicle_shard(vehicle_id):
+    """``vehicle_shard`` for async views."""
+    vehicle_id = _parse_id(vehicle_id) if settings.DATABASE_SHARDS else None
+    if vehicle_id is None:
+        return None
+    region = await cache.aget(_vehicle_key(vehicle_id))
+    if region is None:
+        region = await (
+            VehicleDirectory.objects.using(DEFAULT_DB_ALIAS)
+            .filter(vehicle_id=vehicle_id)
+            .values_list("region", flat=True)
+            .afirst()
+        ) or ""
+        await cache.aset(_vehicle_key(vehicle_id), region, CACHE_SECONDS)
+    return _shard_of(region, await ashard_map()) if region else None
+
+
+def record_vehicle_region(sender, instance, created, using, raw=False, **kwargs):
+    """post_save receiver: list vehicles created on a shard in the directory."""
+    if created and is_shard(using):
+        VehicleDirectory.objects.using(DEFAULT_DB_ALIAS).update_or_create(
+            vehicle_id=instance.pk, defaults={"region": instance.region}
+        )
+        cache.set(_vehicle_key(instance.pk), instance.region, CACHE_SECONDS)
+
+
+def record_vehicle_regions(regions):
+    """List ``{vehicle_id: region}`` in the directory, for vehicles written to a shard in bulk."""
+    VehicleDirectory.objects.using(DEFAULT_DB_ALIAS).bulk_create(
+        [VehicleDirectory(vehicle_id=pk, region=region) for pk, region in regions.items()],
+        update_conflicts=True,
+        unique_fields=["vehicle_id"],
+        update_fields=["region"],
+    )
+    cache.delete_many([_vehicle_key(pk) for pk in regions])
+
+
+class ShardRouter:
+    """Vehicles go to their region's shard, orders to their vehicle's; other models fall through."""
+
+    def db_for_read(self, model, **hints):
+        # Related lookups from a row on a shard stay on that shard
+        instance = hints.get("instance")
+        if issubclass(model, SHARDED_MODELS) and isinstance(instance, SHARDED_MODELS):
+            if is_shard(instance._state.db):
+                return instance._state.db
+        return None
+
+    def db_for_write(self, model, **hints):
+        instance = hints.get("instance")
+        if not settings.DATABASE_SHARDS or not issubclass(model, SHARDED_MODELS):
+            return None
+        if not isinstance(instance, SHARDED_MODELS):
+            return None
+        if is_shard(instance._state.db):
+            return instance._state.db
+        if isinstance(instance, Vehicle):
+            return region_shard(instance.region)
+        if instance._meta.get_field("vehicle").is_cached(instance):
+            return region_shard(instance.vehicle.region)
+        return vehicle_shard(instance.vehicle_id)
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Shards get the whole schema, so migrations apply to them unchanged
+        if is_shard(db):
+            return True
+        return None
+
+
+def _batches(queryset, batch_size):
+    last_pk = None
+    while True:
+        batch = queryset if last_pk is None else queryset.filter(pk__gt=last_pk)
+        rows = list(batch[:batch_size])
+        if not rows:
+            return
+        yield rows
+        last_pk = rows[-1].pk
+
+
+def _copy_rows(model, rows, using):
+    """
+    Upsert ``rows`` into ``using`` unchanged. bulk_create stamps auto_now
+    fields afresh, so their values are put back with a bulk_update.
+    """
+    fields = model._meta.concrete_fields
+    stamped = [field.name for field in fields if getattr(field, "auto_now", False) or getattr(field, "auto_now_add", False)]
+    stamps = [[getattr(row, name) for name in stamped] for row in rows]
+    model.objects.using(using).bulk_create(
+        rows,
+        update_conflicts=True,
+        unique_fields=[model._meta.pk.name],
+        update_fields=[field.name for field in fields if not field.primary_key],
+    )
+    if stamped:
+        for row, values in zip(rows, stamps):
+            for name, value in zip(stamped, values):
+                setattr(row, name, value)
+        model.objects.using(using).bulk_update(rows, stamped)
+
+
+# What to copy, how to find a region's rows and what moves when a row changes
+_REGION_TABLES = [
+    (Vehicle, "region", "last_updated"),
+    (Order, "vehicle__region", "updated_at"),
+    (ArchivedOrder, "vehicle__region", "archived_at"),
+]
+
+
+def _copy_region(region, source, target, batch_size, changed_since=None):
+    for model, region_lookup, changed in _REGION_TABLES:
+        queryset = model.objects.using(source).filter(**{region_lookup: region}).order_by("pk")
+        if changed_since is not None:
+            queryset = queryset.filter(**{f"{changed}__gte": changed_since})
+        for rows in _batches(queryset, batch_size):
+            with transaction.atomic(using=target):
+                _copy_rows(model, rows, target)
+            if model is Vehicle:
+                record_vehicle_regions({row.pk: region for row in rows})
+            yield "copied", model, len(rows)
+
+
+def move_region(region, database, batch_size=500):
+    """
+    Move the vehicles of ``region``, with their orders and archived orders,
+    to ``database`` (a shard alias or "default"). Rows are copied in
+    batches, one transaction each; then the region is switched over, rows
+    written on the old database meanwhile are copied again, and the old
+    rows are deleted in batches. Yields ``(step, model, rows)`` per batch.
+
+    Bookings made in the region by a process that has not yet seen the
+    switch (at most CACHE_SECONDS without a shared cache) can land on the
+    old database after the catch-up copy and are then lost; move regions
+    while they are quiet.
+    """
+    if database != DEFAULT_DB_ALIAS and not is_shard(database):
+        raise ValueError(f"{database!r} is neither {DEFAULT_DB_ALIAS!r} nor in DATABASE_SHARDS.")
+    source = region_shard(region) or DEFAULT_DB_ALIAS
+    if source == database:
+        return
+
+    started = timezone.now()
+    yield from _copy_region(region, source, database, batch_size)
+
+    if database == DEFAULT_DB_ALIAS:
+        RegionShard.objects.using(DEFAULT_DB_ALIAS).filter(region=region).delete()
+    else:
+        RegionShard.objects.using(DEFAULT_DB_ALIAS).update_or_create(region=region, defaults={"database": database})
+    cache.delete(SHARD_MAP_KEY)
+
+    yield from _copy_region(region, source, database, batch_size, changed_since=started)
+
+    # Orders first, so deleting a vehicle has nothing left to cascade to
+    for model, region_lookup, _ in reversed(_REGION_TABLES):
+        queryset = model.objects.using(source).filter(**{region_lookup: region}).order_by("pk")
+        for rows in _batches(queryset, batch_size):
+            model.objects.using(source).filter(pk__in=[row.pk for row in rows]).delete()
+            yield "deleted", model, len(rows)
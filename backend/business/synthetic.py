@@ -0,0 +1,337 @@
+"""
+Synthetic data for scale testing.
+
+``generate_synthetic_data`` writes renters, vehicles, clients with their
+details, and orders, all derived from one seed: the same seed and counts
+give the same rows. Every synthetic row is tagged (SYNTHETIC_DOMAIN
+emails, VEHICLE_NUMBER_PREFIX registrations) so ``purge_synthetic_data``
+can remove them again. Unique columns are produced by a bijective scramble
+of the row index, so they never collide and still look random to the
+indexes; each vehicle's bookings are laid out one after another and never
+overlap.
+
+Rows go in through ``bulk_create`` in batches, or through ``COPY`` on
+PostgreSQL. Like bulk_create, neither path sends model signals or writes
+the order read-models and events; run ``backfill_order_summaries`` and
+``rebuild_rollups`` afterwards when those are needed.
+"""
+import math
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.hashers import UNUSABLE_PASSWORD_PREFIX
+from django.db import connection, transaction
+
+from authentication.models import Client, ClientDetails, Renter
+from backend.db import copy_objects
+from backend.utils import aadhaar_regex, phone_regex
+from business.models import Order, Vehicle
+
+SYNTHETIC_DOMAIN = "synthetic.invalid"
+VEHICLE_NUMBER_PREFIX = "SY"
+
+DEFAULT_START = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+DEFAULT_AS_OF = datetime(2025, 1, 1, tzinfo=dt_timezone.utc)
+
+FIRST_NAMES = [
+    "Aarav", "Vivaan", "Aditya", "Arjun", "Ishaan", "Rohan", "Kabir", "Ananya",
+    "Diya", "Saanvi", "Priya", "Meera", "Isha", "Kavya", "Riya", "Sneha",
+]
+LAST_NAMES = ["Sharma", "Verma", "Gupta", "Iyer", "Nair", "Reddy", "Das", "Bose", "Khan", "Singh", "Patel", "Mehta"]
+BRANDS = {
+    "Car": ["Maruti", "Hyundai", "Tata", "Honda", "Toyota", "Kia"],
+    "SUV": ["Mahindra", "Tata", "Toyota", "Kia", "Hyundai"],
+    "Bike": ["Royal Enfield", "Bajaj", "Hero", "TVS", "Yamaha"],
+    "Scooter": ["Honda", "TVS", "Ather", "Ola", "Suzuki"],
+    "Truck": ["Tata", "Ashok Leyland", "Eicher", "Mahindra"],
+    "Other": ["Force", "Isuzu", "Piaggio"],
+}
+VEHICLE_TYPE_WEIGHTS = {"Car": 45, "SUV": 20, "Bike": 20, "Scooter": 10, "Truck": 3, "Other": 2}
+SEATS = {"Car": [4, 5], "SUV": [5, 7], "Bike": [2], "Scooter": [2], "Truck": [2, 3], "Other": [4, 7]}
+DAY_PRICES = {"Car": (1200, 4000), "SUV": (2500, 7000), "Bike": (400, 1500), "Scooter": (300, 900),
+              "Truck": (3000, 9000), "Other": (1500, 5000)}
+COLORS = ["White", "Black", "Silver", "Grey", "Red", "Blue", "Brown"]
+CITIES = ["Kolkata", "Bengaluru", "Mumbai", "Delhi", "Pune", "Hyderabad", "Chennai", "Jaipur", "Kochi"]
+
+
+def _scramble(index, modulus, multiplier):
+    """A bijection of ``range(modulus)``; ``multiplier`` must be coprime with ``modulus``."""
+    return index * multiplier % modulus
+
+
+def client_phone(index):
+    return f"+1998{_scramble(index, 10**9, 387_420_489):09d}"
+
+
+def renter_phone(index):
+    return f"+1997{_scramble(index, 10**9, 387_420_489):09d}"
+
+
+def client_aadhaar(index):
+    return f"8{_scramble(index, 10**11, 48_828_125_029):011d}"
+
+
+def renter_aadhaar(index):
+    return f"7{_scramble(index, 10**11, 48_828_125_029):011d}"
+
+
+def vehicle_number(index):
+    """``SY`` + district (01-99) + two-letter series + number (0001-9999), unique per index."""
+    serial, number = divmod(index, 9999)
+    district, series = divmod(serial, 26 * 26)
+    letters = chr(65 + series // 26) + chr(65 + series % 26)
+    return f"{VEHICLE_NUMBER_PREFIX}{district + 1:02d}{letters}{number + 1:04d}"
+
+
+def _uuid(rng):
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _uuid7(rng, index, as_of):
+    """
+    A UUIDv7 for row ``index`` as if rows were written one per millisecond
+    from ``as_of``: like the models' ids, they rise in insertion order.
+    """
+    timestamp_ms = int(as_of.timestamp() * 1000) + index
+    rand_a, rand_b = rng.getrandbits(12), rng.getrandbits(62)
+    return uuid.UUID(int=timestamp_ms << 80 | 0x7 << 76 | rand_a << 64 | 0b10 << 62 | rand_b)
+
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def _renters(rng, count):
+    for index in range(count):
+        phone, aadhaar = renter_phone(index), renter_aadhaar(index)
+        phone_regex(phone)
+        aadhaar_regex(aadhaar)
+        yield Renter(
+            user_id=_uuid(rng),
+            full_name=_name(rng),
+            email=f"renter{index}@{SYNTHETIC_DOMAIN}",
+            rating=rng.randint(0, 5),
+            address=f"{rng.randint(1, 300)} Main Road, {rng.choice(CITIES)}",
+            phone=phone,
+            gender=rng.choice(["Male", "Female", "Other"]),
+            aadhaar=aadhaar,
+            verification_status=rng.random() < 0.9,
+        )
+
+
+def _vehicles(rng, count, owner_ids, as_of):
+    types = list(VEHICLE_TYPE_WEIGHTS)
+    weights = list(VEHICLE_TYPE_WEIGHTS.values())
+    for index in range(count):
+        vehicle_type = rng.choices(types, weights)[0]
+        brand = rng.choice(BRANDS[vehicle_type])
+        low, high = DAY_PRICES[vehicle_type]
+        price_per_day = Decimal(rng.randrange(low, high, 50))
+        vehicle = Vehicle(
+            id=_uuid7(rng, index, as_of),
+            vehicle_number=vehicle_number(index),
+            name=f"{brand} {vehicle_type} {index}",
+            brand=brand,
+            model=f"{brand[:3].upper()}-{rng.randint(1, 20)}",
+            vehicle_type=vehicle_type,
+            transmission=rng.choice(Vehicle.TransmissionChoices.values),
+            fuel_type=rng.choice(Vehicle.FuelChoices.values),
+            seating_capacity=rng.choice(SEATS[vehicle_type]),
+            mileage=round(rng.uniform(8, 60), 1),
+            engine_cc=rng.choice([110, 150, 350, 1200, 1500, 2200]) if rng.random() < 0.8 else None,
+            color=rng.choice(COLORS),
+            top_speed=rng.randint(60, 200) if rng.random() < 0.6 else None,
+            location=rng.choice(CITIES),
+            current_odometer=round(rng.uniform(500, 150000), 1),
+            insurance_expiry_date=(as_of + timedelta(days=rng.randint(-30, 700))).date(),
+            price_per_hour=(price_per_day / 8).quantize(Decimal("0.01")),
+            price_per_day=price_per_day,
+            security_deposit=Decimal(rng.randrange(1000, 20000, 500)),
+            late_fee_per_hour=Decimal(rng.randrange(50, 500, 10)),
+            image_1=f"https://example.invalid/vehicles/{index}/1.jpg",
+            image_2=f"https://example.invalid/vehicles/{index}/2.jpg",
+            image_3=f"https://example.invalid/vehicles/{index}/3.jpg",
+            rating=round(rng.uniform(2.5, 5), 1),
+            total_trips=0,
+            owner_id=owner_ids[index % len(owner_ids)] if owner_ids else None,
+        )
+        # Listed in the city it stands in
+        vehicle.region = vehicle.location
+        yield vehicle
+
+
+def _clients(rng, count):
+    for index in range(count):
+        yield Client(
+            user_id=_uuid(rng),
+            username=f"{rng.choice(FIRST_NAMES).lower()}{index}",
+            email=f"client{index}@{SYNTHETIC_DOMAIN}",
+            password=f"{UNUSABLE_PASSWORD_PREFIX}{_uuid(rng).hex}",
+            authToken=_uuid(rng),
+        )
+
+
+def _client_details(rng, client_ids):
+    for index, client_id in enumerate(client_ids):
+        phone, aadhaar = client_phone(index), client_aadhaar(index)
+        phone_regex(phone)
+        aadhaar_regex(aadhaar)
+        yield ClientDetails(
+            client_id=client_id,
+            name=_name(rng),
+            phone=phone,
+            gender=rng.choice(["Male", "Female", "Other"]),
+            age=rng.randint(18, 70),
+            aadhaar=aadhaar,
+        )
+
+
+def _order_state(rng, pickup, return_at, as_of):
+    if return_at <= as_of:
+        if rng.random() < 0.1:
+            return "cancelled", rng.choice(["refunded", "failed"])
+        return "completed", "paid"
+    if pickup <= as_of:
+        return "ongoing", "paid"
+    if rng.random() < 0.05:
+        return "cancelled", "refunded"
+    return "upcoming", rng.choice(["pending", "paid"])
+
+
+def _orders(rng, count, vehicles, client_ids, start, as_of):
+    """
+    ``vehicles`` is a list of ``(id, price_per_day, security_deposit)``. Orders
+    are spread evenly over them; each vehicle's bookings follow one another
+    from ``start`` with a gap in between, so they never overlap.
+    """
+    per_vehicle, extra = divmod(count, len(vehicles))
+    index = 0
+    for position, (vehicle_id, price_per_day, deposit) in enumerate(vehicles):
+        cursor = start + timedelta(hours=rng.randint(0, 72))
+        for _ in range(per_vehicle + (position < extra)):
+            pickup = cursor + timedelta(hours=rng.randint(1, 96))
+            return_at = pickup + timedelta(hours=rng.randint(2, 120))
+            cursor = return_at
+            order_status, payment_status = _order_state(rng, pickup, return_at, as_of)
+            days = math.ceil((return_at - pickup) / timedelta(days=1))
+            yield Order(
+                id=_uuid7(rng, index, as_of),
+                client_id=client_ids[rng.randrange(len(client_ids))],
+                vehicle_id=vehicle_id,
+                pickup_datetime=pickup,
+                return_datetime=return_at,
+                actual_return_datetime=(
+                    return_at + timedelta(minutes=rng.randint(-60, 180)) if order_status == "completed" else None
+                ),
+                pickup_location=rng.choice(CITIES),
+                dropoff_location=rng.choice(CITIES),
+                rental_amount=price_per_day * days,
+                security_deposit=deposit,
+                otp=f"{rng.randint(100000, 999999)}",
+                payment_status=payment_status,
+                order_status=order_status,
+            )
+            index += 1
+
+
+def _batches(objs, batch_size):
+    batch = []
+    for obj in objs:
+        batch.append(obj)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _copy_batch(model, batch):
+    """Write ``batch`` with COPY ... FROM STDIN."""
+    opts = model._meta
+    fields = [field for field in opts.concrete_fields if field is not opts.auto_field]
+    copy_objects(connection, opts.db_table, fields, batch)
+
+
+def write_rows(model, objs, batch_size, use_copy=False):
+    """Insert ``objs`` in transactions of ``batch_size`` rows; yields the size of each batch written."""
+    for batch in _batches(objs, batch_size):
+        with transaction.atomic():
+            if use_copy:
+                _copy_batch(model, batch)
+            else:
+                model.objects.bulk_create(batch, batch_size=batch_size)
+        yield len(batch)
+
+
+def synthetic_data_exists():
+    return (
+        Renter.objects.filter(email__endswith=f"@{SYNTHETIC_DOMAIN}").exists()
+        or Client.objects.filter(email__endswith=f"@{SYNTHETIC_DOMAIN}").exists()
+        or Vehicle.objects.filter(vehicle_number__startswith=VEHICLE_NUMBER_PREFIX).exists()
+    )
+
+
+def purge_synthetic_data():
+    """Delete every synthetic row (orders and details go with their clients and vehicles)."""
+    Order.objects.filter(vehicle__vehicle_number__startswith=VEHICLE_NUMBER_PREFIX).delete()
+    Vehicle.objects.filter(vehicle_number__startswith=VEHICLE_NUMBER_PREFIX).delete()
+    Client.objects.filter(email__endswith=f"@{SYNTHETIC_DOMAIN}").delete()
+    Renter.objects.filter(email__endswith=f"@{SYNTHETIC_DOMAIN}").delete()
+
+
+def generate_synthetic_data(
+    renters,
+    vehicles,
+    clients,
+    orders,
+    seed=0,
+    start=DEFAULT_START,
+    as_of=DEFAULT_AS_OF,
+    batch_size=5000,
+    use_copy=None,
+    progress=None,
+):
+    """
+    Write the synthetic data set and return ``{table: (rows, seconds)}``.
+    ``use_copy`` defaults to True on PostgreSQL. ``progress(table, rows)`` is
+    called after every batch with the running total for that table.
+    Orders need at least one vehicle and one client.
+    """
+    if use_copy is None:
+        use_copy = connection.vendor == "postgresql"
+    rng = random.Random(seed)
+    stats = {}
+
+    def write(model, objs):
+        table = model._meta.verbose_name_plural
+        written = 0
+        started = time.perf_counter()
+        for rows in write_rows(model, objs, batch_size, use_copy):
+            written += rows
+            if progress:
+                progress(table, written)
+        stats[table] = (written, time.perf_counter() - started)
+
+    write(Renter, _renters(rng, renters))
+    owner_ids = list(
+        Renter.objects.filter(email__endswith=f"@{SYNTHETIC_DOMAIN}").order_by("id").values_list("id", flat=True)
+    )
+    write(Vehicle, _vehicles(rng, vehicles, owner_ids, as_of))
+
+    write(Client, _clients(rng, clients))
+    client_ids = list(
+        Client.objects.filter(email__endswith=f"@{SYNTHETIC_DOMAIN}").order_by("id").values_list("id", flat=True)
+    )
+    write(ClientDetails, _client_details(rng, client_ids))
+
+    if orders:
+        vehicle_rows = list(
+            Vehicle.objects.filter(vehicle_number__startswith=VEHICLE_NUMBER_PREFIX)
+            .order_by("vehicle_number")
+            .values_list("id", "price_per_day", "security_deposit")
+        )
+        write(Order, _orders(rng, orders, vehicle_rows, client_ids, start, as_of))
+    return stats
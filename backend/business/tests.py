@@ -1,3 +1,1238 @@
-from django.test import TestCase
+import copy
+import csv
+import gzip
+import io
+import json
+import tempfile
+import uuid
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from unittest import mock, skipUnless
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIHandler
+from django.core.management import CommandError, call_command
+from django.db import connection, connections, router, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from authentication.models import Client, ClientDetails, Renter
+from authentication.tokens import clear_client_cache
+from backend.changelists import DrillDownQuerySet, EstimatedCountPaginator
+from backend.exports import export_chunks
+from backend.routers import pin_primary, read_from_replica
+from backend.utils import _uuid7, uuid7
+from business import urls as business_urls
+from business.analytics import fleet_report, load_intervals
+from business.archival import (
+    ARCHIVED_COLUMNS,
+    archivable_orders,
+    archive_batch,
+    archive_closed_orders,
+    archive_cutoff,
+)
+from business.events import (
+    consume_order_events,
+    read_order_events,
+    record_order_event,
+    record_status_transitions,
+)
+from business.exports import ORDER_EXPORT
+from business.loadtest import (
+    DEFAULT_MIX,
+    build_plan,
+    compare,
+    parse_mix,
+    run_plan,
+    seed_loadtest_data,
+    summarize,
+)
+from business.models import (
+    ArchivedOrder,
+    EventCursor,
+    Order,
+    OrderEvent,
+    OrderSummary,
+    RegionShard,
+    RenterDailyRollup,
+    Vehicle,
+    VehicleDailyRollup,
+    VehicleDirectory,
+)
+from business.projections import backfill_order_summaries
+from business.rollups import (
+    ROLLUP_CONSUMER,
+    ROLLUP_METRICS,
+    month_view,
+    rebuild_rollups,
+    refresh_rollups,
+)
+from business.sharding import vehicle_shard
+from business.synthetic import (
+    VEHICLE_NUMBER_PREFIX,
+    client_aadhaar,
+    client_phone,
+    generate_synthetic_data,
+    purge_synthetic_data,
+    vehicle_number,
+)
+from monitoring.budgets import Budget, BudgetTestMixin, query_diff
+
+
+class LoadTestHarnessTests(TransactionTestCase):
+    """Small end-to-end run of the load-test harness (threads need committed data)."""
+
+    # Read endpoints go to a replica when DATABASE_REPLICA_URLS is set
+    databases = "__all__"
+
+    def test_seed_is_idempotent(self):
+        vehicles, tokens = seed_loadtest_data(vehicles=5, clients=3, seed=1)
+        again, _ = seed_loadtest_data(vehicles=5, clients=3, seed=1)
+        self.assertEqual(vehicles, again)
+        self.assertEqual(len(tokens), 3)
+        self.assertEqual(Vehicle.objects.count(), 5)
+
+    def test_run_covers_every_endpoint_without_errors(self):
+        vehicles, tokens = seed_loadtest_data(vehicles=5, clients=3)
+        plan = build_plan(60, DEFAULT_MIX, vehicles, tokens, seed=3)
+        self.assertEqual(plan, build_plan(60, DEFAULT_MIX, vehicles, tokens, seed=3))
+
+        # SQLite's shared in-memory test database fails concurrent writers instead of waiting
+        concurrency = 1 if connection.vendor == "sqlite" else 2
+        samples, elapsed = run_plan(plan, concurrency=concurrency)
+        results = summarize(samples, elapsed)
+
+        self.assertEqual(results["overall"]["requests"], 60)
+        self.assertEqual(results["overall"]["errors"], 0)
+        self.assertEqual(set(results["endpoints"]), set(DEFAULT_MIX))
+        bookings = results["endpoints"]["create_booking"]["requests"]
+        self.assertEqual(Order.objects.count(), bookings)
+
+
+class LoadTestCompareTests(SimpleTestCase):
+    baseline = {
+        "overall": {"throughput_rps": 100.0},
+        "endpoints": {"get_all_vehicles": {"p95_ms": 20.0}},
+    }
+
+    def results(self, rps, p95):
+        return {"overall": {"throughput_rps": rps}, "endpoints": {"get_all_vehicles": {"p95_ms": p95}}}
+
+    def test_within_threshold(self):
+        self.assertEqual(compare(self.results(95.0, 21.0), self.baseline, 10), [])
+
+    def test_latency_and_throughput_regressions(self):
+        regressions = compare(self.results(80.0, 30.0), self.baseline, 10)
+        self.assertEqual(len(regressions), 2)
+
+    def test_parse_mix_rejects_unknown_endpoints(self):
+        self.assertEqual(parse_mix("get_all_vehicles=2,create_booking"), {"get_all_vehicles": 2, "create_booking": 1})
+        with self.assertRaises(ValueError):
+            parse_mix("delete_everything=1")
+
+
+class ConnectionBenchTests(TransactionTestCase):
+    def test_bench_runs_each_mode(self):
+        generate_synthetic_data(renters=1, vehicles=2, clients=1, orders=2, seed=3)
+        out = io.StringIO()
+        # The command adds its aliases at run time, after the test case fixed its databases
+        bench_aliases = self.databases | {"bench_direct", "bench_persistent", "bench_persistent_prepared"}
+        with mock.patch.object(type(self), "databases", bench_aliases):
+            call_command(
+                "bench_db_connections", modes="direct,persistent", bursts=2, burst_size=2, idle=0, connects=3, stdout=out
+            )
+        output = out.getvalue()
+        self.assertIn("persistent", output)
+        self.assertNotIn("failed", output)
+        self.assertNotIn("bench_direct", connections)
+
+    def test_pool_needs_postgresql(self):
+        if connection.vendor == "postgresql":
+            self.skipTest("pool mode is supported here")
+        with self.assertRaises(CommandError):
+            call_command("bench_db_connections", modes="pool", stdout=io.StringIO())
+
+
+class UUID7Tests(SimpleTestCase):
+    def test_ids_are_version_7_and_increase(self):
+        ids = [_uuid7() for _ in range(5000)]
+        self.assertEqual({(u.version, u.variant) for u in ids}, {(7, uuid.RFC_4122)})
+        self.assertEqual(ids, sorted(ids))
+        self.assertEqual(len(set(ids)), len(ids))
+
+    def test_models_use_them(self):
+        self.assertEqual(Vehicle().id.version, 7)
+        self.assertEqual(Order().id.version, 7)
+        self.assertEqual(uuid7().version, 7)
+
+
+class SyntheticDataTests(TestCase):
+    counts = {"renters": 3, "vehicles": 6, "clients": 10, "orders": 40}
+
+    def generate(self, seed=7):
+        return generate_synthetic_data(**self.counts, seed=seed, batch_size=7)
+
+    def test_rows_are_valid_and_bookings_never_overlap(self):
+        stats = self.generate()
+        self.assertEqual(stats["orders"][0], 40)
+        self.assertEqual(ClientDetails.objects.count(), 10)
+
+        for obj in [*Vehicle.objects.all(), *ClientDetails.objects.all(), *Order.objects.all()[:10]]:
+            obj.full_clean()
+
+        for vehicle in Vehicle.objects.all():
+            windows = list(vehicle.orders.order_by("pickup_datetime").values_list("pickup_datetime", "return_datetime"))
+            self.assertGreater(len(windows), 0)
+            for (_, previous_return), (pickup, _) in zip(windows, windows[1:]):
+                self.assertLessEqual(previous_return, pickup)
+
+    def test_same_seed_gives_same_rows(self):
+        def snapshot():
+            return (
+                list(Vehicle.objects.order_by("vehicle_number").values_list("id", "price_per_day")),
+                sorted(Order.objects.values_list("id", "vehicle_id", "pickup_datetime", "order_status")),
+            )
+
+        self.generate()
+        first = snapshot()
+        purge_synthetic_data()
+        self.assertFalse(Vehicle.objects.filter(vehicle_number__startswith=VEHICLE_NUMBER_PREFIX).exists())
+        self.generate()
+        self.assertEqual(snapshot(), first)
+
+    def test_unique_columns_do_not_collide(self):
+        indexes = range(0, 10**6, 37)
+        self.assertEqual(len({client_phone(i) for i in indexes}), len(indexes))
+        self.assertEqual(len({client_aadhaar(i) for i in indexes}), len(indexes))
+        self.assertEqual(len({vehicle_number(i) for i in indexes}), len(indexes))
+        self.assertTrue(all(len(vehicle_number(i)) <= 15 for i in indexes))
+
+
+@override_settings(DATABASE_SHARDS=[])
+class FleetAnalyticsTests(TestCase):
+    def test_booking_across_local_midnight(self):
+        generate_synthetic_data(renters=1, vehicles=1, clients=1, orders=0, seed=6)
+        # 23:30 to 01:00 in Asia/Kolkata
+        pickup = datetime(2026, 1, 1, 18, 0, tzinfo=dt_timezone.utc)
+        Order.objects.create(
+            client=Client.objects.get(),
+            vehicle=Vehicle.objects.get(),
+            pickup_datetime=pickup,
+            return_datetime=pickup + timedelta(minutes=90),
+            pickup_location="Pune",
+            dropoff_location="Pune",
+            rental_amount=100,
+            security_deposit=100,
+        )
+        window_start, window_end = pickup - timedelta(days=1), pickup + timedelta(days=1)
+        vehicle_ids, codes, starts, ends = load_intervals(window_start, window_end)
+        self.assertEqual((starts[0], ends[0]), (pickup.timestamp(), pickup.timestamp() + 5400))
+
+        report = fleet_report(
+            codes, starts, ends, len(vehicle_ids), int(window_start.timestamp()), int(window_end.timestamp())
+        )
+        self.assertEqual([hour for hour in range(24) if report["demand_peak"][hour]], [0, 23])
+        self.assertEqual(report["busy_seconds"][0], 5400)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class OrderEventTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_synthetic_data(renters=1, vehicles=1, clients=1, orders=1, seed=8)
+        cls.order = Order.objects.get()
+
+    def events(self):
+        return list(OrderEvent.objects.filter(order_id=self.order.pk).values_list("event_type", flat=True))
+
+    def old_events(self, count):
+        OrderEvent.objects.bulk_create(
+            OrderEvent(
+                event_type=OrderEvent.EventTypes.CREATED,
+                order_id=self.order.pk,
+                client_id=self.order.client_id,
+                vehicle_id=self.order.vehicle_id,
+                amount=self.order.rental_amount,
+                pickup_datetime=self.order.pickup_datetime,
+                return_datetime=self.order.return_datetime,
+            )
+            for _ in range(count)
+        )
+        events = OrderEvent.objects.filter(order_id=self.order.pk).order_by("pk")
+        events.update(created_at=timezone.now() - timedelta(minutes=1))
+        return list(events)
+
+    def test_events_are_written_in_one_insert_on_commit(self):
+        with CaptureQueriesContext(connection) as captured:
+            with self.captureOnCommitCallbacks(execute=True) as callbacks:
+                record_order_event(self.order, OrderEvent.EventTypes.CREATED)
+                self.order.order_status, self.order.payment_status = "completed", "paid"
+                record_status_transitions(self.order, "upcoming", "pending")
+                self.assertEqual(self.events(), [])
+        self.assertEqual(len(callbacks), 1)
+        inserts = [q["sql"] for q in captured.captured_queries if q["sql"].startswith('INSERT INTO "business_orderevent"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(self.events(), ["created", "completed", "paid"])
+
+    def test_rolled_back_events_are_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), transaction.atomic():
+                record_order_event(self.order, OrderEvent.EventTypes.CREATED)
+                raise RuntimeError
+            record_order_event(self.order, OrderEvent.EventTypes.CANCELLED)
+        self.assertEqual(self.events(), ["cancelled"])
+
+    def test_read_order_events(self):
+        events = self.old_events(4)
+        self.assertEqual(read_order_events(after=events[0].pk, limit=2), events[1:3])
+        self.assertEqual(read_order_events(after=events[-1].pk), [])
+        OrderEvent.objects.filter(pk=events[-1].pk).update(created_at=timezone.now())
+        # The young event is held back until it settles
+        self.assertEqual(read_order_events(after=events[0].pk), events[1:3])
+        self.assertEqual(read_order_events(after=events[0].pk, settle_seconds=0), events[1:])
+
+    def test_consumer_resumes_after_a_failed_batch(self):
+        events = self.old_events(5)
+        EventCursor.objects.create(consumer="test", position=events[0].pk - 1)
+        handled = []
+
+        def fail_second_batch(batch):
+            if handled:
+                raise RuntimeError
+            handled.extend(batch)
+
+        with self.assertRaises(RuntimeError):
+            consume_order_events("test", fail_second_batch, batch_size=2)
+        self.assertEqual(handled, events[:2])
+        self.assertEqual(EventCursor.objects.get(consumer="test").position, events[1].pk)
+
+        handled = []
+        self.assertEqual(consume_order_events("test", handled.extend, batch_size=2), 3)
+        self.assertEqual(handled, events[2:])
+        self.assertEqual(EventCursor.objects.get(consumer="test").position, events[-1].pk)
+        self.assertEqual(consume_order_events("test", handled.extend), 0)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class ArchivalTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_synthetic_data(renters=1, vehicles=3, clients=2, orders=30, seed=9)
+        cls.cutoff = archive_cutoff(0)
+        cls.closed = list(archivable_orders(cls.cutoff).order_by("pk").values_list("pk", flat=True))
+
+    def test_batch_moves_the_oldest_ids(self):
+        self.assertGreater(len(self.closed), 3)
+        before = {order.pk: order for order in Order.objects.filter(pk__in=self.closed[:3])}
+        self.assertEqual(archive_batch(self.cutoff, 3), 3)
+
+        archived = ArchivedOrder.objects.in_bulk()
+        self.assertEqual(sorted(archived), self.closed[:3])
+        self.assertFalse(Order.objects.filter(pk__in=self.closed[:3]).exists())
+        for pk, order in before.items():
+            for column in ARCHIVED_COLUMNS:
+                self.assertEqual(getattr(archived[pk], column), getattr(order, column), column)
+
+    def test_batches_respect_the_size(self):
+        remaining = Order.objects.exclude(pk__in=self.closed).count()
+        self.assertEqual(list(archive_closed_orders(older_than_days=0, batch_size=4, max_batches=1)), [4])
+        moved = list(archive_closed_orders(older_than_days=0, batch_size=4))
+        self.assertTrue(all(count == 4 for count in moved[:-1]))
+        self.assertEqual(4 + sum(moved), len(self.closed))
+        self.assertEqual(ArchivedOrder.objects.count(), len(self.closed))
+        self.assertEqual(Order.objects.count(), remaining)
+        self.assertFalse(archivable_orders(self.cutoff).exists())
+
+    def test_full_history_lists_live_and_archived_orders_once(self):
+        client = Client.objects.filter(orders__pk__in=self.closed).first()
+        orders = Order.objects.filter(client=client)
+        expected = [str(pk) for pk in orders.order_by("-created_at").values_list("pk", flat=True)]
+        live = [str(pk) for pk in orders.exclude(pk__in=self.closed).order_by("-created_at").values_list("pk", flat=True)]
+        self.assertLess(len(live), len(expected))
+        list(archive_closed_orders(older_than_days=0, batch_size=5))
+
+        def listed(**payload):
+            response = self.client.post(
+                reverse("list_user_orders"),
+                payload,
+                content_type="application/json",
+                headers={"Authorization": f"Token {client.authToken}"},
+            )
+            return [order["id"] for order in response.json()["orders"]]
+
+        self.assertEqual(listed(), live)
+        self.assertEqual(listed(full_history=True), expected)
+
+
+@override_settings(DATABASE_SHARDS=[])
+class RollupTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_synthetic_data(renters=1, vehicles=2, clients=1, orders=6, seed=10)
+        cls.vehicle = Vehicle.objects.select_related("owner").order_by("vehicle_number").first()
+        cls.token = str(Client.objects.get().authToken)
+        rebuild_rollups()
+
+    def book(self, pickup, hours):
+        response = self.client.post(
+            reverse("create_booking"),
+            {
+                "vehicle_id": str(self.vehicle.pk),
+                "pickup_datetime": pickup.isoformat(),
+                "return_datetime": (pickup + timedelta(hours=hours)).isoformat(),
+                "pickup_location": self.vehicle.location,
+                "dropoff_location": self.vehicle.location,
+            },
+            content_type="application/json",
+            headers={"Authorization": f"Token {self.token}"},
+        )
+        self.assertEqual(response.status_code, 201, response.content)
+        return Order.objects.get(pk=response.json()["order_id"])
+
+    def rollups(self):
+        return (
+            sorted(VehicleDailyRollup.objects.values_list("vehicle_id", "date", "owner_id", *ROLLUP_METRICS)),
+            sorted(RenterDailyRollup.objects.values_list("owner_id", "date", *ROLLUP_METRICS)),
+        )
+
+    def test_refresh_folds_new_events_and_rebuild_agrees(self):
+        day = timezone.localdate() + timedelta(days=400)
+        morning = timezone.make_aware(datetime.combine(day, datetime.min.time())) + timedelta(hours=10)
+        with self.captureOnCommitCallbacks(execute=True):
+            kept = self.book(morning, 6)
+            cancelled = self.book(morning + timedelta(hours=7), 3)
+            response = self.client.post(
+                reverse("cancel_order"),
+                {"order_id": str(cancelled.pk)},
+                content_type="application/json",
+                headers={"Authorization": f"Token {self.token}"},
+            )
+            self.assertEqual(response.status_code, 200, response.content)
+            with transaction.atomic():
+                kept.order_status, kept.payment_status = "completed", "paid"
+                kept.save()
+                record_status_transitions(kept, "upcoming", "pending", owner_id=self.vehicle.owner.user_id)
+
+        self.assertEqual(refresh_rollups(settle_seconds=0), 5)
+        cursor = EventCursor.objects.get(consumer=ROLLUP_CONSUMER)
+        self.assertEqual(cursor.position, OrderEvent.objects.latest("pk").pk)
+        row = VehicleDailyRollup.objects.get(vehicle_id=self.vehicle.pk, date=day)
+        self.assertEqual(
+            (row.bookings, row.cancellations, row.revenue, row.paid_revenue, row.booked_seconds),
+            (1, 1, kept.rental_amount, kept.rental_amount, 6 * 3600),
+        )
+        self.assertEqual(row.owner_id, self.vehicle.owner.user_id)
+        self.assertEqual(RenterDailyRollup.objects.get(owner_id=self.vehicle.owner.user_id, date=day).bookings, 1)
+        self.assertEqual(refresh_rollups(settle_seconds=0), 0)
+
+        view = month_view(VehicleDailyRollup, day.strftime("%Y-%m"), vehicle_id=self.vehicle.pk)
+        self.assertEqual(view["month"], day.strftime("%Y-%m"))
+        self.assertEqual(
+            view["days"][day.day - 1],
+            {
+                "date": day.isoformat(),
+                "bookings": 1,
+                "cancellations": 1,
+                "revenue": float(kept.rental_amount),
+                "paid_revenue": float(kept.rental_amount),
+                "utilization": 0.25,
+            },
+        )
+        self.assertEqual(view["totals"]["bookings"], 1)
+        self.assertEqual(view["totals"]["utilization"], round(0.25 / len(view["days"]), 4))
+
+        incremental = self.rollups()
+        rebuild_rollups(chunk_size=2)
+        self.assertEqual(self.rollups(), incremental)
+        self.assertEqual(EventCursor.objects.get(consumer=ROLLUP_CONSUMER).position, cursor.position)
+
+
+# Budgets are for one database; fan-out to shards is covered by ShardingTests
+@override_settings(DATABASE_SHARDS=[])
+class EndpointBudgetTests(BudgetTestMixin, TestCase):
+    """Query, size and time budgets of every business endpoint on a seeded fixture."""
+
+    budgets = {
+        "get_all_vehicles": Budget(queries=1),
+        "get_vehicle_details": Budget(queries=1),
+        "list_user_orders": Budget(queries=3, max_bytes=64 * 1024),
+        "order_history": Budget(queries=2),
+        # Session and admin user, then the orders
+        "renter_orders": Budget(queries=3),
+        "renter_dashboard": Budget(queries=4),
+        "vehicle_dashboard": Budget(queries=3),
+        "create_booking": Budget(queries=6),
+        "check_availability": Budget(queries=2),
+        "availability_calendar": Budget(queries=2),
+        "cancel_order": Budget(queries=4),
+    }
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_synthetic_data(renters=2, vehicles=4, clients=3, orders=30, seed=42)
+        list(archive_closed_orders(older_than_days=0, batch_size=6, max_batches=1))
+        list(backfill_order_summaries())
+        rebuild_rollups()
+
+        cls.vehicle = Vehicle.objects.select_related("owner").order_by("vehicle_number").first()
+        cls.client_obj = Order.objects.order_by("pk").first().client
+        cls.upcoming = Order.objects.create(
+            client=cls.client_obj,
+            vehicle=cls.vehicle,
+            pickup_datetime=timezone.now() + timedelta(days=30),
+            return_datetime=timezone.now() + timedelta(days=31),
+            pickup_location="Kolkata",
+            dropoff_location="Kolkata",
+            rental_amount=cls.vehicle.price_per_day,
+            security_deposit=cls.vehicle.security_deposit,
+        )
+
+    def setUp(self):
+        clear_client_cache()
+
+    def window(self, days):
+        pickup = timezone.now() + timedelta(days=days)
+        return {
+            "vehicle_id": str(self.vehicle.id),
+            "pickup_datetime": pickup.isoformat(),
+            "return_datetime": (pickup + timedelta(hours=5)).isoformat(),
+        }
+
+    def test_every_endpoint_has_a_budget(self):
+        self.assertBudgetsCover(business_urls.urlpatterns)
+
+    def test_vehicles(self):
+        response = self.request_within_budget("get_all_vehicles", method="get")
+        self.assertEqual(len(response.json()["vehicles"]), 4)
+        response = self.request_within_budget("get_vehicle_details", {"vehicle_id": str(self.vehicle.id)})
+        self.assertEqual(response.status_code, 200)
+
+    def test_orders(self):
+        token = self.client_obj.authToken
+        response = self.request_within_budget("list_user_orders", {"full_history": True}, token=token)
+        orders = response.json()["orders"]
+        self.assertEqual(
+            len(orders),
+            Order.objects.filter(client=self.client_obj).count()
+            + ArchivedOrder.objects.filter(client=self.client_obj).count(),
+        )
+        self.assertIn("vehicle_number", orders[0]["vehicle"])
+
+        response = self.request_within_budget("order_history", {}, token=token)
+        self.assertTrue(response.json()["orders"])
+        renter = {"renter_id": str(self.vehicle.owner.user_id)}
+        post = lambda: self.client.post(reverse("renter_orders"), renter, content_type="application/json")
+        self.assertEqual(post().status_code, 401)
+        self.client.force_login(get_user_model().objects.create_user("staff", is_staff=True))
+        self.assertEqual(post().status_code, 403)
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "secret"))
+        response = self.request_within_budget("renter_orders", renter)
+        self.assertTrue(response.json()["orders"])
+
+    def test_dashboards(self):
+        dashboards = (
+            ("renter_dashboard", {"renter_id": str(self.vehicle.owner.user_id)}),
+            ("vehicle_dashboard", {"vehicle_id": str(self.vehicle.id)}),
+        )
+        post = lambda name, payload: self.client.post(reverse(name), payload, content_type="application/json")
+        for name, payload in dashboards:
+            self.assertEqual(post(name, payload).status_code, 401, name)
+        self.client.force_login(get_user_model().objects.create_user("staff", is_staff=True))
+        for name, payload in dashboards:
+            self.assertEqual(post(name, payload).status_code, 403, name)
+
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "secret"))
+        response = self.request_within_budget(
+            "renter_dashboard", {"renter_id": str(self.vehicle.owner.user_id), "month": "2024-02"}
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.request_within_budget(
+            "vehicle_dashboard", {"vehicle_id": str(self.vehicle.id), "month": "2024-02"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+        for name, payload in (("renter_dashboard", {"renter_id": "42"}), ("vehicle_dashboard", {"vehicle_id": "x"})):
+            self.assertEqual(post(name, payload).status_code, 400, name)
+
+    def test_booking(self):
+        response = self.request_within_budget("check_availability", self.window(days=60))
+        self.assertTrue(response.json()["available"])
+        response = self.request_within_budget("availability_calendar", {"vehicle_id": str(self.vehicle.id)})
+        self.assertEqual(len(response.json()["calendar"]), 1)
+
+        response = self.request_within_budget(
+            "create_booking",
+            {**self.window(days=60), "pickup_location": "Pune", "dropoff_location": "Pune"},
+            token=self.client_obj.authToken,
+        )
+        self.assertEqual(response.status_code, 201)
+
+        response = self.request_within_budget(
+            "cancel_order", {"order_id": str(self.upcoming.id)}, token=self.client_obj.authToken
+        )
+        self.assertEqual(response.json()["status"], "cancelled")
+
+
+@override_settings(DATABASE_SHARDS=[])
+class AsyncStackTests(TestCase):
+    """The endpoints served through the ASGI handler, as under uvicorn."""
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_synthetic_data(renters=1, vehicles=2, clients=2, orders=6, seed=5)
+        cls.vehicle = Vehicle.objects.order_by("vehicle_number").first()
+        cls.client_obj = Order.objects.order_by("pk").first().client
+
+    def test_middleware_runs_without_sync_adapters(self):
+        # With DEBUG on, Django logs every middleware it has to wrap for the other
+        # mode; ones that raise MiddlewareNotUsed are dropped again right after
+        with override_settings(DEBUG=True), self.assertLogs("django.request", "DEBUG") as logs:
+            ASGIHandler().load_middleware(is_async=True)
+        unused = {line.split("'")[1] for line in logs.output if "MiddlewareNotUsed" in line}
+        adapted = [
+            line for line in logs.output if " adapted for middleware " in line and line.split()[-1].rstrip(".") not in unused
+        ]
+        self.assertEqual(adapted, [])
+
+    @mock.patch("monitoring.middleware.observe_request")
+    async def test_async_views_and_query_metrics(self, observe):
+        response = await self.async_client.post(
+            reverse("list_user_orders"),
+            {},
+            content_type="application/json",
+            headers={"Authorization": f"Token {self.client_obj.authToken}"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.json()["orders"])
+        # Queries run by sync_to_async on the ORM's thread are still counted
+        view, _, status, _, _, queries, _ = observe.call_args.args
+        self.assertEqual((view, status), ("list_user_orders", 200))
+        self.assertGreaterEqual(queries, 2)
+
+        window = {
+            "vehicle_id": str(self.vehicle.id),
+            "pickup_datetime": (timezone.now() + timedelta(days=400)).isoformat(),
+            "return_datetime": (timezone.now() + timedelta(days=401)).isoformat(),
+        }
+        response = await self.async_client.post(
+            reverse("create_booking"),
+            {**window, "pickup_location": "Pune", "dropoff_location": "Pune"},
+            content_type="application/json",
+            headers={"Authorization": f"Token {self.client_obj.authToken}"},
+        )
+        self.assertEqual(response.status_code, 201)
+        response = await self.async_client.post(
+            reverse("check_availability"), window, content_type="application/json"
+        )
+        self.assertFalse(response.json()["available"])
+
+
+@override_settings(DATABASE_SHARDS=[])
+class AdminChangelistTests(TestCase):
+    """Admin pages of the big tables run a fixed number of queries, however many rows they show."""
+
+    # Session, user, count, page, drill-down bounds and filter choices; a
+    # query per row would need far more with the rows below
+    max_queries = 12
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_synthetic_data(renters=3, vehicles=20, clients=5, orders=60, seed=11)
+        list(archive_closed_orders(older_than_days=0, batch_size=10, max_batches=1))
+        list(backfill_order_summaries())
+        cls.admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "secret")
+
+    def setUp(self):
+        self.client.force_login(self.admin_user)
+
+    def get(self, url, params=None):
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        statements = [query["sql"] for query in captured.captured_queries]
+        self.assertLessEqual(len(statements), self.max_queries, f"{url}:\n{query_diff(statements)}")
+        return response, statements
+
+    def test_changelists_do_not_query_per_row(self):
+        self.assertGreater(Order.objects.count(), 2 * self.max_queries)
+        self.assertGreater(Vehicle.objects.count(), self.max_queries)
+        for model in (Order, Vehicle, ArchivedOrder, OrderSummary):
+            with self.subTest(model=model.__name__):
+                self.get(reverse(f"admin:business_{model._meta.model_name}_changelist"))
+
+        pickup = Order.objects.order_by("pickup_datetime").first().pickup_datetime
+        pickup = timezone.localtime(pickup)
+        url = reverse("admin:business_order_changelist")
+        self.get(url, {"pickup_datetime__year": pickup.year})
+        self.get(url, {"pickup_datetime__year": pickup.year, "pickup_datetime__month": pickup.month})
+        self.get(url, {"q": self.admin_user.username})
+
+    def test_drill_down_reads_bounds_instead_of_distinct_values(self):
+        # Days are listed from the rows of one month, so spread the orders over years
+        order = Order.objects.first()
+        order.pk, order.pickup_datetime = None, order.pickup_datetime - timedelta(days=800)
+        order.save()
+        _, statements = self.get(reverse("admin:business_order_changelist"))
+        self.assertFalse([sql for sql in statements if "DISTINCT" in sql])
+
+        drill_down = DrillDownQuerySet(Order)
+        for kind in ("year", "month"):
+            with self.subTest(kind=kind):
+                exact = list(Order.objects.datetimes("pickup_datetime", kind))
+                spanned = drill_down.datetimes("pickup_datetime", kind)
+                self.assertEqual((spanned[0], spanned[-1]), (exact[0], exact[-1]))
+                self.assertLessEqual(set(exact), set(spanned))
+                self.assertEqual(drill_down.datetimes("pickup_datetime", kind, "DESC"), spanned[::-1])
+        self.assertEqual(drill_down.none().datetimes("pickup_datetime", "year"), [])
+
+    def test_counts_are_estimated_for_big_unfiltered_lists(self):
+        total = Order.objects.count()
+        with mock.patch("backend.changelists.estimated_row_count", return_value=10**7):
+            self.assertEqual(EstimatedCountPaginator(Order.objects.all(), 100).count, 10**7)
+            filtered = Order.objects.filter(order_status="cancelled")
+            self.assertEqual(EstimatedCountPaginator(filtered, 100).count, filtered.count())
+        with mock.patch("backend.changelists.estimated_row_count", return_value=1000):
+            self.assertEqual(EstimatedCountPaginator(Order.objects.all(), 100).count, total)
+        # SQLite has no estimate
+        self.assertEqual(EstimatedCountPaginator(Order.objects.all(), 100).count, total)
+
+    def test_foreign_key_widgets_do_not_list_every_row(self):
+        response, _ = self.get(reverse("admin:business_order_add"))
+        for vehicle in Vehicle.objects.all():
+            self.assertNotContains(response, vehicle.vehicle_number)
+        response, _ = self.get(reverse("admin:business_vehicle_add"))
+        self.assertNotContains(response, Renter.objects.first().full_name)
+
+
+# Fan-out to shards is covered by ShardingTests
+@override_settings(DATABASE_SHARDS=[])
+class ExportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_synthetic_data(renters=2, vehicles=5, clients=4, orders=40, seed=3)
+        cls.admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "secret")
+
+    def export(self, table, *args):
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "export"
+            call_command("export_data", table, *args, "--output", str(path), stdout=io.StringIO())
+            opener = gzip.open if "--gzip" in args else open
+            with opener(path, "rt", encoding="utf-8", newline="") as f:
+                return f.read()
+
+    def test_orders_as_csv_with_client_and_vehicle(self):
+        rows = list(csv.DictReader(io.StringIO(self.export("orders", "--chunk-size", "7"))))
+        self.assertEqual(len(rows), Order.objects.count())
+        self.assertEqual([row["id"] for row in rows], sorted(str(pk) for pk in Order.objects.values_list("pk", flat=True)))
+        order = Order.objects.select_related("client", "vehicle").get(pk=rows[0]["id"])
+        self.assertEqual(rows[0]["client_email"], order.client.email)
+        self.assertEqual(rows[0]["vehicle_number"], order.vehicle.vehicle_number)
+
+    def test_gzipped_json_lines(self):
+        rows = [json.loads(line) for line in self.export("vehicles", "--format", "jsonl", "--gzip").splitlines()]
+        self.assertEqual(len(rows), Vehicle.objects.count())
+        self.assertEqual(rows[0]["vehicle_number"], Vehicle.objects.order_by("pk").first().vehicle_number)
+
+        clients = self.export("clients", "--format", "jsonl")
+        self.assertEqual(len(clients.splitlines()), 4)
+        self.assertNotIn("password", clients)
+        self.assertNotIn("authToken", clients)
+
+    def test_rows_are_streamed_in_chunks(self):
+        with mock.patch("backend.exports.CHUNK_BYTES", 1024):
+            chunks = export_chunks(ORDER_EXPORT, Order.objects.order_by("pk"), "csv", chunk_size=5)
+            first = next(chunks)
+            self.assertLess(len(first), 2048)
+            self.assertGreater(len(list(chunks)), 3)
+
+    def test_admin_actions_stream_downloads(self):
+        self.client.force_login(self.admin_user)
+        action = {"action": "export_csv", "select_across": "1", "index": "0", "_selected_action": ["x"]}
+        response = self.client.post(reverse("admin:business_order_changelist"), action)
+        self.assertTrue(response.streaming)
+        self.assertIn("attachment", response["Content-Disposition"])
+        rows = list(csv.reader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual(len(rows), Order.objects.count() + 1)
+
+        vehicle = Vehicle.objects.first()
+        response = self.client.post(
+            reverse("admin:business_vehicle_changelist"),
+            {"action": "export_jsonl", "index": "0", "_selected_action": [str(vehicle.pk)]},
+            headers={"Accept-Encoding": "gzip, deflate"},
+        )
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        lines = gzip.decompress(b"".join(response.streaming_content)).decode().splitlines()
+        self.assertEqual([json.loads(line)["id"] for line in lines], [str(vehicle.pk)])
+
+    async def test_admin_action_streams_under_asgi(self):
+        await self.async_client.aforce_login(self.admin_user)
+        action = {"action": "export_jsonl", "select_across": "1", "index": "0", "_selected_action": ["x"]}
+        response = await self.async_client.post(reverse("admin:business_order_changelist"), action)
+        self.assertTrue(response.is_async)
+        lines = b"".join([chunk async for chunk in response.streaming_content]).decode().splitlines()
+        self.assertEqual(len(lines), await Order.objects.acount())
+
+
+VEHICLE_ROW = {
+    "vehicle_number": "",
+    "name": "Swift",
+    "brand": "Maruti",
+    "model": "VXi",
+    "vehicle_type": "Car",
+    "color": "Red",
+    "transmission": "Manual",
+    "fuel_type": "Petrol",
+    "seating_capacity": "5",
+    "mileage": "18.5",
+    "engine_cc": "",
+    "current_odometer": "1200.0",
+    "insurance_expiry_date": "2030-01-31",
+    "price_per_hour": "150.00",
+    "price_per_day": "2400.00",
+    "security_deposit": "5000.00",
+    "late_fee_per_hour": "100.00",
+    "location": "Pune",
+    "region": "Pune",
+    "image_1": "https://example.com/1.jpg",
+    "image_2": "https://example.com/2.jpg",
+    "image_3": "https://example.com/3.jpg",
+    "owner_email": "",
+}
+
+
+def vehicle_csv(*rows):
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=list(VEHICLE_ROW))
+    writer.writeheader()
+    writer.writerows({**VEHICLE_ROW, **row} for row in rows)
+    return buffer.getvalue()
+
+
+@override_settings(DATABASE_SHARDS=[])
+class ImportTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_synthetic_data(renters=2, vehicles=3, clients=1, orders=0, seed=4)
+        cls.admin_user = get_user_model().objects.create_superuser("admin", "admin@example.com", "secret")
+        cls.renter = Renter.objects.first()
+
+    def load(self, name, content, *args):
+        out, err = io.StringIO(), io.StringIO()
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / name
+            if name.endswith(".gz"):
+                path.write_bytes(gzip.compress(content.encode()))
+            else:
+                path.write_text(content, encoding="utf-8")
+            call_command("import_data", "vehicles", str(path), *args, stdout=out, stderr=err)
+        return out.getvalue(), err.getvalue()
+
+    def test_creates_and_updates_on_vehicle_number(self):
+        existing = Vehicle.objects.first()
+        Vehicle.objects.filter(pk=existing.pk).update(top_speed=199)
+        content = vehicle_csv(
+            {"vehicle_number": "NEW1", "owner_email": self.renter.email},
+            {"vehicle_number": existing.vehicle_number, "price_per_day": "999.00"},
+        )
+        out, err = self.load("vehicles.csv", content, "--chunk-size", "1")
+        self.assertIn("2 of 2 vehicles saved, 0 failed", out)
+        self.assertEqual(Vehicle.objects.count(), 4)
+
+        new = Vehicle.objects.get(vehicle_number="NEW1")
+        self.assertEqual(new.owner_id, self.renter.pk)
+        self.assertEqual(new.current_status, "available")
+        updated = Vehicle.objects.get(pk=existing.pk)
+        self.assertEqual(str(updated.price_per_day), "999.00")
+        # Columns the file leaves out are kept
+        self.assertEqual(updated.top_speed, 199)
+        self.assertEqual(updated.added_on, existing.added_on)
+
+    def test_bad_rows_are_reported_and_skipped(self):
+        content = vehicle_csv(
+            {"vehicle_number": "OK1"},
+            {"vehicle_number": "BAD1", "fuel_type": "Steam", "seating_capacity": "many"},
+            {"vehicle_number": "BAD2", "owner_email": "nobody@example.com"},
+            {"vehicle_number": "OK2"},
+        )
+        out, err = self.load("vehicles.csv", content)
+        self.assertIn("2 of 4 vehicles saved, 2 failed", out)
+        self.assertIn("Line 3: fuel_type:", err)
+        self.assertIn("seating_capacity:", err)
+        self.assertIn("Line 4: owner_email: no renter with email nobody@example.com", err)
+        self.assertEqual(set(Vehicle.objects.filter(vehicle_number__in=["OK1", "OK2", "BAD1", "BAD2"]).values_list(
+            "vehicle_number", flat=True)), {"OK1", "OK2"})
+
+    def test_gzipped_json_lines(self):
+        records = [{"vehicle_number": f"JS{i}", "mileage": 20 + i} for i in range(3)]
+        content = "\n".join(json.dumps({**VEHICLE_ROW, **record}) for record in records) + "\n[]\n"
+        out, err = self.load("vehicles.jsonl.gz", content)
+        self.assertIn("3 of 4 vehicles saved, 1 failed", out)
+        self.assertIn("Line 4: Not a JSON object", err)
+        self.assertEqual(Vehicle.objects.get(vehicle_number="JS2").mileage, 22)
+
+    def test_columns_are_checked(self):
+        with self.assertRaisesMessage(CommandError, "Unknown columns: wheels"):
+            self.load("vehicles.csv", "vehicle_number,wheels\nX1,4\n")
+        with self.assertRaisesMessage(CommandError, "Missing columns: name"):
+            self.load("vehicles.csv", "vehicle_number\nX1\n")
+        with self.assertRaisesMessage(CommandError, "Can't tell the format"):
+            self.load("vehicles.txt", "")
+        self.assertFalse(Vehicle.objects.filter(vehicle_number="X1").exists())
+
+    def test_admin_upload(self):
+        url = reverse("admin:business_vehicle_import")
+        self.client.force_login(self.admin_user)
+        self.assertContains(self.client.get(url), "vehicle_number")
+
+        upload = io.BytesIO(vehicle_csv({"vehicle_number": "UP1"}, {"vehicle_number": "UP2", "mileage": "x"}).encode())
+        upload.name = "fleet.csv"
+        response = self.client.post(url, {"file": upload})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.context["result"].saved, response.context["result"].failed), (1, 1))
+        self.assertContains(response, "mileage:")
+        self.assertTrue(Vehicle.objects.filter(vehicle_number="UP1").exists())
+
+        staff = get_user_model().objects.create_user("staff", password="secret", is_staff=True)
+        self.client.force_login(staff)
+        self.assertEqual(self.client.get(url).status_code, 403)
+
+
+@override_settings(DATABASE_REPLICAS=["replica_0"])
+class ReplicaRoutingTests(SimpleTestCase):
+    token = "5b0c1c2e-8f6d-4a55-9d4e-3f1a2b3c4d5e"
+
+    def setUp(self):
+        cache.clear()
+        self.request = RequestFactory().post("/", HTTP_AUTHORIZATION=f"Token {self.token}")
+
+    @staticmethod
+    @read_from_replica
+    def read_view(request):
+        return HttpResponse(router.db_for_read(Vehicle))
+
+    @staticmethod
+    @read_from_replica
+    async def async_read_view(request):
+        return HttpResponse(router.db_for_read(Vehicle))
+
+    def test_only_marked_views_read_from_replicas(self):
+        self.assertEqual(self.read_view(self.request).content, b"replica_0")
+        self.assertEqual(router.db_for_read(Vehicle), "default")
+        self.assertEqual(router.db_for_write(Vehicle), "default")
+
+    def test_client_reads_its_writes_from_the_primary(self):
+        pin_primary(self.token)
+        self.assertEqual(self.read_view(self.request).content, b"default")
+        # Other clients still use the replica
+        self.assertEqual(self.read_view(RequestFactory().post("/")).content, b"replica_0")
+
+    async def test_async_views(self):
+        response = await self.async_read_view(self.request)
+        self.assertEqual(response.content, b"replica_0")
+        pin_primary(self.token)
+        response = await self.async_read_view(self.request)
+        self.assertEqual(response.content, b"default")
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas_everything_uses_the_primary(self):
+        self.assertEqual(self.read_view(self.request).content, b"default")
+
+
+@skipUnless(settings.DATABASE_REPLICAS, "set DATABASE_REPLICA_URLS to test against a replica")
+class ReplicaEndpointTests(TransactionTestCase):
+    """Reads and writes through the real endpoints with a replica configured (a test mirror of default)."""
+
+    databases = "__all__"
+
+    def setUp(self):
+        cache.clear()
+        clear_client_cache()
+        generate_synthetic_data(renters=1, vehicles=2, clients=1, orders=2, seed=9)
+        self.vehicle = Vehicle.objects.order_by("vehicle_number").first()
+        self.token = str(Order.objects.first().client.authToken)
+        self.replica = connections[settings.DATABASE_REPLICAS[0]]
+
+    def post(self, name, payload):
+        return self.client.post(
+            reverse(name), payload, content_type="application/json", headers={"Authorization": f"Token {self.token}"}
+        )
+
+    def queries_on(self, name, payload):
+        with CaptureQueriesContext(connection) as primary, CaptureQueriesContext(self.replica) as replica:
+            response = self.post(name, payload)
+        self.assertLess(response.status_code, 300, response.content)
+        return len(primary), len(replica)
+
+    def test_reads_go_to_the_replica_until_the_client_writes(self):
+        for name, payload in [
+            ("get_all_vehicles", {}),
+            ("get_vehicle_details", {"vehicle_id": str(self.vehicle.id)}),
+            ("list_user_orders", {}),
+        ]:
+            primary, replica = self.queries_on(name, payload)
+            self.assertEqual(primary, 0, name)
+            self.assertGreater(replica, 0, name)
+
+        window = {
+            "vehicle_id": str(self.vehicle.id),
+            "pickup_datetime": (timezone.now() + timedelta(days=500)).isoformat(),
+            "return_datetime": (timezone.now() + timedelta(days=501)).isoformat(),
+            "pickup_location": "Pune",
+            "dropoff_location": "Pune",
+        }
+        primary, replica = self.queries_on("create_booking", window)
+        self.assertEqual(replica, 0)
+
+        primary, replica = self.queries_on("list_user_orders", {})
+        self.assertGreater(primary, 0)
+        self.assertEqual(replica, 0)
+
+
+SHARDS = ["shard_a", "shard_b"]
+
+
+@override_settings(DATABASE_SHARDS=SHARDS)
+class ShardingTests(TransactionTestCase):
+    """Regions moved between the primary and two SQLite shards."""
+
+    @classmethod
+    def setUpClass(cls):
+        directory = tempfile.TemporaryDirectory()
+        cls.addClassCleanup(directory.cleanup)
+        for alias in SHARDS:
+            connections.settings[alias] = {
+                **copy.deepcopy(connections["default"].settings_dict),
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": str(Path(directory.name) / f"{alias}.sqlite3"),
+                "OPTIONS": {},
+            }
+        # Not a class attribute: the runner checks those aliases before they
+        # exist. Every alias, since reads may also go to a configured replica.
+        cls.databases = set(connections.settings)
+        super().setUpClass()
+        for alias in SHARDS:
+            call_command("migrate", database=alias, verbosity=0)
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        for alias in SHARDS:
+            connections[alias].close()
+            del connections[alias]
+            del connections.settings[alias]
+
+    def setUp(self):
+        cache.clear()
+        clear_client_cache()
+        generate_synthetic_data(renters=2, vehicles=12, clients=2, orders=24, seed=5)
+        self.region = Vehicle.objects.values_list("region", flat=True).order_by("region").first()
+        self.vehicle_ids = set(Vehicle.objects.filter(region=self.region).values_list("pk", flat=True))
+        self.order_count = Order.objects.filter(vehicle__region=self.region).count()
+
+    def move(self, region, database):
+        call_command("move_region", region, database, batch_size=2, stdout=io.StringIO())
+
+    def post(self, name, payload, token=None):
+        headers = {"Authorization": f"Token {token}"} if token else {}
+        return self.client.post(reverse(name), payload, content_type="application/json", headers=headers)
+
+    def test_move_region_and_back(self):
+        self.move(self.region, "shard_a")
+        self.assertEqual(set(Vehicle.objects.using("shard_a").values_list("pk", flat=True)), self.vehicle_ids)
+        self.assertEqual(Order.objects.using("shard_a").count(), self.order_count)
+        self.assertFalse(Vehicle.objects.filter(region=self.region).exists())
+        self.assertFalse(Order.objects.filter(vehicle_id__in=self.vehicle_ids).exists())
+        self.assertEqual(vehicle_shard(next(iter(self.vehicle_ids))), "shard_a")
+
+        self.move(self.region, "shard_b")
+        self.assertEqual(Vehicle.objects.using("shard_b").count(), len(self.vehicle_ids))
+        self.assertFalse(Vehicle.objects.using("shard_a").exists())
+
+        self.move(self.region, "default")
+        self.assertEqual(Vehicle.objects.filter(region=self.region).count(), len(self.vehicle_ids))
+        self.assertEqual(Order.objects.filter(vehicle_id__in=self.vehicle_ids).count(), self.order_count)
+        self.assertFalse(Order.objects.using("shard_b").exists())
+        self.assertFalse(RegionShard.objects.exists())
+        self.assertIsNone(vehicle_shard(next(iter(self.vehicle_ids))))
+
+    def test_moving_keeps_timestamps(self):
+        before = {v.pk: (v.added_on, v.last_updated) for v in Vehicle.objects.filter(region=self.region)}
+        self.move(self.region, "shard_a")
+        after = {v.pk: (v.added_on, v.last_updated) for v in Vehicle.objects.using("shard_a")}
+        self.assertEqual(after, before)
+
+    def test_endpoints_reach_every_shard(self):
+        vehicle_count = Vehicle.objects.count()
+        self.move(self.region, "shard_a")
+        vehicle = Vehicle.objects.using("shard_a").order_by("vehicle_number").first()
+        order = Order.objects.using("shard_a").first()
+        token = str(order.client.authToken)
+
+        ids = [v["id"] for v in self.client.get(reverse("get_all_vehicles")).json()["vehicles"]]
+        self.assertEqual(len(ids), vehicle_count)
+        self.assertEqual(ids, sorted(ids))
+
+        details = self.post("get_vehicle_details", {"vehicle_id": str(vehicle.pk)}).json()["vehicle"]
+        self.assertEqual(details["owner_id"], str(Renter.objects.get(pk=vehicle.owner_id).user_id))
+
+        renter_id = str(Renter.objects.get(pk=vehicle.owner_id).user_id)
+        self.client.force_login(get_user_model().objects.create_superuser("admin", "admin@example.com", "secret"))
+        response = self.post("renter_dashboard", {"renter_id": renter_id})
+        self.assertEqual(
+            response.json()["fleet_size"],
+            sum(Vehicle.objects.using(using).filter(owner_id=vehicle.owner_id).count() for using in ["default", *SHARDS]),
+        )
+
+        pickup = timezone.now() + timedelta(days=400)
+        window = {
+            "vehicle_id": str(vehicle.pk),
+            "pickup_datetime": pickup.isoformat(),
+            "return_datetime": (pickup + timedelta(days=1)).isoformat(),
+            "pickup_location": vehicle.location,
+            "dropoff_location": vehicle.location,
+        }
+        response = self.post("create_booking", window, token)
+        self.assertEqual(response.status_code, 201, response.content)
+        order_id = response.json()["order_id"]
+        self.assertTrue(Order.objects.using("shard_a").filter(pk=order_id).exists())
+        self.assertFalse(Order.objects.filter(pk=order_id).exists())
+        self.assertTrue(OrderSummary.objects.filter(order_id=order_id).exists())
+
+        self.assertFalse(self.post("check_availability", window).json()["available"])
+        calendar = self.post(
+            "availability_calendar",
+            {
+                "vehicle_id": str(vehicle.pk),
+                "start_date": pickup.date().isoformat(),
+                "end_date": (pickup + timedelta(days=2)).date().isoformat(),
+            },
+        ).json()["calendar"]
+        self.assertEqual(len(calendar), 1)
+
+        orders = self.post("list_user_orders", {}, token).json()["orders"]
+        self.assertIn(order_id, [o["id"] for o in orders])
+        created = [o["created_at"] for o in orders]
+        self.assertEqual(created, sorted(created, reverse=True))
+
+        response = self.post("cancel_order", {"order_id": order_id}, token)
+        self.assertEqual(response.status_code, 200, response.content)
+        self.assertEqual(Order.objects.using("shard_a").get(pk=order_id).order_status, "cancelled")
+        self.assertEqual(OrderSummary.objects.get(order_id=order_id).order_status, "cancelled")
+
+    def test_export_reads_every_shard(self):
+        self.move(self.region, "shard_a")
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "orders.csv"
+            call_command("export_data", "orders", "--output", str(path), stdout=io.StringIO())
+            rows = list(csv.DictReader(path.open(newline="")))
+        self.assertEqual(len(rows), Order.objects.count() + Order.objects.using("shard_a").count())
+        moved = [row for row in rows if row["vehicle_id"] in {str(pk) for pk in self.vehicle_ids}]
+        self.assertEqual(len(moved), self.order_count)
+        # Clients come from the primary
+        self.assertTrue(all(row["client_email"] for row in moved))
+
+    def test_archive_on_every_shard(self):
+        self.move(self.region, "shard_a")
+        closed = Order.objects.using("shard_a").filter(
+            order_status__in=["completed", "cancelled"], return_datetime__lt=timezone.now()
+        )
+        expected = set(closed.values_list("pk", flat=True))
+        primary = Order.objects.count()
+        self.assertTrue(expected)
+
+        list(archive_closed_orders(older_than_days=0, batch_size=2))
+        self.assertEqual(set(ArchivedOrder.objects.using("shard_a").values_list("pk", flat=True)), expected)
+        self.assertFalse(closed.exists())
+        self.assertEqual(Order.objects.using("shard_a").count(), self.order_count - len(expected))
+        self.assertEqual(ArchivedOrder.objects.count(), primary - Order.objects.count())
+
+    def test_rebuild_rollups_reads_every_shard(self):
+        def rollups():
+            return sorted(VehicleDailyRollup.objects.values_list("vehicle_id", "date", "owner_id", *ROLLUP_METRICS))
+
+        self.assertEqual(rebuild_rollups(), self.order_count + Order.objects.exclude(vehicle__region=self.region).count())
+        before = rollups()
+        self.move(self.region, "shard_a")
+        list(archive_closed_orders(older_than_days=0))
+        rebuild_rollups()
+        self.assertEqual(rollups(), before)
+        owners = dict(Vehicle.objects.using("shard_a").values_list("pk", "owner_id"))
+        users = dict(Renter.objects.values_list("pk", "user_id"))
+        for vehicle_id, owner_id in VehicleDailyRollup.objects.filter(vehicle_id__in=self.vehicle_ids).values_list(
+            "vehicle_id", "owner_id"
+        ):
+            self.assertEqual(owner_id, users[owners[vehicle_id]])
+
+    def test_load_intervals_reads_every_shard(self):
+        window_start, window_end = timezone.now() - timedelta(days=3650), timezone.now() + timedelta(days=3650)
+        vehicle_ids, codes, starts, ends = load_intervals(window_start, window_end)
+        self.move(self.region, "shard_a")
+        list(archive_closed_orders(older_than_days=0))
+        moved_ids, moved_codes, moved_starts, moved_ends = load_intervals(window_start, window_end)
+        self.assertEqual(set(moved_ids), set(vehicle_ids))
+        self.assertTrue(self.vehicle_ids & set(moved_ids))
+
+        def intervals(ids, codes, starts, ends):
+            return sorted(zip([ids[code] for code in codes], starts.tolist(), ends.tolist()))
+
+        self.assertEqual(
+            intervals(moved_ids, moved_codes, moved_starts, moved_ends),
+            intervals(vehicle_ids, codes, starts, ends),
+        )
+
+    def test_new_vehicles_go_to_their_region(self):
+        RegionShard.objects.create(region="Leh", database="shard_b")
+        vehicle = Vehicle.objects.first()
+        vehicle.pk = None
+        vehicle.vehicle_number = "LEH1"
+        vehicle.region = "Leh"
+        vehicle.save()
+        self.assertTrue(Vehicle.objects.using("shard_b").filter(pk=vehicle.pk).exists())
+        self.assertEqual(VehicleDirectory.objects.get(vehicle_id=vehicle.pk).region, "Leh")
+        cache.clear()
+        self.assertEqual(vehicle_shard(vehicle.pk), "shard_b")
+
+    def test_import_sends_vehicles_to_their_region(self):
+        RegionShard.objects.create(region="Leh", database="shard_b")
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "vehicles.csv"
+            path.write_text(vehicle_csv({"vehicle_number": "LEH2", "region": "Leh"}, {"vehicle_number": "PUN2"}))
+            call_command("import_data", "vehicles", str(path), stdout=io.StringIO(), stderr=io.StringIO())
+        vehicle = Vehicle.objects.using("shard_b").get(vehicle_number="LEH2")
+        self.assertEqual(VehicleDirectory.objects.get(vehicle_id=vehicle.pk).region, "Leh")
+        self.assertTrue(Vehicle.objects.filter(vehicle_number="PUN2").exists())
+
+    def test_import_updates_vehicles_where_they_are(self):
+        self.move(self.region, "shard_a")
+        moved = Vehicle.objects.using("shard_a").order_by("vehicle_number").first()
+        stays = Vehicle.objects.exclude(region=self.region).first()
+        RegionShard.objects.create(region="Leh", database="shard_b")
+        with tempfile.TemporaryDirectory() as directory:
+            path = Path(directory) / "vehicles.csv"
+            path.write_text(
+                vehicle_csv(
+                    {"vehicle_number": moved.vehicle_number, "region": self.region, "price_per_day": "111.00"},
+                    {"vehicle_number": stays.vehicle_number, "region": "Leh"},
+                )
+            )
+            err = io.StringIO()
+            call_command("import_data", "vehicles", str(path), stdout=io.StringIO(), stderr=err)
+        self.assertIn("Line 3: region: Leh would move the vehicle from default to shard_b", err.getvalue())
+
+        updated = Vehicle.objects.using("shard_a").get(vehicle_number=moved.vehicle_number)
+        self.assertEqual((updated.pk, str(updated.price_per_day)), (moved.pk, "111.00"))
+        self.assertEqual(Vehicle.objects.get(pk=stays.pk).region, stays.region)
+        for number in (moved.vehicle_number, stays.vehicle_number):
+            self.assertEqual(
+                sum(Vehicle.objects.using(alias).filter(vehicle_number=number).count() for alias in ["default", *SHARDS]),
+                1,
+            )
+
+    def test_unknown_database(self):
+        with self.assertRaises(CommandError):
+            self.move(self.region, "nowhere")
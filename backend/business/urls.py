@@ -8,12 +8,20 @@ from .views import (
     get_all_vehicles,
     get_vehicle_details,
     list_user_orders,
+    order_history,
+    renter_dashboard,
+    renter_orders,
+    vehicle_dashboard,
 )
 
 urlpatterns = [
     path("vehicles/", get_all_vehicles, name="get_all_vehicles"),
     path("vehicle_details/", get_vehicle_details, name="get_vehicle_details"),
     path("user_orders/", list_user_orders, name="list_user_orders"),
+    path("order_history/", order_history, name="order_history"),
+    path("renter_orders/", renter_orders, name="renter_orders"),
+    path("dashboard/renter/", renter_dashboard, name="renter_dashboard"),
+    path("dashboard/vehicle/", vehicle_dashboard, name="vehicle_dashboard"),
     path("booking/", create_booking, name="create_booking"),
     path("booking/availability/", check_availability, name="check_availability"),
     path(
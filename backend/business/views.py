@@ -1,31 +1,80 @@
 import json
 import random
+import uuid
 from datetime import datetime, timedelta
 
-from django.db import connection
+from asgiref.sync import sync_to_async
+from django.db import connections, router, transaction
 from django.http import JsonResponse
 from django.utils import timezone
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_POST
 from rest_framework import status
 
-from authentication.models import Client
-from business.models import Order, Vehicle
-from business.serializers import CreateOrderSerializer, OrderSerializer
-
-
-@csrf_exempt
-def get_all_vehicles(request):
-    with connection.cursor() as cursor:
-        cursor.execute(
-            """
-            SELECT 
-                id, name, brand, vehicle_type, location, 
-                price_per_day, price_per_hour, image_1, 
-                current_status, rating, seating_capacity 
-            FROM business_vehicle
-        """
-        )
+from authentication.models import Renter
+from authentication.tokens import aauthenticate_client
+from backend.routers import apin_primary, read_from_replica
+from business.events import record_order_event
+from business.models import (
+    ArchivedOrder,
+    Order,
+    OrderEvent,
+    OrderSummary,
+    RenterDailyRollup,
+    Vehicle,
+    VehicleDailyRollup,
+)
+from business.projections import sync_order_summary_status, write_order_summary
+from business.rollups import month_view
+from business.sharding import atomic_on, avehicle_shard, databases, is_shard, merge_sorted
+from business.serializers import (
+    ArchivedOrderSerializer,
+    CreateOrderSerializer,
+    OrderSerializer,
+)
+
+
+# Sorted by id so the lists from several shards can be merged
+VEHICLE_LIST_SQL = """
+    SELECT 
+        id, name, brand, vehicle_type, location, 
+        price_per_day, price_per_hour, image_1, 
+        current_status, rating, seating_capacity 
+    FROM business_vehicle
+    ORDER BY id
+"""
+
+VEHICLE_DETAILS_COLUMNS = """
+        v.id, v.vehicle_number, v.name, v.brand, v.model, v.vehicle_type, v.transmission, 
+        v.fuel_type, v.seating_capacity, v.mileage, v.engine_cc, v.color, v.top_speed, 
+        v.location, v.current_odometer, v.insurance_expiry_date,
+        v.price_per_day, v.price_per_hour, v.security_deposit, v.late_fee_per_hour,
+        v.image_1, v.image_2, v.image_3,
+        v.rating, v.total_trips, v.current_status"""
+
+VEHICLE_DETAILS_SQL = f"""
+    SELECT {VEHICLE_DETAILS_COLUMNS},
+        r.user_id AS owner_id
+    FROM business_vehicle v
+    LEFT JOIN authentication_renter r ON v.owner_id = r.id
+    WHERE v.id = %s
+    LIMIT 1
+"""
+
+# Shards hold no renters; the owner's user_id is looked up on the primary
+SHARD_VEHICLE_DETAILS_SQL = f"""
+    SELECT {VEHICLE_DETAILS_COLUMNS},
+        v.owner_id
+    FROM business_vehicle v
+    WHERE v.id = %s
+    LIMIT 1
+"""
+
+
+def _fetch_all_vehicles(using=None):
+    # Fixed SQL on the hottest endpoint; prepared by PostgreSQL with DB_PREPARE_THRESHOLD
+    with connections[using or router.db_for_read(Vehicle)].cursor() as cursor:
+        cursor.execute(VEHICLE_LIST_SQL)
         columns = [col[0] for col in cursor.description]
         vehicles = [dict(zip(columns, row)) for row in cursor.fetchall()]
 
@@ -35,13 +84,63 @@ def get_all_vehicles(request):
             v["price_per_day"] = float(v["price_per_day"])
             v["price_per_hour"] = float(v["price_per_hour"])
             v["rating"] = float(v["rating"])
+    return vehicles
 
+
+@csrf_exempt
+@read_from_replica
+async def get_all_vehicles(request):
+    # Raw cursors have no async API; run the query on the request's DB thread
+    vehicles = await sync_to_async(_fetch_catalog)()
     return JsonResponse({"vehicles": vehicles}, safe=False)
 
 
+def _fetch_catalog():
+    # One database after the other: connections belong to this thread
+    return merge_sorted([_fetch_all_vehicles(using) for using in databases()], key=lambda v: v["id"])
+
+
+def _fetch_vehicle_details(vehicle_id, using=None):
+    connection = connections[using or router.db_for_read(Vehicle)]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            SHARD_VEHICLE_DETAILS_SQL if is_shard(using) else VEHICLE_DETAILS_SQL,
+            # Stored as uuid on PostgreSQL but as 32-char hex on SQLite
+            [Vehicle._meta.pk.get_db_prep_value(vehicle_id, connection)],
+        )
+
+        row = cursor.fetchone()
+        if not row:
+            return None
+
+        columns = [col[0] for col in cursor.description]
+        vehicle = dict(zip(columns, row))
+
+    if is_shard(using) and vehicle["owner_id"] is not None:
+        vehicle["owner_id"] = Renter.objects.filter(pk=vehicle["owner_id"]).values_list("user_id", flat=True).first()
+
+    # Type conversions
+    vehicle["id"] = str(vehicle["id"])
+    vehicle["owner_id"] = (
+        str(vehicle["owner_id"]) if vehicle["owner_id"] else None
+    )
+    vehicle["price_per_day"] = float(vehicle["price_per_day"])
+    vehicle["price_per_hour"] = float(vehicle["price_per_hour"])
+    vehicle["security_deposit"] = float(vehicle["security_deposit"])
+    vehicle["late_fee_per_hour"] = float(vehicle["late_fee_per_hour"])
+    vehicle["rating"] = float(vehicle["rating"])
+    vehicle["mileage"] = float(vehicle["mileage"])
+    vehicle["current_odometer"] = float(vehicle["current_odometer"])
+    vehicle["insurance_expiry_date"] = vehicle[
+        "insurance_expiry_date"
+    ].isoformat()
+    return vehicle
+
+
 @csrf_exempt
 @require_POST
-def get_vehicle_details(request):
+@read_from_replica
+async def get_vehicle_details(request):
     try:
         body = json.loads(request.body)
         vehicle_id = body.get("vehicle_id")
@@ -49,48 +148,10 @@ def get_vehicle_details(request):
         if not vehicle_id:
             return JsonResponse({"error": "vehicle_id is required"}, status=400)
 
-        with connection.cursor() as cursor:
-            cursor.execute(
-                """
-                SELECT 
-                    v.id, v.vehicle_number, v.name, v.brand, v.model, v.vehicle_type, v.transmission, 
-                    v.fuel_type, v.seating_capacity, v.mileage, v.engine_cc, v.color, v.top_speed, 
-                    v.location, v.current_odometer, v.insurance_expiry_date,
-                    v.price_per_day, v.price_per_hour, v.security_deposit, v.late_fee_per_hour,
-                    v.image_1, v.image_2, v.image_3,
-                    v.rating, v.total_trips, v.current_status,
-                    r.user_id AS owner_id
-                FROM business_vehicle v
-                LEFT JOIN authentication_renter r ON v.owner_id = r.id
-                WHERE v.id = %s
-                LIMIT 1
-            """,
-                [vehicle_id],
-            )
-
-            row = cursor.fetchone()
-            if not row:
-                return JsonResponse({"error": "Vehicle not found"}, status=404)
-
-            columns = [col[0] for col in cursor.description]
-            vehicle = dict(zip(columns, row))
-
-            # Type conversions
-            vehicle["id"] = str(vehicle["id"])
-            vehicle["owner_id"] = (
-                str(vehicle["owner_id"]) if vehicle["owner_id"] else None
-            )
-            vehicle["price_per_day"] = float(vehicle["price_per_day"])
-            vehicle["price_per_hour"] = float(vehicle["price_per_hour"])
-            vehicle["security_deposit"] = float(vehicle["security_deposit"])
-            vehicle["late_fee_per_hour"] = float(vehicle["late_fee_per_hour"])
-            vehicle["rating"] = float(vehicle["rating"])
-            vehicle["mileage"] = float(vehicle["mileage"])
-            vehicle["current_odometer"] = float(vehicle["current_odometer"])
-            vehicle["insurance_expiry_date"] = vehicle[
-                "insurance_expiry_date"
-            ].isoformat()
-
+        using = await avehicle_shard(vehicle_id)
+        vehicle = await sync_to_async(_fetch_vehicle_details)(vehicle_id, using)
+        if vehicle is None:
+            return JsonResponse({"error": "Vehicle not found"}, status=404)
         return JsonResponse({"vehicle": vehicle})
 
     except json.JSONDecodeError:
@@ -101,25 +162,42 @@ def get_vehicle_details(request):
 
 @csrf_exempt
 @require_POST
-def list_user_orders(request):
-    """List all orders for the authenticated user"""
+@read_from_replica
+async def list_user_orders(request):
+    """
+    List orders for the authenticated user.
+    Pass ``"full_history": true`` to include orders moved to the archive.
+    """
     try:
         data = json.loads(request.body)
-        auth_token = data.get("authToken")
+        auth_token, client = await aauthenticate_client(request, data)
         if not auth_token:
             return JsonResponse({"error": "authToken is required"}, status=400)
-
-        try:
-            client = Client.objects.get(authToken=auth_token)
-        except Exception:
+        if client is None:
             return JsonResponse({"error": "Invalid authentication token"}, status=401)
 
-        orders = Order.objects.filter(client=client).order_by("-created_at")
+        # depth=1 nests the vehicle; join it instead of one query per order
+        orders = Order.objects.filter(client=client).select_related("vehicle").order_by("-created_at")
+        # Load the rows here, from every shard; the serializer then only reads attributes
+        orders = merge_sorted(
+            [[order async for order in orders.using(using)] for using in databases()],
+            key=lambda order: order.created_at,
+            reverse=True,
+        )
         serializer = OrderSerializer(orders, many=True)
         # Need to convert serializer.data to JSON-serializable format
         orders_data = []
         for order in serializer.data:
             orders_data.append(order)
+
+        if data.get("full_history"):
+            archived_orders = (
+                ArchivedOrder.objects.filter(client=client).select_related("vehicle").order_by("-created_at")
+            )
+            archived = [order for using in databases() async for order in archived_orders.using(using)]
+            orders_data.extend(ArchivedOrderSerializer(archived, many=True).data)
+            orders_data.sort(key=lambda order: order["created_at"], reverse=True)
+
         return JsonResponse({"orders": orders_data}, safe=False)
 
     except json.JSONDecodeError:
@@ -128,23 +206,207 @@ def list_user_orders(request):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+ORDER_SUMMARY_FIELDS = [
+    "order_id",
+    "vehicle_id",
+    "owner_id",
+    "vehicle_name",
+    "vehicle_number",
+    "vehicle_thumbnail",
+    "agreed_price",
+    "security_deposit",
+    "pickup_datetime",
+    "return_datetime",
+    "order_status",
+    "payment_status",
+    "created_at",
+]
+
+
+async def _serialize_order_summaries(queryset):
+    summaries = [s async for s in queryset.values(*ORDER_SUMMARY_FIELDS)]
+    for s in summaries:
+        s["order_id"] = str(s["order_id"])
+        s["vehicle_id"] = str(s["vehicle_id"])
+        s["owner_id"] = str(s["owner_id"]) if s["owner_id"] else None
+        s["agreed_price"] = float(s["agreed_price"])
+        s["security_deposit"] = float(s["security_deposit"])
+        s["pickup_datetime"] = s["pickup_datetime"].isoformat()
+        s["return_datetime"] = s["return_datetime"].isoformat()
+        s["created_at"] = s["created_at"].isoformat()
+    return summaries
+
+
+@csrf_exempt
+@require_POST
+@read_from_replica
+async def order_history(request):
+    """Order history for the authenticated user, read from the OrderSummary read-model"""
+    try:
+        data = json.loads(request.body)
+        auth_token, client = await aauthenticate_client(request, data)
+        if not auth_token:
+            return JsonResponse({"error": "authToken is required"}, status=400)
+        if client is None:
+            return JsonResponse({"error": "Invalid authentication token"}, status=401)
+
+        orders = OrderSummary.objects.filter(client=client).order_by("-created_at")
+        return JsonResponse({"orders": await _serialize_order_summaries(orders)})
+
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+async def _astaff_error(request, perm):
+    """
+    Error response unless an admin user with ``perm`` is logged in. Renters
+    have no login of their own; their data is for the staff managing them.
+    """
+    user = await request.auser()
+    if not (user.is_active and user.is_staff):
+        return JsonResponse({"error": "Admin login required"}, status=401)
+    if not await sync_to_async(user.has_perm)(perm):
+        return JsonResponse({"error": "Permission denied"}, status=403)
+    return None
+
+
+@csrf_exempt
+@require_POST
+@read_from_replica
+async def renter_orders(request):
+    """Orders placed on a renter's vehicles, read from the OrderSummary read-model; for admin users"""
+    try:
+        if error := await _astaff_error(request, "business.view_ordersummary"):
+            return error
+        data = json.loads(request.body)
+        renter_id = data.get("renter_id")
+        if not renter_id:
+            return JsonResponse({"error": "renter_id is required"}, status=400)
+
+        orders = OrderSummary.objects.filter(owner_id=renter_id).order_by("-created_at")
+        return JsonResponse({"orders": await _serialize_order_summaries(orders)})
+
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+async def _acount_fleet(renter_id):
+    if len(databases()) == 1:
+        return await Vehicle.objects.filter(owner__user_id=renter_id).acount()
+    # Renters stay on the primary, so shards can't join them
+    owner = await Renter.objects.filter(user_id=renter_id).values_list("pk", flat=True).afirst()
+    if owner is None:
+        return 0
+    return sum([await Vehicle.objects.using(using).filter(owner_id=owner).acount() for using in databases()])
+
+
 @csrf_exempt
 @require_POST
-def create_booking(request):
+@read_from_replica
+async def renter_dashboard(request):
+    """Daily earnings, bookings and fleet utilization of a renter for one month; for admin users"""
+    try:
+        if error := await _astaff_error(request, "business.view_renterdailyrollup"):
+            return error
+        data = json.loads(request.body)
+        renter_id = data.get("renter_id")
+        if not renter_id:
+            return JsonResponse({"error": "renter_id is required"}, status=400)
+        try:
+            renter_id = str(uuid.UUID(str(renter_id)))
+        except ValueError:
+            return JsonResponse({"error": "Invalid renter_id"}, status=400)
+
+        try:
+            fleet_size = await _acount_fleet(renter_id)
+            dashboard = await sync_to_async(month_view)(
+                RenterDailyRollup,
+                data.get("month"),
+                capacity=fleet_size,
+                owner_id=renter_id,
+            )
+        except ValueError:
+            return JsonResponse({"error": "Invalid month. Use YYYY-MM"}, status=400)
+
+        return JsonResponse({"renter_id": renter_id, "fleet_size": fleet_size, **dashboard})
+
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+@csrf_exempt
+@require_POST
+@read_from_replica
+async def vehicle_dashboard(request):
+    """Daily revenue, bookings and utilization of a vehicle for one month; for admin users"""
+    try:
+        if error := await _astaff_error(request, "business.view_vehicledailyrollup"):
+            return error
+        data = json.loads(request.body)
+        vehicle_id = data.get("vehicle_id")
+        if not vehicle_id:
+            return JsonResponse({"error": "vehicle_id is required"}, status=400)
+        try:
+            vehicle_id = str(uuid.UUID(str(vehicle_id)))
+        except ValueError:
+            return JsonResponse({"error": "Invalid vehicle_id"}, status=400)
+
+        try:
+            dashboard = await sync_to_async(month_view)(
+                VehicleDailyRollup, data.get("month"), vehicle_id=vehicle_id
+            )
+        except ValueError:
+            return JsonResponse({"error": "Invalid month. Use YYYY-MM"}, status=400)
+
+        return JsonResponse({"vehicle_id": vehicle_id, **dashboard})
+
+    except json.JSONDecodeError:
+        return JsonResponse({"error": "Invalid JSON"}, status=400)
+    except Exception as e:
+        return JsonResponse({"error": str(e)}, status=500)
+
+
+def _save_booking(serializer, client, vehicle, otp):
+    # Order and its read-model row are written together; atomic() has no async form.
+    # The order goes next to its vehicle, possibly on a shard.
+    with transaction.atomic(), atomic_on(vehicle._state.db):
+        order = serializer.save(
+            client=client,
+            vehicle=vehicle,
+            rental_amount=vehicle.price_per_day,
+            security_deposit=vehicle.security_deposit,
+            otp=otp,
+        )
+        summary = write_order_summary(order)
+        record_order_event(
+            order, OrderEvent.EventTypes.CREATED, owner_id=summary.owner_id
+        )
+    return order
+
+
+@csrf_exempt
+@require_POST
+async def create_booking(request):
     """Create new booking with OTP verification"""
     try:
         data = json.loads(request.body)
-        auth_token = data.get("authToken")
-        print("Received data:", data)  # Debug what you're receiving
+        auth_token, client = await aauthenticate_client(request, data)
 
         vehicle_id = data.get("vehicle_id")
-        print("Vehicle ID received:", vehicle_id, type(vehicle_id))  # Debug type
 
         try:
-            vehicle = Vehicle.objects.get(id=vehicle_id)
-            print("Found vehicle:", vehicle)  # Debug if found
+            using = await avehicle_shard(vehicle_id)
+            vehicles = Vehicle.objects.using(using)
+            if not is_shard(using):
+                vehicles = vehicles.select_related("owner")
+            vehicle = await vehicles.aget(id=vehicle_id)
         except Vehicle.DoesNotExist:
-            print(f"No vehicle found with ID: {vehicle_id}")  # Debug
             return JsonResponse(
                 {"error": f"Vehicle with ID {vehicle_id} not found"}, status=404
             )
@@ -154,11 +416,10 @@ def create_booking(request):
         if not vehicle_id:
             return JsonResponse({"error": "vehicle_id is required"}, status=400)
 
-        try:
-            client = Client.objects.get(authToken=auth_token)
-            vehicle = Vehicle.objects.get(id=vehicle_id)  # Now vehicle_id is defined
+        if client is None:
+            return JsonResponse({"error": "Invalid authToken"}, status=401)
 
-            # Rest of your existing code...
+        try:
             pickup = data.get("pickup_datetime")
             return_dt = data.get("return_datetime")
 
@@ -169,12 +430,12 @@ def create_booking(request):
                 )
 
             # Check for overlapping bookings
-            overlapping = Order.objects.filter(
+            overlapping = await Order.objects.using(using).filter(
                 vehicle=vehicle,
                 pickup_datetime__lt=return_dt,
                 return_datetime__gt=pickup,
                 order_status__in=["upcoming", "ongoing"],
-            ).exists()
+            ).aexists()
 
             if overlapping:
                 return JsonResponse(
@@ -182,21 +443,14 @@ def create_booking(request):
                     status=400,
                 )
 
-            # Create order
+            # Create order (validation looks the vehicle up through the sync ORM)
             serializer = CreateOrderSerializer(data=data)
-            if serializer.is_valid():
+            if await sync_to_async(serializer.is_valid)():
                 # Generate OTP (6-digit number)
                 otp = str(random.randint(100000, 999999))
 
-                order = serializer.save(
-                    client=client,
-                    vehicle=vehicle,
-                    rental_amount=vehicle.price_per_day,
-                    security_deposit=vehicle.security_deposit,
-                    otp=otp,
-                )
-
-                print(f"OTP for order {order.id}: {otp}")  # For testing
+                order = await sync_to_async(_save_booking)(serializer, client, vehicle, otp)
+                await apin_primary(auth_token)
 
                 return JsonResponse(
                     {
@@ -209,8 +463,6 @@ def create_booking(request):
                 )
             return JsonResponse(serializer.errors, status=400)
 
-        except Client.DoesNotExist:
-            return JsonResponse({"error": "Invalid authToken"}, status=401)
         except Vehicle.DoesNotExist:
             return JsonResponse({"error": "Vehicle not found"}, status=404)
 
@@ -220,7 +472,8 @@ def create_booking(request):
 
 @csrf_exempt
 @require_POST
-def check_availability(request):
+@read_from_replica
+async def check_availability(request):
     """Check vehicle availability for given dates"""
     try:
         data = json.loads(request.body)
@@ -249,15 +502,16 @@ def check_availability(request):
                     status=400,
                 )
 
-            vehicle = Vehicle.objects.get(id=vehicle_id)
+            using = await avehicle_shard(vehicle_id)
+            vehicle = await Vehicle.objects.using(using).aget(id=vehicle_id)
 
             # Check for overlapping bookings
-            overlapping = Order.objects.filter(
+            overlapping = await Order.objects.using(using).filter(
                 vehicle=vehicle,
                 pickup_datetime__lt=return_dt_dt,
                 return_datetime__gt=pickup_dt,
                 order_status__in=["upcoming", "ongoing"],
-            ).exists()
+            ).aexists()
 
             return JsonResponse(
                 {
@@ -292,7 +546,8 @@ def check_availability(request):
 
 @require_POST
 @csrf_exempt
-def availability_calendar(request):
+@read_from_replica
+async def availability_calendar(request):
     """Get availability calendar for a vehicle"""
     try:
         if request.method == "POST":
@@ -305,7 +560,8 @@ def availability_calendar(request):
             return JsonResponse({"error": "vehicle_id is required"}, status=400)
 
         try:
-            vehicle = Vehicle.objects.get(id=vehicle_id)
+            using = await avehicle_shard(vehicle_id)
+            vehicle = await Vehicle.objects.using(using).aget(id=vehicle_id)
 
             # Optionally get date range from request
             start_date = datetime.now().date()
@@ -327,7 +583,7 @@ def availability_calendar(request):
                         {"error": f"Invalid date format or range: {str(e)}"}, status=400
                     )
 
-            bookings = Order.objects.filter(
+            bookings = Order.objects.using(using).filter(
                 vehicle=vehicle,
                 return_datetime__gte=start_date,
                 pickup_datetime__lte=end_date,
@@ -335,7 +591,7 @@ def availability_calendar(request):
             ).values("pickup_datetime", "return_datetime")
 
             calendar = []
-            for booking in bookings:
+            async for booking in bookings:
                 calendar.append(
                     {
                         "start": booking["pickup_datetime"].isoformat(),
@@ -368,9 +624,33 @@ def availability_calendar(request):
         return JsonResponse({"error": str(e)}, status=500)
 
 
+def _save_cancellation(order):
+    with transaction.atomic(), atomic_on(order._state.db):
+        order.save()
+        sync_order_summary_status(order)
+        owner = order.vehicle.owner
+        record_order_event(
+            order,
+            OrderEvent.EventTypes.CANCELLED,
+            owner_id=owner.user_id if owner else None,
+        )
+
+
+async def _afind_order(**filters):
+    """The order matching ``filters``, from whichever database holds it."""
+    for using in databases():
+        # Shards can't join the owner, which is then loaded from the primary
+        related = "vehicle" if is_shard(using) else "vehicle__owner"
+        try:
+            return await Order.objects.using(using).select_related(related).aget(**filters)
+        except Order.DoesNotExist:
+            pass
+    raise Order.DoesNotExist
+
+
 @csrf_exempt
 @require_POST
-def cancel_order(request):
+async def cancel_order(request):
     """Cancel an existing order"""
     try:
         try:
@@ -378,17 +658,18 @@ def cancel_order(request):
         except json.JSONDecodeError:
             return JsonResponse({"error": "Invalid JSON payload"}, status=400)
 
-        auth_token = data.get("authToken")
+        auth_token, client = await aauthenticate_client(request, data)
         order_id = data.get("order_id")
 
         if not all([auth_token, order_id]):
             return JsonResponse(
                 {"error": "Both authToken and order_id are required"}, status=400
             )
+        if client is None:
+            return JsonResponse({"error": "Invalid authToken"}, status=401)
 
         try:
-            client = Client.objects.get(authToken=auth_token)
-            order = Order.objects.get(id=order_id, client=client)
+            order = await _afind_order(id=order_id, client=client)
 
             # Get current time in timezone-aware format
             now = timezone.now()
@@ -409,7 +690,8 @@ def cancel_order(request):
                 )
 
             order.order_status = "cancelled"
-            order.save()
+            await sync_to_async(_save_cancellation)(order)
+            await apin_primary(auth_token)
 
             return JsonResponse(
                 {
@@ -421,8 +703,6 @@ def cancel_order(request):
                 }
             )
 
-        except Client.DoesNotExist:
-            return JsonResponse({"error": "Invalid authToken"}, status=401)
         except Order.DoesNotExist:
             return JsonResponse({"error": "Order not found"}, status=404)
 
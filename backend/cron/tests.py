@@ -1 +1,35 @@
+from unittest import mock
 
+from django.db import OperationalError, connections
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+
+
+class ReadinessTests(SimpleTestCase):
+    databases = {"default"}
+
+    @override_settings(READINESS_CHECK_TTL=0, METRICS_TOKEN="s3cret")
+    def test_failure_is_logged_not_returned(self):
+        error = OperationalError('connection to server at "db.internal" (10.0.0.7), port 5432 failed')
+        with mock.patch.object(connections["default"], "ensure_connection", side_effect=error), self.assertLogs(
+            "cron.views", "ERROR"
+        ) as logs:
+            for url in (reverse("readyz"), reverse("readyz") + "?deep=1"):
+                response = self.client.get(url, headers={"Authorization": "Bearer s3cret"})
+                self.assertEqual(response.status_code, 503)
+                self.assertNotIn("db.internal", response.content.decode())
+                self.assertFalse(response.json()["databases"]["default"]["ok"])
+        self.assertIn("db.internal", "\n".join(logs.output))
+
+    @override_settings(METRICS_TOKEN="s3cret", METRICS_ALLOWED_NETWORKS=["127.0.0.1"])
+    def test_deep_check_needs_the_metrics_token(self):
+        with mock.patch.object(connections["default"], "ensure_connection") as ensure_connection:
+            response = self.client.get(reverse("readyz") + "?deep=1", headers={"X-Forwarded-For": "203.0.113.5"})
+        self.assertEqual(response.status_code, 401)
+        self.assertNotIn("databases", response.json())
+        ensure_connection.assert_not_called()
+
+        # Only the default database may be queried here; other aliases report a failure
+        response = self.client.get(reverse("readyz") + "?deep=1", headers={"Authorization": "Bearer s3cret"})
+        default = response.json()["databases"]["default"]
+        self.assertEqual((default["ok"], default["vendor"]), (True, connections["default"].vendor))
@@ -1,23 +1,98 @@
-from django.shortcuts import  HttpResponse
-from .models import c
+import logging
+import threading
 import time
 
+from django.conf import settings
+from django.db import connections
+from django.http import JsonResponse
+from django.shortcuts import HttpResponse
 
-    
+from monitoring.views import is_trusted_scraper
+
+logger = logging.getLogger(__name__)
+
+# Last readiness result (checked_at, ok, databases), shared by the threads of this process
+_readiness = None
+_readiness_lock = threading.Lock()
 
 
 def cron(request):
+    # Keep-alive ping: answering at all is the point, so touch nothing
     if request.method == "GET":
-        
-        t = time.time()
-        if c.objects.exists():
-            obj = c.objects.first()
-            obj.flag = t
-            obj.save()
-        else:
-            new = c(flag=t)
-            new.save()
-
-        return HttpResponse(f"Woke up today at {t}")
+        return HttpResponse(f"Woke up today at {time.time()}")
     else:
         return HttpResponse("Invalid request")
+
+
+def healthz(request):
+    """Liveness: the process is up and serving requests. No I/O."""
+    return JsonResponse({"status": "ok"})
+
+
+def _check_database(alias, deep=False):
+    connection = connections[alias]
+    started = time.perf_counter()
+    try:
+        connection.ensure_connection()
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+            cursor.fetchone()
+    except Exception:
+        # Logged, not returned: the message can name hosts and users of the DSN
+        logger.exception("Readiness check of database %r failed", alias)
+        result = {"ok": False}
+    else:
+        result = {"ok": True}
+    result["latency_ms"] = round((time.perf_counter() - started) * 1000, 2)
+
+    if deep:
+        result["vendor"] = connection.vendor
+        result["conn_max_age"] = connection.settings_dict.get("CONN_MAX_AGE")
+        if connection.close_at is not None:
+            result["recycled_in_s"] = round(connection.close_at - time.monotonic(), 1)
+        pool = getattr(connection, "pool", None)
+        result["pool"] = pool.get_stats() if pool is not None else None
+    return result
+
+
+def _check_databases(deep=False):
+    databases = {alias: _check_database(alias, deep) for alias in connections}
+    return all(db["ok"] for db in databases.values()), databases
+
+
+def readyz(request):
+    """
+    Readiness: the database answers a ``SELECT 1``. The result is reused for
+    READINESS_CHECK_TTL seconds, so frequent probes mostly cost nothing; while
+    one thread rechecks, the others answer from the previous result.
+    ``?deep=1`` always checks and adds connection/pool state; like /metrics
+    it answers only METRICS_TOKEN holders and METRICS_ALLOWED_NETWORKS.
+    """
+    if request.GET.get("deep"):
+        if not is_trusted_scraper(request):
+            return JsonResponse({"error": "Invalid metrics token"}, status=401)
+        ok, databases = _check_databases(deep=True)
+        return JsonResponse(
+            {"status": "ok" if ok else "unavailable", "databases": databases},
+            status=200 if ok else 503,
+        )
+
+    global _readiness
+    last = _readiness
+    stale = last is None or time.monotonic() - last[0] >= settings.READINESS_CHECK_TTL
+    if stale and _readiness_lock.acquire(blocking=last is None):
+        try:
+            ok, databases = _check_databases()
+            _readiness = last = (time.monotonic(), ok, databases)
+        finally:
+            _readiness_lock.release()
+
+    checked_at, ok, databases = last
+    return JsonResponse(
+        {
+            "status": "ok" if ok else "unavailable",
+            "checked_s_ago": round(time.monotonic() - checked_at, 2),
+            "databases": databases,
+        },
+        status=200 if ok else 503,
+    )
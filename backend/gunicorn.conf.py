@@ -0,0 +1,71 @@
+"""
+Gunicorn settings, picked up automatically by ``gunicorn backend.wsgi``
+when started from this directory.
+
+The app is preloaded in the master so Django, the models, every view and
+the compiled templates are imported once and shared copy-on-write by all
+workers; each worker then connects to the database before taking traffic.
+
+To serve the async views natively, run the ASGI app on uvicorn workers:
+
+    GUNICORN_WORKER_CLASS=uvicorn_worker.UvicornWorker CONN_MAX_AGE=0 \
+        gunicorn backend.asgi:application
+
+Persistent connections are per thread and async requests run their ORM
+calls on short-lived threads, so keep CONN_MAX_AGE at 0 there, or set
+DB_POOL to share pooled connections between those threads.
+"""
+import glob
+import multiprocessing
+import os
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.getenv("GUNICORN_WORKER_CLASS", "sync")
+threads = int(os.getenv("GUNICORN_THREADS", "1"))
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+preload_app = True
+
+
+def on_starting(server):
+    # Samples left by workers of a previous run would be merged into /metrics
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(multiproc_dir, "*.db")):
+            os.remove(path)
+
+
+def when_ready(server):
+    from backend.warmup import warm_up
+
+    timings = warm_up(connect=False)
+    server.log.info("Master warmed up: %s", _format(timings))
+
+
+def pre_fork(server, worker):
+    from django.db import connections
+
+    # A connection or pool opened while preloading must never be shared with a child
+    connections.close_all()
+    for connection in connections.all(initialized_only=True):
+        if hasattr(connection, "close_pool"):  # PostgreSQL; a no-op without DB_POOL
+            connection.close_pool()
+
+
+def post_worker_init(worker):
+    from backend.warmup import warm_up
+
+    timings = warm_up()
+    worker.log.info("Worker %s warmed up: %s", worker.pid, _format(timings))
+
+
+def child_exit(server, worker):
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        multiprocess.mark_process_dead(worker.pid)
+
+
+def _format(timings):
+    return ", ".join(f"{name} {seconds * 1000:.0f}ms" for name, seconds in timings.items())
@@ -0,0 +1,97 @@
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib import admin
+from django.http import FileResponse, Http404
+from django.urls import path, reverse
+from django.utils.html import format_html
+
+from monitoring.models import ProfileRecord, SlowQuery
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    search_fields = ['sql', 'view', 'fingerprint']
+    list_filter = ['database', 'view']
+    date_hierarchy = 'last_seen'
+    list_display = ['short_sql', 'view', 'calls', 'total_ms', 'avg_ms_display', 'max_ms', 'last_seen']
+    fields = [
+        'fingerprint', 'view', 'database', 'calls', 'total_ms', 'max_ms',
+        'first_seen', 'last_seen', 'sql_display', 'plan_display', 'explained_at',
+    ]
+    readonly_fields = fields
+
+    @admin.display(description='SQL')
+    def short_sql(self, obj):
+        return obj.sql[:120]
+
+    @admin.display(description='Avg ms')
+    def avg_ms_display(self, obj):
+        return round(obj.avg_ms, 1)
+
+    @admin.display(description='SQL')
+    def sql_display(self, obj):
+        return format_html('<pre style="white-space: pre-wrap">{}</pre>', obj.sql)
+
+    @admin.display(description='Explain plan')
+    def plan_display(self, obj):
+        return format_html('<pre>{}</pre>', obj.explain_plan or '-')
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(ProfileRecord)
+class ProfileRecordAdmin(admin.ModelAdmin):
+    search_fields = ['path', 'view', 'requested_by']
+    list_filter = ['view', 'status_code']
+    date_hierarchy = 'created_at'
+    list_display = ['created_at', 'method', 'path', 'view', 'status_code', 'duration_ms', 'peak_memory_kb', 'download_link']
+    fields = [
+        'created_at', 'method', 'path', 'view', 'requested_by', 'status_code',
+        'duration_ms', 'peak_memory_kb', 'download_link', 'functions_display', 'allocations_display',
+    ]
+    readonly_fields = fields
+
+    def get_urls(self):
+        return [
+            path(
+                '<int:pk>/download/',
+                self.admin_site.admin_view(self.download_view),
+                name='monitoring_profilerecord_download',
+            ),
+        ] + super().get_urls()
+
+    def download_view(self, request, pk):
+        """The raw pstats dump, for snakeviz or ``python -m pstats``"""
+        if not self.has_view_permission(request):
+            raise Http404
+        record = self.get_object(request, pk)
+        if record is None:
+            raise Http404
+        file_path = Path(settings.PROFILING_DIR) / Path(record.profile_file).name
+        if not file_path.exists():
+            raise Http404("Profile file no longer exists")
+        return FileResponse(open(file_path, 'rb'), as_attachment=True, filename=f'profile-{record.pk}.prof')
+
+    @admin.display(description='Profile')
+    def download_link(self, obj):
+        url = reverse('admin:monitoring_profilerecord_download', args=[obj.pk])
+        return format_html('<a href="{}">.prof</a>', url)
+
+    @admin.display(description='Top functions (cumulative)')
+    def functions_display(self, obj):
+        return format_html('<pre>{}</pre>', obj.top_functions)
+
+    @admin.display(description='Top allocations')
+    def allocations_display(self, obj):
+        return format_html('<pre>{}</pre>', obj.top_allocations)
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
@@ -0,0 +1,115 @@
+"""
+Per-endpoint performance budgets for the test suite.
+
+A test case mixes in ``BudgetTestMixin``, declares ``budgets`` (URL name to
+``Budget``) and sends its requests through ``request_within_budget``. The
+request fails the test when it runs more SQL statements than budgeted,
+returns a bigger body or takes longer than allowed. A query overrun is
+reported as a diff between "every distinct statement once" and what actually
+ran, so repeated (N+1) statements show up as added lines.
+"""
+import difflib
+import json
+import re
+from collections import Counter
+from time import perf_counter
+from typing import NamedTuple
+
+from django.conf import settings
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from monitoring.slow_queries import normalize_sql
+
+# Statements the test transaction adds around atomic() blocks; they do not
+# reach the database in production
+_TEST_TRANSACTION_PREFIXES = ("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")
+_SELECT_LIST_RE = re.compile(r"^SELECT (?:DISTINCT )?.+? FROM ")
+
+
+class Budget(NamedTuple):
+    """Upper bounds for one request to an endpoint"""
+
+    queries: int
+    max_bytes: int = 16 * 1024
+    max_ms: float = 250.0
+
+
+def _statements(captured):
+    # Column lists only make the report harder to read
+    return [
+        _SELECT_LIST_RE.sub("SELECT ... FROM ", normalize_sql(query["sql"]))
+        for query in captured
+        if not query["sql"].startswith(_TEST_TRANSACTION_PREFIXES)
+    ]
+
+
+def query_diff(statements):
+    """Unified diff of ``statements`` against each distinct one running once."""
+    distinct = list(dict.fromkeys(statements))
+    counts = Counter(statements)
+    lines = list(
+        difflib.unified_diff(distinct, statements, "each statement once", "executed", lineterm="", n=1)
+    )
+    repeated = [f"  {count}x {sql}" for sql, count in counts.most_common() if count > 1]
+    if repeated:
+        lines += ["", "Repeated statements:", *repeated]
+    else:
+        lines = ["No statement repeated; executed:", *(f"  {sql}" for sql in statements)]
+    return "\n".join(lines)
+
+
+class BudgetTestMixin:
+    """
+    Mixin for ``django.test`` test cases. ``budgets`` maps URL names to
+    Budget; wall-time limits are multiplied by settings.PERF_BUDGET_TIME_SCALE.
+    """
+
+    budgets = {}
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        from backend.warmup import warm_up
+
+        # Import the views up front so the first timed request does not pay for it
+        warm_up(connect=False)
+
+    def assertBudgetsCover(self, urlpatterns):
+        names = {pattern.name for pattern in urlpatterns if pattern.name}
+        self.assertEqual(names - set(self.budgets), set(), "Endpoints without a budget")
+
+    def request_within_budget(self, name, payload=None, token=None, method="post", using="default"):
+        """
+        Send ``payload`` to the named URL (as the query string for GET, as a
+        JSON body otherwise), check its budget and return the response.
+        """
+        budget = self.budgets[name]
+        headers = {"HTTP_AUTHORIZATION": f"Token {token}"} if token else {}
+        if method == "get":
+            send = lambda: self.client.get(reverse(name), payload, **headers)
+        else:
+            send = lambda: getattr(self.client, method)(
+                reverse(name), json.dumps(payload or {}), content_type="application/json", **headers
+            )
+
+        if self.client.handler._middleware_chain is None:
+            # A fresh test client builds the middleware chain on its first request
+            self.client.handler.load_middleware()
+
+        with CaptureQueriesContext(connections[using]) as captured:
+            started = perf_counter()
+            response = send()
+            elapsed_ms = (perf_counter() - started) * 1000
+
+        statements = _statements(captured.captured_queries)
+        if len(statements) > budget.queries:
+            self.fail(
+                f"{name} ran {len(statements)} queries, budget is {budget.queries}:\n{query_diff(statements)}"
+            )
+        size = len(response.content)
+        self.assertLessEqual(size, budget.max_bytes, f"{name} returned {size} bytes, budget is {budget.max_bytes}")
+        max_ms = budget.max_ms * settings.PERF_BUDGET_TIME_SCALE
+        self.assertLessEqual(elapsed_ms, max_ms, f"{name} took {elapsed_ms:.1f}ms, budget is {max_ms:.0f}ms")
+        return response
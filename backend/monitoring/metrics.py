@@ -0,0 +1,102 @@
+"""
+Request metrics in Prometheus format.
+
+With PROMETHEUS_MULTIPROC_DIR set (before this module is imported) every
+gunicorn worker writes its samples to mmapped files in that directory and
+``/metrics`` merges them, so a scrape sees the whole instance rather than
+whichever worker answered it.
+"""
+import os
+import threading
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Histogram,
+    generate_latest,
+)
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+SQL_TIME_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5)
+
+REQUEST_LATENCY = Histogram(
+    "http_request_duration_seconds",
+    "Time from the first middleware seeing the request to the response leaving it.",
+    ["view", "method"],
+    buckets=LATENCY_BUCKETS,
+)
+RESPONSE_SIZE = Histogram(
+    "http_response_size_bytes",
+    "Response body size; streaming responses are not counted.",
+    ["view"],
+    buckets=SIZE_BUCKETS,
+)
+RESPONSES = Counter(
+    "http_responses",
+    "Responses by status code.",
+    ["view", "status"],
+)
+REQUEST_QUERIES = Histogram(
+    "http_request_queries",
+    "SQL queries executed per request.",
+    ["view"],
+    buckets=QUERY_COUNT_BUCKETS,
+)
+REQUEST_SQL_TIME = Histogram(
+    "http_request_sql_duration_seconds",
+    "Time spent executing SQL per request.",
+    ["view"],
+    buckets=SQL_TIME_BUCKETS,
+)
+
+# Labelled children are looked up once per (view, method) / (view, status)
+_view_series = {}
+_status_series = {}
+_series_lock = threading.Lock()
+
+
+def _series_for(view, method):
+    series = _view_series.get((view, method))
+    if series is None:
+        with _series_lock:
+            series = _view_series[(view, method)] = (
+                REQUEST_LATENCY.labels(view, method),
+                RESPONSE_SIZE.labels(view),
+                REQUEST_QUERIES.labels(view),
+                REQUEST_SQL_TIME.labels(view),
+            )
+    return series
+
+
+def _responses_for(view, status):
+    counter = _status_series.get((view, status))
+    if counter is None:
+        with _series_lock:
+            counter = _status_series[(view, status)] = RESPONSES.labels(view, status)
+    return counter
+
+
+def observe_request(view, method, status, duration, size, queries, sql_time):
+    latency, response_size, query_count, sql_duration = _series_for(view, method)
+    latency.observe(duration)
+    if size is not None:
+        response_size.observe(size)
+    query_count.observe(queries)
+    sql_duration.observe(sql_time)
+    _responses_for(view, status).inc()
+
+
+def exposition():
+    """``(body, content_type)`` for the metrics of this instance."""
+    if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        from prometheus_client import multiprocess
+
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
@@ -0,0 +1,138 @@
+from contextvars import ContextVar
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import slow_queries
+from .metrics import observe_request
+from .profiling import profile_request, wants_profile
+
+KNOWN_METHODS = {"GET", "HEAD", "POST", "PUT", "PATCH", "DELETE", "OPTIONS"}
+
+# QueryTimer of the request being handled. A context variable rather than a
+# per-connection wrapper so that queries an async view runs through
+# sync_to_async (on another thread's connection) are still counted.
+_current_timer = ContextVar("query_timer", default=None)
+
+
+class QueryTimer:
+    """
+    Counts the queries of one request and the time spent in them, and hands
+    queries over SLOW_QUERY_THRESHOLD_MS to the slow-query log.
+    """
+
+    __slots__ = ("count", "seconds", "request", "slow_threshold")
+
+    def __init__(self, request, slow_threshold):
+        self.count = 0
+        self.seconds = 0.0
+        self.request = request
+        self.slow_threshold = slow_threshold
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = perf_counter() - started
+            self.seconds += elapsed
+            self.count += 1
+            if self.slow_threshold and elapsed >= self.slow_threshold and not many:
+                match = self.request.resolver_match
+                slow_queries.recorder.submit(
+                    sql,
+                    params,
+                    elapsed * 1000,
+                    match.view_name if match is not None else "",
+                    context["connection"].alias,
+                )
+
+
+def timed_execute(execute, sql, params, many, context):
+    timer = _current_timer.get()
+    if timer is None:
+        return execute(sql, params, many, context)
+    return timer(execute, sql, params, many, context)
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """
+    ``connection_created`` receiver adding ``timed_execute`` to every new
+    connection. It goes first in ``execute_wrappers`` so that the
+    ``execute_wrapper()`` context manager, which pops the last entry, never
+    removes it.
+    """
+    if timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, timed_execute)
+
+
+class MetricsMiddleware:
+    """
+    Record latency, response size, status and SQL count/time per URL name.
+    Goes first in MIDDLEWARE so the latency covers the whole stack. Runs in
+    whichever mode (sync or async) the rest of the stack uses.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.slow_threshold = settings.SLOW_QUERY_THRESHOLD_MS / 1000
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        started = perf_counter()
+        timer = QueryTimer(request, self.slow_threshold)
+        token = _current_timer.set(timer)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        self._observe(request, response, perf_counter() - started, timer)
+        return response
+
+    async def __acall__(self, request):
+        started = perf_counter()
+        timer = QueryTimer(request, self.slow_threshold)
+        token = _current_timer.set(timer)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current_timer.reset(token)
+        self._observe(request, response, perf_counter() - started, timer)
+        return response
+
+    def _observe(self, request, response, duration, timer):
+        match = request.resolver_match
+        view = match.view_name if match is not None else "<unresolved>"
+        method = request.method if request.method in KNOWN_METHODS else "OTHER"
+        size = None if response.streaming else len(response.content)
+        observe_request(
+            view, method, response.status_code, duration, size, timer.count, timer.seconds
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Profile requests that a staff user marks with ``X-Profile: 1`` or
+    ``?_profile=1`` (see monitoring/profiling.py). Removed from the stack at
+    startup unless PROFILING_ENABLED, so it costs nothing when off.
+    Must come after AuthenticationMiddleware. Sync only: under ASGI Django
+    runs it in a thread, so leave it disabled outside profiling sessions.
+    """
+
+    def __init__(self, get_response):
+        if not settings.PROFILING_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if wants_profile(request):
+            return profile_request(request, self.get_response)
+        return self.get_response(request)
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.1 on 2025-06-02 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(help_text='SHA-1 of the normalized SQL.', max_length=40, unique=True)),
+                ('sql', models.TextField(help_text="SQL with literals and parameters replaced by '?'.")),
+                ('view', models.CharField(blank=True, help_text='URL name of the view that last ran it slowly.', max_length=200)),
+                ('database', models.CharField(help_text='Database alias the query ran on.', max_length=50)),
+                ('calls', models.PositiveBigIntegerField(default=0, help_text='Slow executions recorded.')),
+                ('total_ms', models.FloatField(default=0, help_text='Summed duration of the slow executions.')),
+                ('max_ms', models.FloatField(default=0, help_text='Longest slow execution.')),
+                ('first_seen', models.DateTimeField(auto_now_add=True)),
+                ('last_seen', models.DateTimeField(help_text='Time of the latest slow execution.')),
+                ('explain_plan', models.TextField(blank=True, help_text='Latest sampled EXPLAIN output.')),
+                ('explained_at', models.DateTimeField(blank=True, help_text='When explain_plan was captured.', null=True)),
+            ],
+            options={
+                'verbose_name': 'Slow Query',
+                'verbose_name_plural': 'Slow Queries',
+                'ordering': ['-total_ms'],
+            },
+        ),
+    ]
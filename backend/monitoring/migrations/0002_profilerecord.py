@@ -0,0 +1,35 @@
+# Generated by Django 5.2.1 on 2025-06-02 10:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('monitoring', '0001_slowquery'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ProfileRecord',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('path', models.CharField(help_text='Request path.', max_length=500)),
+                ('method', models.CharField(max_length=10)),
+                ('view', models.CharField(blank=True, help_text='URL name of the profiled view.', max_length=200)),
+                ('requested_by', models.CharField(help_text='Username of the staff user who asked for the profile.', max_length=150)),
+                ('status_code', models.PositiveSmallIntegerField()),
+                ('duration_ms', models.FloatField(help_text='Wall time of the request while being profiled.')),
+                ('profile_file', models.CharField(help_text='pstats file name inside PROFILING_DIR.', max_length=255)),
+                ('top_functions', models.TextField(help_text='Functions with the highest cumulative time.')),
+                ('top_allocations', models.TextField(help_text='Source lines that allocated the most memory during the request.')),
+                ('peak_memory_kb', models.PositiveIntegerField(help_text='Peak traced memory while the request ran.')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Request Profile',
+                'verbose_name_plural': 'Request Profiles',
+                'ordering': ['-created_at'],
+            },
+        ),
+    ]
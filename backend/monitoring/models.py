@@ -0,0 +1,55 @@
+from django.db import models
+
+
+class SlowQuery(models.Model):
+    """
+    Queries that ran longer than SLOW_QUERY_THRESHOLD_MS, aggregated by normalized SQL fingerprint
+    """
+    fingerprint = models.CharField(max_length=40, unique=True, help_text="SHA-1 of the normalized SQL.")
+    sql = models.TextField(help_text="SQL with literals and parameters replaced by '?'.")
+    view = models.CharField(max_length=200, blank=True, help_text="URL name of the view that last ran it slowly.")
+    database = models.CharField(max_length=50, help_text="Database alias the query ran on.")
+    calls = models.PositiveBigIntegerField(default=0, help_text="Slow executions recorded.")
+    total_ms = models.FloatField(default=0, help_text="Summed duration of the slow executions.")
+    max_ms = models.FloatField(default=0, help_text="Longest slow execution.")
+    first_seen = models.DateTimeField(auto_now_add=True)
+    last_seen = models.DateTimeField(help_text="Time of the latest slow execution.")
+    explain_plan = models.TextField(blank=True, help_text="Latest sampled EXPLAIN output.")
+    explained_at = models.DateTimeField(null=True, blank=True, help_text="When explain_plan was captured.")
+
+    @property
+    def avg_ms(self):
+        return self.total_ms / self.calls if self.calls else 0
+
+    def __str__(self):
+        return f"{self.fingerprint[:10]} {self.sql[:80]}"
+
+    class Meta:
+        verbose_name = "Slow Query"
+        verbose_name_plural = "Slow Queries"
+        ordering = ["-total_ms"]
+
+
+class ProfileRecord(models.Model):
+    """
+    One request run under cProfile and tracemalloc on a staff user's request (X-Profile header or ?_profile=1)
+    """
+    path = models.CharField(max_length=500, help_text="Request path.")
+    method = models.CharField(max_length=10)
+    view = models.CharField(max_length=200, blank=True, help_text="URL name of the profiled view.")
+    requested_by = models.CharField(max_length=150, help_text="Username of the staff user who asked for the profile.")
+    status_code = models.PositiveSmallIntegerField()
+    duration_ms = models.FloatField(help_text="Wall time of the request while being profiled.")
+    profile_file = models.CharField(max_length=255, help_text="pstats file name inside PROFILING_DIR.")
+    top_functions = models.TextField(help_text="Functions with the highest cumulative time.")
+    top_allocations = models.TextField(help_text="Source lines that allocated the most memory during the request.")
+    peak_memory_kb = models.PositiveIntegerField(help_text="Peak traced memory while the request ran.")
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.method} {self.path} ({self.duration_ms:.0f}ms)"
+
+    class Meta:
+        verbose_name = "Request Profile"
+        verbose_name_plural = "Request Profiles"
+        ordering = ["-created_at"]
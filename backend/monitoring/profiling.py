@@ -0,0 +1,99 @@
+"""
+On-demand profiling of single requests.
+
+A staff user adds ``X-Profile: 1`` or ``?_profile=1`` to a request; it then
+runs under cProfile and tracemalloc, the pstats dump is written to
+PROFILING_DIR and a ProfileRecord with the top functions and allocating
+lines is linked from the admin. Only one request per process is profiled
+at a time; others arriving meanwhile run normally.
+"""
+import cProfile
+import io
+import pstats
+import threading
+import tracemalloc
+import uuid
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+
+TOP_FUNCTIONS = 40
+TOP_ALLOCATIONS = 25
+
+_profiling_lock = threading.Lock()
+
+
+def wants_profile(request):
+    if request.headers.get("X-Profile") != "1" and request.GET.get("_profile") != "1":
+        return False
+    user = getattr(request, "user", None)
+    return bool(user is not None and user.is_active and user.is_staff)
+
+
+def _top_functions(profiler):
+    stream = io.StringIO()
+    pstats.Stats(profiler, stream=stream).sort_stats("cumulative").print_stats(TOP_FUNCTIONS)
+    return stream.getvalue()
+
+
+def _top_allocations(before, after):
+    lines = []
+    for stat in after.compare_to(before, "lineno")[:TOP_ALLOCATIONS]:
+        lines.append(str(stat))
+    return "\n".join(lines)
+
+
+def profile_request(request, get_response):
+    """Run ``get_response`` under the profilers and store a ProfileRecord; returns the response."""
+    from monitoring.models import ProfileRecord
+
+    if "_profile" in request.GET:
+        # Hide the flag from the view (the admin changelist rejects unknown parameters)
+        request.GET = request.GET.copy()
+        del request.GET["_profile"]
+
+    if not _profiling_lock.acquire(blocking=False):
+        return get_response(request)
+    try:
+        started_tracing = not tracemalloc.is_tracing()
+        if started_tracing:
+            tracemalloc.start(settings.PROFILING_TRACEBACK_FRAMES)
+        tracemalloc.reset_peak()
+        before = tracemalloc.take_snapshot()
+
+        profiler = cProfile.Profile()
+        started = perf_counter()
+        profiler.enable()
+        try:
+            response = get_response(request)
+        finally:
+            profiler.disable()
+            duration = perf_counter() - started
+            after = tracemalloc.take_snapshot()
+            _, peak = tracemalloc.get_traced_memory()
+            if started_tracing:
+                tracemalloc.stop()
+
+        profile_dir = Path(settings.PROFILING_DIR)
+        profile_dir.mkdir(parents=True, exist_ok=True)
+        file_name = f"{uuid.uuid4().hex}.prof"
+        profiler.dump_stats(profile_dir / file_name)
+
+        match = request.resolver_match
+        record = ProfileRecord.objects.create(
+            path=request.path[:500],
+            method=request.method,
+            view=match.view_name if match is not None else "",
+            requested_by=request.user.get_username(),
+            status_code=response.status_code,
+            duration_ms=duration * 1000,
+            profile_file=file_name,
+            top_functions=_top_functions(profiler),
+            top_allocations=_top_allocations(before, after),
+            peak_memory_kb=peak // 1024,
+        )
+        response["X-Profile-Id"] = str(record.pk)
+        return response
+    finally:
+        _profiling_lock.release()
@@ -0,0 +1,145 @@
+"""
+Slow-query log.
+
+The request thread only compares a query's duration with the threshold and,
+when it is over, hands ``(sql, params, duration, view, alias)`` to a
+per-process background thread through a bounded queue (dropping samples if
+it is full). That thread fingerprints the SQL, adds the execution to its
+SlowQuery row and, for a sample of executions, captures an EXPLAIN plan on
+its own database connection.
+"""
+import hashlib
+import logging
+import os
+import queue
+import random
+import re
+import threading
+
+from django.conf import settings
+from django.db import IntegrityError, close_old_connections, connections, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_STRING_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_RE = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PARAM_RE = re.compile(r"%s|\?")
+_LIST_RE = re.compile(r"\(\s*\?(?:\s*,\s*\?)*\s*\)")
+_SPACE_RE = re.compile(r"\s+")
+
+
+def normalize_sql(sql):
+    """SQL with literals, parameters and IN-lists collapsed so that equivalent queries compare equal."""
+    sql = _STRING_RE.sub("?", sql)
+    sql = _NUMBER_RE.sub("?", sql)
+    sql = _PARAM_RE.sub("?", sql)
+    sql = _LIST_RE.sub("(...)", sql)
+    return _SPACE_RE.sub(" ", sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()
+
+
+def explain(alias, sql, params):
+    """
+    Plan for a read-only query, run on this thread's connection to ``alias``.
+    PostgreSQL executes it (ANALYZE, BUFFERS) inside a transaction that is
+    always rolled back, with SLOW_QUERY_EXPLAIN_TIMEOUT_MS as statement timeout.
+    """
+    connection = connections[alias]
+    with transaction.atomic(using=alias), connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute(f"SET LOCAL statement_timeout = {int(settings.SLOW_QUERY_EXPLAIN_TIMEOUT_MS)}")
+            cursor.execute(f"EXPLAIN (ANALYZE, BUFFERS) {sql}", params)
+        elif connection.vendor == "sqlite":
+            cursor.execute(f"EXPLAIN QUERY PLAN {sql}", params)
+        else:
+            cursor.execute(f"EXPLAIN {sql}", params)
+        plan = "\n".join(" ".join(str(column) for column in row) for row in cursor.fetchall())
+        transaction.set_rollback(True, using=alias)
+    return plan
+
+
+def record(sql, params, duration_ms, view, alias):
+    """Add one slow execution to its fingerprint's row, sampling an EXPLAIN for SELECTs."""
+    from monitoring.models import SlowQuery
+
+    normalized = normalize_sql(sql)
+    key = fingerprint(normalized)
+    now = timezone.now()
+    changes = {
+        "calls": F("calls") + 1,
+        "total_ms": F("total_ms") + duration_ms,
+        "max_ms": Greatest(F("max_ms"), duration_ms),
+        "last_seen": now,
+        "view": view,
+    }
+    created = False
+    if not SlowQuery.objects.filter(fingerprint=key).update(**changes):
+        try:
+            with transaction.atomic():
+                SlowQuery.objects.create(
+                    fingerprint=key,
+                    sql=normalized,
+                    view=view,
+                    database=alias,
+                    calls=1,
+                    total_ms=duration_ms,
+                    max_ms=duration_ms,
+                    last_seen=now,
+                )
+            created = True
+        except IntegrityError:
+            # Another worker created it first
+            SlowQuery.objects.filter(fingerprint=key).update(**changes)
+
+    is_select = sql.lstrip().lower().startswith(("select", "with"))
+    if is_select and (created or random.random() < settings.SLOW_QUERY_EXPLAIN_SAMPLE_RATE):
+        try:
+            plan = explain(alias, sql, params)
+        except Exception as e:
+            plan = f"EXPLAIN failed: {e}"
+        SlowQuery.objects.filter(fingerprint=key).update(explain_plan=plan, explained_at=timezone.now())
+
+
+class SlowQueryRecorder:
+    def __init__(self):
+        self.pid = None
+        self.queue = None
+        self.lock = threading.Lock()
+
+    def _ensure_thread(self):
+        # One thread per process, started on first use (after any fork)
+        if self.pid == os.getpid():
+            return
+        with self.lock:
+            if self.pid != os.getpid():
+                self.queue = queue.Queue(maxsize=settings.SLOW_QUERY_QUEUE_SIZE)
+                threading.Thread(target=self._run, name="slow-query-log", daemon=True).start()
+                self.pid = os.getpid()
+
+    def submit(self, sql, params, duration_ms, view, alias):
+        logger.warning("Slow query (%.1fms) in %s: %s", duration_ms, view, _SPACE_RE.sub(" ", sql[:500]).strip())
+        self._ensure_thread()
+        try:
+            self.queue.put_nowait((sql, params, duration_ms, view, alias))
+        except queue.Full:
+            pass
+
+    def _run(self):
+        while True:
+            item = self.queue.get()
+            try:
+                record(*item)
+            except Exception:
+                logger.exception("Recording a slow query failed")
+            finally:
+                if self.queue.empty():
+                    close_old_connections()
+
+
+recorder = SlowQueryRecorder()
@@ -0,0 +1,157 @@
+import json
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from prometheus_client import REGISTRY
+
+from authentication.models import Client
+from authentication.passwords import hash_password
+
+from .middleware import ProfilingMiddleware
+from .models import ProfileRecord, SlowQuery
+from .slow_queries import normalize_sql, record
+
+
+class MetricsEndpointTests(TestCase):
+    @override_settings(METRICS_ALLOWED_NETWORKS=["127.0.0.1", "::1"])
+    def test_allowed_network(self):
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b"http_request_duration_seconds", response.content)
+
+    @override_settings(METRICS_ALLOWED_NETWORKS=["127.0.0.1", "::1"], METRICS_TOKEN="s3cret")
+    def test_proxied_request_needs_the_token(self):
+        for header in ("X-Forwarded-For", "X-Real-IP", "Forwarded"):
+            response = self.client.get(reverse("metrics"), headers={header: "203.0.113.5"})
+            self.assertEqual(response.status_code, 401, header)
+        response = self.client.get(
+            reverse("metrics"), headers={"X-Forwarded-For": "203.0.113.5", "Authorization": "Bearer s3cret"}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    @override_settings(METRICS_TOKEN="s3cret")
+    def test_loopback_needs_the_token_by_default(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+
+    @override_settings(METRICS_ALLOWED_NETWORKS=["10.0.0.0/8"], METRICS_TOKEN="s3cret")
+    def test_other_addresses_need_the_token(self):
+        outside = {"REMOTE_ADDR": "203.0.113.5"}
+        self.assertEqual(self.client.get(reverse("metrics"), **outside).status_code, 401)
+        response = self.client.get(reverse("metrics"), headers={"Authorization": "Bearer wrong"}, **outside)
+        self.assertEqual(response.status_code, 401)
+        response = self.client.get(reverse("metrics"), headers={"Authorization": "Bearer s3cret"}, **outside)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.client.get(reverse("metrics"), REMOTE_ADDR="10.1.2.3").status_code, 200)
+
+    @override_settings(METRICS_ALLOWED_NETWORKS=[], METRICS_TOKEN="")
+    def test_closed_without_token_or_networks(self):
+        self.assertEqual(self.client.get(reverse("metrics")).status_code, 401)
+
+
+@override_settings(PASSWORD_HASH_ITERATIONS=1000)
+class MetricsMiddlewareTests(TestCase):
+    labels = {"view": "login"}
+
+    def sample(self, name, **labels):
+        return REGISTRY.get_sample_value(name, {**self.labels, **labels}) or 0
+
+    def test_request_is_labelled_by_url_name_with_its_queries(self):
+        Client.objects.create(username="asha", email="asha@example.com", password=hash_password("secret"))
+        before = {
+            "requests": self.sample("http_request_duration_seconds_count", method="POST"),
+            "unauthorized": self.sample("http_responses_total", status="401"),
+            "queries": self.sample("http_request_queries_sum"),
+        }
+        response = self.client.post(
+            reverse("login"),
+            json.dumps({"email": "asha@example.com", "password": "nope"}),
+            content_type="application/json",
+        )
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(self.sample("http_request_duration_seconds_count", method="POST"), before["requests"] + 1)
+        self.assertEqual(self.sample("http_responses_total", status="401"), before["unauthorized"] + 1)
+        self.assertEqual(self.sample("http_request_queries_sum"), before["queries"] + 1)
+
+    def test_unresolved_paths_share_one_label(self):
+        before = REGISTRY.get_sample_value("http_responses_total", {"view": "<unresolved>", "status": "404"}) or 0
+        self.client.get("/no-such-page")
+        self.client.get("/another-missing-page")
+        after = REGISTRY.get_sample_value("http_responses_total", {"view": "<unresolved>", "status": "404"})
+        self.assertEqual(after, before + 2)
+
+
+class SlowQueryLogTests(TestCase):
+    def test_queries_over_the_threshold_are_submitted(self):
+        with override_settings(SLOW_QUERY_THRESHOLD_MS=1e-6), mock.patch(
+            "monitoring.slow_queries.recorder.submit"
+        ) as submit:
+            self.client.post(
+                reverse("login"),
+                json.dumps({"email": "nobody@example.com", "password": "x"}),
+                content_type="application/json",
+            )
+        sql, params, duration_ms, view, alias = submit.call_args.args
+        self.assertIn("authentication_client", sql)
+        self.assertEqual((view, alias), ("login", "default"))
+        self.assertGreater(duration_ms, 0)
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql("SELECT *  FROM t WHERE a = 'x''y' AND b IN (%s, %s, %s) LIMIT 21"),
+            "SELECT * FROM t WHERE a = ? AND b IN (...) LIMIT ?",
+        )
+
+    @override_settings(SLOW_QUERY_EXPLAIN_SAMPLE_RATE=0)
+    def test_executions_are_aggregated_by_fingerprint(self):
+        sql = 'SELECT "id" FROM "authentication_client" WHERE "email" = %s'
+        record(sql, ["a@example.com"], 250.0, "login", "default")
+        record(sql, ["b@example.com"], 400.0, "login", "default")
+        row = SlowQuery.objects.get()
+        self.assertEqual((row.calls, row.total_ms, row.max_ms), (2, 650.0, 400.0))
+        self.assertEqual(row.sql, 'SELECT "id" FROM "authentication_client" WHERE "email" = ?')
+        # The first slow run of a SELECT is always explained
+        self.assertTrue(row.explain_plan)
+        self.assertFalse(row.explain_plan.startswith("EXPLAIN failed"))
+
+
+class ProfilingTests(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.profile_dir = Path(directory.name)
+        self.staff = get_user_model().objects.create_superuser("admin", "admin@example.com", "secret")
+
+    def get(self, enabled=True, **headers):
+        # The middleware is loaded with the test client's handler, on its first request
+        with override_settings(PROFILING_ENABLED=enabled, PROFILING_DIR=str(self.profile_dir)):
+            return self.client.get(reverse("admin:index"), headers=headers)
+
+    def test_marked_request_is_profiled(self):
+        self.client.force_login(self.staff)
+        response = self.get(**{"X-Profile": "1"})
+        self.assertEqual(response.status_code, 200)
+        record = ProfileRecord.objects.get()
+        self.assertEqual(response["X-Profile-Id"], str(record.pk))
+        self.assertEqual((record.view, record.requested_by, record.status_code), ("admin:index", "admin", 200))
+        self.assertIn("function calls", record.top_functions)
+        self.assertTrue((self.profile_dir / record.profile_file).exists())
+
+    def test_unmarked_or_non_staff_requests_are_not_profiled(self):
+        self.client.force_login(self.staff)
+        self.assertNotIn("X-Profile-Id", self.get())
+        self.client.force_login(get_user_model().objects.create_user("ravi", "ravi@example.com", "secret"))
+        self.get(**{"X-Profile": "1"})
+        self.assertFalse(ProfileRecord.objects.exists())
+
+    def test_disabled_middleware_is_dropped(self):
+        self.client.force_login(self.staff)
+        response = self.get(enabled=False, **{"X-Profile": "1"})
+        self.assertNotIn("X-Profile-Id", response)
+        self.assertFalse(ProfileRecord.objects.exists())
+        with override_settings(PROFILING_ENABLED=False), self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
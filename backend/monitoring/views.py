@@ -0,0 +1,43 @@
+import ipaddress
+
+from django.conf import settings
+from django.http import HttpResponse, JsonResponse
+from django.utils.crypto import constant_time_compare
+
+from .metrics import exposition
+
+# Set by reverse proxies; the connecting address is then the proxy's, not the scraper's
+PROXY_HEADERS = ("HTTP_X_FORWARDED_FOR", "HTTP_X_REAL_IP", "HTTP_FORWARDED")
+
+
+def _allowed_address(address):
+    try:
+        address = ipaddress.ip_address(address)
+    except ValueError:
+        return False
+    return any(address in ipaddress.ip_network(network, strict=False) for network in settings.METRICS_ALLOWED_NETWORKS)
+
+
+def is_trusted_scraper(request):
+    """
+    Whether ``request`` sends ``Authorization: Bearer <METRICS_TOKEN>`` or
+    comes straight (not through a proxy) from METRICS_ALLOWED_NETWORKS.
+    """
+    header = request.META.get("HTTP_AUTHORIZATION", "")
+    if settings.METRICS_TOKEN and constant_time_compare(header, f"Bearer {settings.METRICS_TOKEN}"):
+        return True
+    if any(name in request.META for name in PROXY_HEADERS):
+        return False
+    return _allowed_address(request.META.get("REMOTE_ADDR", ""))
+
+
+def metrics(request):
+    """
+    Prometheus text exposition, for scrapers sending
+    ``Authorization: Bearer <METRICS_TOKEN>`` or connecting directly from
+    METRICS_ALLOWED_NETWORKS.
+    """
+    if not is_trusted_scraper(request):
+        return JsonResponse({"error": "Invalid metrics token"}, status=401)
+    body, content_type = exposition()
+    return HttpResponse(body, content_type=content_type)